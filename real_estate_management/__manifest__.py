@@ -1,11 +1,14 @@
 {
     'name': 'Real Estate Management',
-    'version': '1.0',
+    'version': '1.2',
     'license': 'LGPL-3',
     'category': 'Website',
     'summary': 'Module for managing real estate properties and website integration',
     'description': 'Manage real estate properties with interactive map, listings, and contact forms.',
     'depends': ['base', 'base_geolocalize', 'web', 'website_sale', 'mail', 'base_setup'],
+    'external_dependencies': {
+        'python': ['numpy'],
+    },
     'data': [
         # Security
         'security/ir.model.access.csv',
@@ -14,6 +17,8 @@
         'data/mail_property_rejection.xml',
         'data/sequences.xml',
         'data/agent_registration_demo.xml',
+        'data/property_data.xml',
+        'data/ir_cron_data.xml',
 
         # Views
         'views/property_views.xml',
@@ -22,6 +27,11 @@
         'views/property_registration_views.xml',
         'views/agent_views.xml',
         'views/agent_registration_views.xml',
+        'views/agent_inquiry_views.xml',
+        'views/property_ai_job_views.xml',
+        'views/city_investment_views.xml',
+        'views/property_geocode_cache_views.xml',
+        'views/property_import_views.xml',
 
         # Qweb Templates
         'views/qweb_templates/property_map_template.xml',
@@ -39,6 +49,7 @@
     'assets': {
         'web.assets_frontend': [
             'real_estate_management/static/src/js/property_map.js',
+            'real_estate_management/static/src/js/autocomplete.js',
             # 'real_estate_management/static/src/css/property_map.css',
             'real_estate_management/static/src/css/agent_registration.css',
         ],
@@ -1,13 +1,43 @@
 from odoo import http, fields
 from odoo.http import request
+from markupsafe import Markup
 import json
 from odoo.tools.json import scriptsafe as json_scriptsafe
-import base64
 from odoo.exceptions import UserError
+from ..models.agent import DIRECTORY_PAGE_SIZE
+from ..models.agent_inquiry import INQUIRY_AGENT_LIMIT, INQUIRY_IP_LIMIT
+from ..models.autocomplete import AUTOCOMPLETE_LIMIT
+from ..models.property_facets import LISTING_FACETS
+from ..models.property_geo_search import GEO_SEARCH_LIMIT, GEO_SEARCH_MAX_LIMIT
+from ..models.property_listing import (
+    LISTING_DEFAULT_SORT, LISTING_DISTANCE_SORT, LISTING_MAX_PAGE_SIZE, LISTING_PAGE_SIZE, LISTING_RELEVANCE_SORT,
+    LISTING_SORTS,
+)
+from ..tools.lru_cache import SizedLRUCache
+from ..tools.rate_limit import RateLimiter
+from ..tools.upload import UPLOAD_IMAGE_TYPES, UPLOAD_MAX_IMAGE_SIZE, UploadSession
+from urllib.parse import urlencode
 import logging
+import math
 
 _logger = logging.getLogger(__name__)
 
+# Rendered detail pages served to anonymous visitors, per worker process
+DETAIL_PAGE_CACHE = SizedLRUCache(64 * 1024 * 1024)
+
+# Stands for the session CSRF token in cached pages, replaced on every hit
+DETAIL_PAGE_CSRF_PLACEHOLDER = '__property_page_csrf_token__'
+
+# Session keys of the shopping cart the website_sale layout renders in the header
+DETAIL_PAGE_CART_SESSION_KEYS = ('sale_order_id', 'website_sale_cart_quantity')
+
+# Rendered agent directory results (cards and pager), per worker process
+AGENT_DIRECTORY_CACHE = SizedLRUCache(16 * 1024 * 1024)
+
+# Contact form submissions accepted per client IP address and per agent, per worker process
+INQUIRY_IP_LIMITER = RateLimiter(*INQUIRY_IP_LIMIT)
+INQUIRY_AGENT_LIMITER = RateLimiter(*INQUIRY_AGENT_LIMIT)
+
 
 class RealEstateController(http.Controller):
 
@@ -18,92 +48,82 @@ class RealEstateController(http.Controller):
         Property = request.env['property.property'].sudo()
         # Get the selected city from URL parameters (if any)
         selected_city = kwargs.get('city', '')
-        all_properties = Property.search([('is_published', '=', True)])
-        city_list = sorted(list(set([p.city for p in all_properties if p.city])))
-        # Build the search domain with city filter if selected
-        search_domain = [
-            ('is_published', '=', True),
-            ('latitude', '!=', False),
-            ('longitude', '!=', False)
-        ]
-        # Add city filter if a city is selected
-        if selected_city:
-            search_domain.append(('city', '=', selected_city))
-
-        # Fetch properties based on the search domain
-        properties = Property.search(search_domain)
+        city_facets = Property._get_city_facets()
 
         # Fetch featured properties for selected city, limit to 5
         featured_domain = [('is_published', '=', True), ('is_featured', '=', True)]
         if selected_city:
             featured_domain.append(('city', '=', selected_city))
-        featured_properties = Property.search(featured_domain)
+        featured_properties = Property._fetch_public_rows(
+            featured_domain, ['name', 'price', 'plot_area', 'city', 'category_id.name'], image_fields=['card_image'],
+        )
 
         # Get city investment info
         city_investment_info = None
         if selected_city:
-            city_investment_info = Property.get_city_investment_info(selected_city)
+            city_investment_info = request.env['city.investment'].sudo()._get_info(selected_city)
 
-        # Define a reusable color palette
-        palette = ["#059669", "#dc2626", "#7c3aed", "#ea580c", "#2563eb", "#d97706", "#0891b2", "#9333ea"]
-        category_colors = {}
-        idx = 0
-
-        # Build comprehensive data
-        property_data = []
-        for prop in properties:
-            if prop.latitude and prop.longitude:
-                cat = prop.category_id.name if prop.category_id else 'Property'
-                if cat not in category_colors:
-                    category_colors[cat] = palette[idx % len(palette)]
-                    idx += 1
-
-                image_url = None
-                if prop.image:
-                    # Create base64 data URL for the image
-                    image_url = f"data:image/png;base64,{prop.image.decode('utf-8')}"
-                elif prop.gallery_image_ids:
-                    # Use first image from gallery if main image not available
-                    first_image = prop.gallery_image_ids[0]
-                    if first_image.datas:
-                        image_url = f"data:image/png;base64,{first_image.datas.decode('utf-8')}"
-
-                full_address = ", ".join(filter(None, [prop.street, prop.city, prop.zip_code]))
-
-                # Build property data
-                property_data.append({
-                    'id': prop.id,
-                    'name': prop.name or '',
-                    'latitude': float(prop.latitude),
-                    'longitude': float(prop.longitude),
-                    'street': prop.street or '',
-                    'city': prop.city or '',
-                    'zip_code': prop.zip_code or '',
-                    'price': float(prop.price) if prop.price else 0,
-                    'contact_phone': prop.contact_phone or '',
-                    'contact_email': prop.contact_email or '',
-                    'contact_name': prop.contact_name or '',
-                    'short_description': prop.short_description or '',
-                    'image_url': image_url,
-                    'property_type': cat,
-                    'nearby_landmarks': prop.nearby_landmarks or '',
-                    'views': prop.views or 0,
-                    'seo_title': prop.seo_title or '',
-                    'marker_color': category_colors[cat],
-                    'full_address': full_address,
-                })
+        # Markers are fetched per viewport by property_map.js, only the
+        # initial bounds and the legend colors are shipped with the page
+        map_data = Property._get_map_page_data(selected_city)
 
         return request.render('real_estate_management.property_map_template', {
-            'property_count': len(property_data),
-            'properties_json': json_scriptsafe.dumps(property_data) if property_data else '[]',
-            'category_colors': json_scriptsafe.dumps(category_colors),
-            'city_list': city_list,
+            'property_count': map_data['count'],
+            'map_bounds': json_scriptsafe.dumps(map_data['bounds']),
+            'category_colors': json_scriptsafe.dumps(map_data['category_colors']),
+            'city_facets': city_facets,
             'selected_city': selected_city,
             'featured_properties': featured_properties,
             'city_investment_info': city_investment_info,
 
         })
 
+    @http.route('/property/map/markers', type='http', auth='public', methods=['GET'], sitemap=False)
+    def property_map_markers(self, south=None, west=None, north=None, east=None, zoom=None, city=None,
+                             category=None, **kwargs):
+        """Markers and clusters of the published properties inside the requested map viewport"""
+        try:
+            bounds = [float(value) for value in (south, west, north, east)]
+            zoom = int(zoom) if zoom else None
+            category_id = int(category) if category else None
+        except (TypeError, ValueError):
+            return request.make_json_response({'error': 'Invalid map bounds'}, status=400)
+        south, west, north, east = bounds
+        if not all(map(math.isfinite, bounds)) or max(abs(south), abs(north)) > 90 or max(abs(west), abs(east)) > 180:
+            return request.make_json_response({'error': 'Invalid map bounds'}, status=400)
+
+        payload = request.env['property.property'].sudo()._get_map_markers_json(
+            bounds, zoom=zoom, city=city or None, category_id=category_id,
+        )
+        return request.make_response(payload, headers=[('Content-Type', 'application/json; charset=utf-8')])
+
+    @http.route('/autocomplete', type='http', auth='public', methods=['GET'], sitemap=False)
+    def autocomplete(self, term='', kinds='', limit=None, **kwargs):
+        """Typeahead suggestions (cities, ZIP codes, landmarks, property and agent names) for a search box"""
+        try:
+            limit = min(max(int(limit or AUTOCOMPLETE_LIMIT), 1), 25)
+        except ValueError:
+            limit = AUTOCOMPLETE_LIMIT
+        suggestions = request.env['real.estate.autocomplete'].sudo()._autocomplete(
+            term[:100], limit=limit, kinds=set(filter(None, kinds.split(','))) or None,
+        )
+        return request.make_json_response(suggestions, headers={'Cache-Control': 'public, max-age=60'})
+
+    @http.route('/property/geo/search', type='http', auth='public', methods=['GET'], sitemap=False)
+    def property_geo_search(self, limit=None, **kwargs):
+        """Published properties within ``radius_km`` of ``lat``/``lng``, or inside ``polygon``, nearest first"""
+        Property = request.env['property.property'].sudo()
+        geo = Property._parse_geo_filter(kwargs)
+        if not geo:
+            return request.make_json_response(
+                {'error': 'Expected lat, lng and radius_km, or polygon=lat,lng;lat,lng;...'}, status=400,
+            )
+        try:
+            limit = min(max(int(limit or GEO_SEARCH_LIMIT), 1), GEO_SEARCH_MAX_LIMIT)
+        except ValueError:
+            limit = GEO_SEARCH_LIMIT
+        return request.make_json_response({'properties': Property._geo_search(geo, limit=limit)})
+
     @http.route('/property/<int:property_id>', type='http', auth='public', website=True)
     def property_detail(self, property_id, **kwargs):
         """Individual property detail page"""
@@ -111,57 +131,161 @@ class RealEstateController(http.Controller):
         if not prop.exists() or not prop.is_published:
             return request.not_found()
         if not prop.ai_content_generated:
-            try:
-                prop.generate_ai_content()
-            except Exception as e:
-                _logger.error(f"Failed to generate AI content for property {prop.id}: {e}")
+            # Generated in the background, the page renders its placeholders meanwhile
+            request.env['property.ai.job'].sudo()._enqueue(prop, skip_failed=True)
         try:
-            prop.write({'views': prop.views + 1})
+            with request.env.cr.savepoint():
+                request.env['property.view.event'].sudo()._record_view(prop.id)
         except Exception as e:
-            _logger.error(f"Failed to update views for property {prop.id}: {e}")
+            _logger.error(f"Failed to record view for property {prop.id}: {e}")
+        if self._detail_page_cacheable(**kwargs):
+            return self._render_cached_detail_page(prop)
         return request.render('real_estate_management.property_detail_page', {
             'property': prop,
-
+            'similar_properties': prop._get_similar_properties(),
         })
 
+    def _detail_page_cacheable(self, **kwargs):
+        """Whether the detail page of this request may be served from the render cache
+
+        Opt-in through the ``real_estate.detail_page_cache`` system parameter,
+        and limited to plain anonymous GET requests: logged-in users, debug
+        mode, query strings and a shopping cart in the session all change the
+        rendered page.
+        """
+        enabled = request.env['ir.config_parameter'].sudo().get_param('real_estate.detail_page_cache')
+        return (
+            enabled
+            and not kwargs
+            and request.httprequest.method == 'GET'
+            and not request.httprequest.query_string
+            and not request.session.debug
+            and request.env.user._is_public()
+            and not any(request.session.get(key) for key in DETAIL_PAGE_CART_SESSION_KEYS)
+        )
+
+    def _render_cached_detail_page(self, prop):
+        """Serve the detail page of ``prop`` from the per-worker render cache
+
+        Pages are keyed on the property's last update and on the data version
+        of the published properties, which the similar properties section
+        depends on. The session CSRF token is rendered as a placeholder and
+        substituted on every hit; the view counter is recorded by the caller
+        before the cache is looked up.
+        """
+        Property = request.env['property.property'].sudo()
+        key = (
+            request.httprequest.url,
+            request.website.id,
+            request.lang.code,
+            prop.id,
+            str(prop.write_date),
+            Property._get_map_data_version(),
+        )
+        html = DETAIL_PAGE_CACHE.get(key)
+        cache_status = 'hit'
+        if html is None:
+            cache_status = 'miss'
+            request.csrf_token = lambda *args, **kwargs: DETAIL_PAGE_CSRF_PLACEHOLDER
+            try:
+                html = str(request.render('real_estate_management.property_detail_page', {
+                    'property': prop,
+                    'similar_properties': prop._get_similar_properties(),
+                }, lazy=False))
+            finally:
+                del request.csrf_token
+            DETAIL_PAGE_CACHE.set(key, html)
+        html = html.replace(DETAIL_PAGE_CSRF_PLACEHOLDER, request.csrf_token())
+        return request.make_response(html, headers=[
+            ('Content-Type', 'text/html; charset=utf-8'),
+            ('X-Page-Cache', cache_status),
+        ])
+
     @http.route('/properties', type='http', auth='public', website=True)
     def property_listing(self, **kwargs):
         search = kwargs.get('search', '')
         city = kwargs.get('city', '')
         zip_code = kwargs.get('zip_code', '')
-
-        domain = [('is_published', '=', True)]
+        Property = request.env['property.property'].sudo()
+        geo = Property._parse_geo_filter(kwargs)
+        sort_options = [(key, label) for key, (label, _field, _direction) in LISTING_SORTS.items()]
+        default_sort = LISTING_DEFAULT_SORT
         if search:
-            domain += ['|', '|',
-                       ('name', 'ilike', search),
-                       ('city', 'ilike', search),
-                       ('zip_code', 'ilike', search)]
-        if city:
-            domain.append(('city', 'ilike', city))
-        if zip_code:
-            domain.append(('zip_code', 'ilike', zip_code))
+            sort_options.insert(0, (LISTING_RELEVANCE_SORT, 'Best Match'))
+            default_sort = LISTING_RELEVANCE_SORT
+        if geo:
+            sort_options.insert(0, (LISTING_DISTANCE_SORT, 'Nearest'))
+            default_sort = LISTING_DISTANCE_SORT
+        sort = kwargs.get('sort') if kwargs.get('sort') in dict(sort_options) else default_sort
+        try:
+            limit = min(max(int(kwargs.get('limit') or LISTING_PAGE_SIZE), 1), LISTING_MAX_PAGE_SIZE)
+            page = max(int(kwargs.get('page') or 1), 1)
+        except ValueError:
+            limit, page = LISTING_PAGE_SIZE, 1
 
-        properties = request.env['property.property'].sudo().search(domain)
+        facet_filters = Property._normalize_facet_filters({
+            facet: request.httprequest.args.getlist(facet) for facet in LISTING_FACETS
+        })
+        domain = Property._get_listing_domain(search, city, zip_code, facet_filters, geo)
+        listing = Property._get_listing_page(
+            domain, sort=sort, limit=limit, after=kwargs.get('after'), before=kwargs.get('before'),
+            search=search, geo=geo,
+        )
+        if not listing['prev_cursor']:
+            page = 1
+        total = Property._get_listing_count(search, city, zip_code, facet_filters, geo)
+        facet_counts = Property._get_facet_counts(search, city, zip_code, facet_filters, geo)
 
         property_card_data = []
-        for prop in properties:
+        for prop in listing['rows']:
             property_card_data.append({
-                'id': prop.id,
-                'name': prop.name,
-                'image_url': f"data:image/png;base64,{prop.image.decode('utf-8')}" if prop.image else '',
-                'category': prop.category_id.name or '',
-                'price': prop.price,
-                'plot_area': prop.plot_area,
-                'price_per_sqft': prop.price_per_sqft,
-                'city': prop.city,
-                'zip_code': prop.zip_code,
+                'id': prop['id'],
+                'name': prop['name'],
+                'image_url': prop['card_image_url'],
+                'category': prop['category_id.name'] or '',
+                'price': prop['price'],
+                'plot_area': prop['plot_area'],
+                'price_per_sqft': prop['price_per_sqft'],
+                'city': prop['city'],
+                'zip_code': prop['zip_code'],
             })
 
+        # Filters kept by the pagination links
+        params = {key: value for key, value in {
+            'search': search, 'city': city, 'zip_code': zip_code,
+            'sort': sort if sort != default_sort else '',
+            'limit': limit if limit != LISTING_PAGE_SIZE else '',
+            **{facet: ','.join(values) for facet, values in facet_filters},
+            **{key: kwargs.get(key) for key in ('lat', 'lng', 'radius_km', 'polygon') if geo},
+        }.items() if value}
+        next_url = prev_url = None
+        if listing['next_cursor']:
+            next_url = '/properties?%s' % urlencode(dict(params, after=listing['next_cursor'], page=page + 1))
+        if listing['prev_cursor']:
+            prev_url = '/properties?%s' % urlencode(dict(params, before=listing['prev_cursor'], page=page - 1))
+
+        first_index = (page - 1) * limit + 1
         return request.render('real_estate_management.property_listing_template', {
             'properties': property_card_data,
             'search': search,
             'city': city,
             'zip_code': zip_code,
+            'sort': sort,
+            'sort_options': sort_options,
+            'geo_params': [
+                (key, kwargs[key]) for key in ('lat', 'lng', 'radius_km', 'polygon') if geo and kwargs.get(key)
+            ],
+            'facets': [
+                (facet, label, facet_counts.get(facet, []))
+                for facet, (label, _field, _bands) in LISTING_FACETS.items() if facet_counts.get(facet)
+            ],
+            'total': total,
+            'page': page,
+            'page_count': max(1, -(-total // limit)),
+            'first_index': first_index,
+            'last_index': first_index + len(property_card_data) - 1,
+            'next_url': next_url,
+            'prev_url': prev_url,
         })
 
     @http.route('/property/register', type='http', auth='public', website=True)
@@ -172,7 +296,9 @@ class RealEstateController(http.Controller):
     def submit_registration(self, **post):
         """Handle property registration form submission"""
         try:
-            upload_files = request.httprequest.files.getlist('images')
+            uploads = UploadSession(request.env, request.httprequest.content_length)
+            upload_files = [file for file in request.httprequest.files.getlist('images') if file]
+            Registration = request.env['property.registration'].sudo()
             property_vals = {
                 'customer_name': post.get('customer_name'),
                 'phone_number': post.get('phone_number'),
@@ -186,23 +312,24 @@ class RealEstateController(http.Controller):
                 'status': 'submitted',
             }
 
-            # Create property record
-            property_rec = request.env['property.registration'].sudo().create(property_vals)
-
-            # Save uploaded images (main + gallery)
-            for idx, file in enumerate(upload_files):
-                content = base64.b64encode(file.read())
-                if idx == 0:
-                    property_rec.image = content  # First image as main
-                else:
-                    request.env['ir.attachment'].sudo().create({
-                        'name': file.filename,
+            # a refused upload must not leave a half created registration
+            with request.env.cr.savepoint():
+                # First image as main, resized by the image field
+                if upload_files:
+                    image_field = Registration._fields['image']
+                    property_vals['image'] = uploads.read_image(
+                        upload_files[0], (image_field.max_width, image_field.max_height),
+                    )
+
+                # Create property record
+                property_rec = Registration.create(property_vals)
+
+                # Stream the gallery images to the filestore
+                for file in upload_files[1:]:
+                    uploads.attach(file, {
                         'res_model': 'property.registration',
                         'res_id': property_rec.id,
-                        'type': 'binary',
-                        'datas': content,
-                        'mimetype': file.content_type,
-                    })
+                    }, allowed_types=UPLOAD_IMAGE_TYPES, max_size=UPLOAD_MAX_IMAGE_SIZE)
 
             return request.render('real_estate_management.property_submission_success')
 
@@ -218,83 +345,89 @@ class RealEstateController(http.Controller):
         search_query = kwargs.get('search', '')
         city_filter = kwargs.get('city', '')
         expertise_filter = kwargs.get('expertise', '')
-        sort_by = kwargs.get('sort', 'recommended')  # recommended, sales_volume, deals, rating
-
-        # Build domain
-        domain = [('is_active', '=', True)]
-
-        if search_query:
-            domain += ['|', '|',
-                       ('name', 'ilike', search_query),
-                       ('city', 'ilike', search_query),
-                       ('zip_code', 'ilike', search_query)]
-
-        if city_filter:
-            domain.append(('city', '=', city_filter))
-
-        if expertise_filter:
-            domain.append(('expertise_level', '=', expertise_filter))
-
-        # Sorting
-        order = 'total_sales_volume desc, total_deals desc'  # Default: recommended
-        if sort_by == 'sales_volume':
-            order = 'total_sales_volume desc'
-        elif sort_by == 'deals':
-            order = 'total_deals desc'
-        elif sort_by == 'rating':
-            order = 'avg_rating desc, review_count desc'
+        # recommended, sales_volume, deals, rating, or relevance (default) when searching
+        sort_by = kwargs.get('sort') or ('relevance' if search_query else 'recommended')
+        try:
+            page = max(int(kwargs.get('page') or 1), 1)
+        except ValueError:
+            page = 1
 
-        # Fetch agents
         Agent = request.env['real.estate.agent'].sudo()
-        agents = Agent.search(domain, order=order)
 
-        # Get unique cities for filter dropdown
-        all_agents = Agent.search([('is_active', '=', True)])
-        cities = sorted(list(set([a.city for a in all_agents if a.city])))
+        # Total matching, unique cities for filter dropdown and the total from the cached stats
+        agent_count = Agent._get_directory_count(search_query, city_filter, expertise_filter)
+        city_facets, total_agents = Agent._get_directory_stats()
+        page_count = max(1, -(-agent_count // DIRECTORY_PAGE_SIZE))
+        page = min(page, page_count)
+
+        # The agent cards and pager are rendered once per filters, sort, page and data version
+        cache_key = '|'.join(map(str, [
+            request.env.cr.dbname, request.lang.code, Agent._get_directory_version(),
+            search_query, city_filter, expertise_filter, sort_by, page,
+        ]))
+        results_html = AGENT_DIRECTORY_CACHE.get(cache_key)
+        if results_html is None:
+            results_html = self._render_agent_directory_results(
+                Agent, search_query, city_filter, expertise_filter, sort_by, page, page_count,
+            )
+            AGENT_DIRECTORY_CACHE.set(cache_key, results_html)
+
+        return request.render('real_estate_management.agent_directory_template', {
+            'results_html': Markup(results_html),
+            'agent_count': agent_count,
+            'total_agents': total_agents,
+            'city_facets': city_facets,
+            'search_query': search_query,
+            'city_filter': city_filter,
+            'expertise_filter': expertise_filter,
+            'sort_by': sort_by,
+        })
 
-        # Count agents
-        agent_count = len(agents)
-        total_agents = len(all_agents)
+    def _render_agent_directory_results(self, Agent, search_query, city_filter, expertise_filter, sort_by, page,
+                                        page_count):
+        """HTML of the agent cards and pager of a directory page"""
+        agents = Agent._get_directory_page([
+            'name', 'designation', 'expertise_level', 'city', 'state_id.name', 'email', 'phone',
+            'total_sales_volume', 'total_deals', 'avg_rating', 'short_bio', 'active_property_count',
+        ], search_query, city_filter, expertise_filter, sort=sort_by, page=page)
 
         # Build agent card data
+        designations = dict(Agent._fields['designation'].selection)
         agent_data = []
         for agent in agents:
             # Format sales volume
-            sales_volume_str = f"₹{agent.total_sales_volume / 10000000:.1f}M" if agent.total_sales_volume >= 10000000 else f"₹{agent.total_sales_volume / 100000:.1f}L"
-
-            # Get profile image URL
-            image_url = None
-            if agent.image:
-                image_url = f"data:image/png;base64,{agent.image.decode('utf-8')}"
+            sales_volume = agent['total_sales_volume']
+            sales_volume_str = f"₹{sales_volume / 10000000:.1f}M" if sales_volume >= 10000000 else f"₹{sales_volume / 100000:.1f}L"
 
             agent_data.append({
-                'id': agent.id,
-                'name': agent.name,
-                'designation': dict(agent._fields['designation'].selection).get(agent.designation),
-                'expertise_level': agent.expertise_level,
-                'city': agent.city or '',
-                'state': agent.state_id.name or '',
-                'email': agent.email,
-                'phone': agent.phone,
-                'image_url': image_url,
-                'total_sales_volume': agent.total_sales_volume,
+                'id': agent['id'],
+                'name': agent['name'],
+                'designation': designations.get(agent['designation']),
+                'expertise_level': agent['expertise_level'],
+                'city': agent['city'] or '',
+                'state': agent['state_id.name'] or '',
+                'email': agent['email'],
+                'phone': agent['phone'],
+                'image_url': agent['image_url'],
+                'total_sales_volume': sales_volume,
                 'sales_volume_display': sales_volume_str,
-                'total_deals': agent.total_deals,
-                'avg_rating': agent.avg_rating,
-                'short_bio': agent.short_bio or '',
-                'active_listings': agent.active_property_count,
+                'total_deals': agent['total_deals'],
+                'avg_rating': agent['avg_rating'],
+                'short_bio': agent['short_bio'] or '',
+                'active_listings': agent['active_property_count'],
             })
 
-        return request.render('real_estate_management.agent_directory_template', {
+        # Filters kept by the pager links
+        params = {key: value for key, value in {
+            'search': search_query, 'city': city_filter, 'expertise': expertise_filter, 'sort': sort_by,
+        }.items() if value}
+        return str(request.env['ir.qweb']._render('real_estate_management.agent_directory_results', {
             'agents': agent_data,
-            'agent_count': agent_count,
-            'total_agents': total_agents,
-            'cities': cities,
-            'search_query': search_query,
-            'city_filter': city_filter,
-            'expertise_filter': expertise_filter,
-            'sort_by': sort_by,
-        })
+            'page': page,
+            'page_count': page_count,
+            'prev_url': '/agents?%s' % urlencode(dict(params, page=page - 1)) if page > 1 else None,
+            'next_url': '/agents?%s' % urlencode(dict(params, page=page + 1)) if page < page_count else None,
+        }))
 
     @http.route('/agent/<int:agent_id>', type='http', auth='public', website=True)
     def agent_detail(self, agent_id, **kwargs):
@@ -305,26 +438,23 @@ class RealEstateController(http.Controller):
             return request.not_found()
 
         # Get agent's published properties
-        properties = request.env['property.property'].sudo().search([
+        properties = request.env['property.property'].sudo()._fetch_public_rows([
             ('agent_id', '=', agent_id),
             ('is_published', '=', True)
-        ], limit=12, order='create_date desc')
+        ], ['name', 'price', 'plot_area', 'city', 'category_id.name'],
+            image_fields=['card_image'], limit=12, order='create_date desc')
 
         # Format property data
         property_data = []
         for prop in properties:
-            image_url = None
-            if prop.image:
-                image_url = f"data:image/png;base64,{prop.image.decode('utf-8')}"
-
             property_data.append({
-                'id': prop.id,
-                'name': prop.name,
-                'image_url': image_url,
-                'price': prop.price,
-                'plot_area': prop.plot_area,
-                'city': prop.city,
-                'category': prop.category_id.name if prop.category_id else 'Property',
+                'id': prop['id'],
+                'name': prop['name'],
+                'image_url': prop['card_image_url'],
+                'price': prop['price'],
+                'plot_area': prop['plot_area'],
+                'city': prop['city'],
+                'category': prop['category_id.name'] or 'Property',
             })
 
         return request.render('real_estate_management.agent_detail_template', {
@@ -334,21 +464,30 @@ class RealEstateController(http.Controller):
 
     @http.route('/agent/<int:agent_id>/contact', type='json', auth='public', methods=['POST'], csrf=False)
     def contact_agent(self, agent_id, **kwargs):
-        """Handle contact form submission (AJAX)"""
+        """Handle contact form submission (AJAX)
+
+        The inquiry is stored with one insert and the agent notified later by
+        the inquiry dispatcher; bursts over the rate limits are rejected
+        before reaching the database.
+        """
+        Inquiry = request.env['agent.inquiry'].sudo()
+        values = Inquiry._sanitize_inquiry(kwargs)
+        if not values:
+            return {'success': False, 'message': 'Please enter your name and a valid email address.'}
+        ip_address = request.httprequest.remote_addr
+        if not INQUIRY_IP_LIMITER.hit(ip_address) or not INQUIRY_AGENT_LIMITER.hit(agent_id):
+            return {'success': False, 'message': 'Too many messages sent, please try again later.'}
         try:
-            agent = request.env['real.estate.agent'].sudo().browse(agent_id)
-
-            if not agent.exists():
+            agent = Inquiry._record_inquiry(agent_id, values, ip_address)
+            if not agent:
                 return {'success': False, 'message': 'Agent not found'}
 
-            # You can create a lead/inquiry record here
-            # Or send email notification to agent
-
+            agent_name, agent_email, agent_phone = agent
             return {
                 'success': True,
-                'message': f'Thank you! {agent.name} will contact you shortly.',
-                'agent_email': agent.email,
-                'agent_phone': agent.phone,
+                'message': f'Thank you! {agent_name} will contact you shortly.',
+                'agent_email': agent_email,
+                'agent_phone': agent_phone,
             }
 
         except Exception as e:
@@ -378,6 +517,9 @@ class RealEstateController(http.Controller):
     def submit_agent_registration(self, **post):
         """Handle agent registration form submission"""
         try:
+            uploads = UploadSession(request.env, request.httprequest.content_length)
+            Registration = request.env['agent.registration'].sudo()
+
             # Get uploaded files
             profile_image = request.httprequest.files.get('profile_image')
             id_proof = request.httprequest.files.get('id_proof')
@@ -407,23 +549,24 @@ class RealEstateController(http.Controller):
                 'status': 'submitted',
             }
 
-            # Handle profile image
+            # Handle profile image, resized by the image field
             if profile_image:
-                registration_vals['profile_image'] = base64.b64encode(profile_image.read())
-
-            # Handle ID proof
+                image_field = Registration._fields['profile_image']
+                registration_vals['profile_image'] = uploads.read_image(
+                    profile_image, (image_field.max_width, image_field.max_height),
+                )
+
+            # Documents are streamed to their binary fields once the registration exists
+            documents = {
+                'id_proof': id_proof,
+                'license_document': license_doc,
+                'resume': resume,
+            }
             if id_proof:
-                registration_vals['id_proof'] = base64.b64encode(id_proof.read())
                 registration_vals['id_proof_filename'] = id_proof.filename
-
-            # Handle license document
             if license_doc:
-                registration_vals['license_document'] = base64.b64encode(license_doc.read())
                 registration_vals['license_filename'] = license_doc.filename
-
-            # Handle resume
             if resume:
-                registration_vals['resume'] = base64.b64encode(resume.read())
                 registration_vals['resume_filename'] = resume.filename
 
             # Handle specializations
@@ -431,21 +574,30 @@ class RealEstateController(http.Controller):
             if specialization_ids:
                 registration_vals['specialization_ids'] = [(6, 0, [int(sid) for sid in specialization_ids])]
 
-            # Create registration record
-            registration = request.env['agent.registration'].sudo().create(registration_vals)
-
-            # Handle portfolio images
-            for idx, img_file in enumerate(portfolio_images):
-                if img_file:
-                    attachment = request.env['ir.attachment'].sudo().create({
-                        'name': f'Portfolio_{idx + 1}_{img_file.filename}',
-                        'res_model': 'agent.registration',
-                        'res_id': registration.id,
-                        'type': 'binary',
-                        'datas': base64.b64encode(img_file.read()),
-                        'mimetype': img_file.content_type,
-                    })
-                    registration.attachment_ids = [(4, attachment.id)]
+            # a refused upload must not leave a half created registration
+            with request.env.cr.savepoint():
+                # Create registration record
+                registration = Registration.create(registration_vals)
+
+                for field_name, document in documents.items():
+                    if document:
+                        uploads.attach(document, {
+                            'res_model': 'agent.registration',
+                            'res_field': field_name,
+                            'res_id': registration.id,
+                        })
+
+                # Handle portfolio images
+                portfolio = request.env['ir.attachment'].sudo()
+                for idx, img_file in enumerate(portfolio_images):
+                    if img_file:
+                        portfolio |= uploads.attach(img_file, {
+                            'name': f'Portfolio_{idx + 1}_{img_file.filename}',
+                            'res_model': 'agent.registration',
+                            'res_id': registration.id,
+                        }, allowed_types=UPLOAD_IMAGE_TYPES, max_size=UPLOAD_MAX_IMAGE_SIZE)
+                if portfolio:
+                    registration.attachment_ids = [(4, attachment_id) for attachment_id in portfolio.ids]
 
             _logger.info(f"Agent registration submitted: {registration.name} - {registration.agent_name}")
 
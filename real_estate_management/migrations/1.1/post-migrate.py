@@ -0,0 +1,38 @@
+import logging
+
+_logger = logging.getLogger(__name__)
+
+CITY_INVESTMENT_COLUMNS = [
+    'city_investment_reasons', 'city_growth_potential', 'city_infrastructure', 'city_market_trends',
+    'city_investment_generated', 'city_investment_date', 'last_city_processed',
+]
+
+
+def migrate(cr, version):
+    """Move the city insights cached on properties to city.investment"""
+    cr.execute("""
+        SELECT 1 FROM information_schema.columns
+         WHERE table_name = 'property_property' AND column_name = 'last_city_processed'
+    """)
+    if not cr.fetchone():
+        return
+    cr.execute("""
+        INSERT INTO city_investment (name, key, investment_reasons, growth_potential, infrastructure,
+                                     market_trends, state, date_generated, date_expires,
+                                     create_uid, create_date, write_uid, write_date)
+        SELECT DISTINCT ON (lower(regexp_replace(btrim(last_city_processed), '\\s+', ' ', 'g')))
+               btrim(last_city_processed),
+               lower(regexp_replace(btrim(last_city_processed), '\\s+', ' ', 'g')),
+               city_investment_reasons, city_growth_potential, city_infrastructure, city_market_trends,
+               -- undated insights are regenerated by the cron, they would never expire
+               CASE WHEN city_investment_date IS NULL THEN 'pending' ELSE 'done' END,
+               city_investment_date, city_investment_date + interval '30 days',
+               1, now() at time zone 'UTC', 1, now() at time zone 'UTC'
+          FROM property_property
+         WHERE city_investment_generated AND coalesce(btrim(last_city_processed), '') != ''
+      ORDER BY lower(regexp_replace(btrim(last_city_processed), '\\s+', ' ', 'g')), city_investment_date DESC NULLS LAST
+        ON CONFLICT (key) DO NOTHING
+    """)
+    _logger.info("Moved the insights of %s cities to city.investment", cr.rowcount)
+    for column in CITY_INVESTMENT_COLUMNS:
+        cr.execute(f'ALTER TABLE property_property DROP COLUMN IF EXISTS "{column}"')
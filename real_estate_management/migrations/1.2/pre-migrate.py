@@ -0,0 +1,29 @@
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+def migrate(cr, version):
+    """Keep the agent totals entered by hand as their prior deals and sales volume
+
+    The totals are maintained from the closed deals from now on. The prior
+    columns are created here, before the ORM fills them with their default,
+    so that the totals entered so far are not lost by the first reconciliation.
+    """
+    cr.execute("""
+        SELECT 1 FROM information_schema.columns
+         WHERE table_name = 'real_estate_agent' AND column_name = 'prior_deals'
+    """)
+    if cr.fetchone():
+        return
+    cr.execute("""
+        ALTER TABLE real_estate_agent
+            ADD COLUMN prior_sales_volume numeric,
+            ADD COLUMN prior_deals int4
+    """)
+    cr.execute("""
+        UPDATE real_estate_agent
+           SET prior_sales_volume = coalesce(total_sales_volume, 0),
+               prior_deals = coalesce(total_deals, 0)
+    """)
+    _logger.info("Kept the totals of %s agents as their prior deals and sales volume", cr.rowcount)
@@ -1,5 +1,22 @@
+from . import public_data_mixin
+from . import search_mixin
+from . import autocomplete
 from . import property
 from . import property_category
 from . import property_registration
 from . import agent
 from . import agent_registration
+from . import agent_inquiry
+from . import property_map
+from . import property_geocode
+from . import property_listing
+from . import property_facets
+from . import property_geo_search
+from . import property_deal
+from . import property_map_cache
+from . import property_ai_job
+from . import property_view_event
+from . import property_similarity
+from . import city_investment
+from . import property_geocode_cache
+from . import property_import
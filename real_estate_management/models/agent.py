@@ -1,15 +1,45 @@
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+from ..tools.image import image_url
 import logging
 
 _logger = logging.getLogger(__name__)
 
+# Aggregates maintained from the properties of the agents, and the fields entered by hand they add to
+AGENT_AGGREGATE_FIELDS = ['active_property_count', 'total_deals', 'total_sales_volume']
+AGENT_PRIOR_FIELDS = {'prior_deals', 'prior_sales_volume'}
+
+# Sort options of /agents: key -> order, ties broken on id
+DIRECTORY_SORTS = {
+    'recommended': 'recommended_score desc, id desc',
+    'sales_volume': 'total_sales_volume desc, id desc',
+    'deals': 'total_deals desc, id desc',
+    'rating': 'avg_rating desc, review_count desc, id desc',
+}
+DIRECTORY_PAGE_SIZE = 24
+
+# Weights of the recommended score components, each normalized to [0, 1]
+RECOMMENDED_SCORE_WEIGHTS = {
+    'sales': 0.30,
+    'deals': 0.20,
+    'rating': 0.25,
+    'listings': 0.15,
+    'recency': 0.10,
+}
+# Ratings are shrunk towards this mean as if the agent had this many more reviews
+RECOMMENDED_RATING_PRIOR = (4.0, 5)
+# Days after which the recency of the last listing weighs 1/e
+RECOMMENDED_RECENCY_DAYS = 90
+
 
 class RealEstateAgent(models.Model):
     _name = 'real.estate.agent'
     _description = 'Real Estate Agent'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'real.estate.public.data.mixin', 'real.estate.search.mixin']
     _order = 'total_sales_volume desc, total_deals desc'
+    _search_document_fields = ('name', 'city', 'zip_code', 'short_bio')
 
     # Basic Information
     name = fields.Char(string='Agent Name*', required=True, tracking=True)
@@ -48,12 +78,24 @@ class RealEstateAgent(models.Model):
     )
 
     # Performance Metrics
+    # totals and active listings are kept up to date by the properties (see property_deal.py)
     total_sales_volume = fields.Monetary(
         string='Total Sales Volume',
         currency_field='currency_id',
-        help='Total value of properties sold'
+        readonly=True,
+        copy=False,
+        help='Total value of properties sold: the prior sales plus the closing price of the closed deals'
     )
-    total_deals = fields.Integer(string='Total Deals Closed', default=0)
+    total_deals = fields.Integer(string='Total Deals Closed', default=0, readonly=True, copy=False)
+    prior_sales_volume = fields.Monetary(
+        string='Prior Sales Volume',
+        currency_field='currency_id',
+        default=0,
+        copy=False,
+        help='Value of the properties sold outside of this website, added to the total sales volume'
+    )
+    prior_deals = fields.Integer(string='Prior Deals Closed', default=0, copy=False,
+                                 help='Deals closed outside of this website, added to the total deals')
     avg_rating = fields.Float(string='Average Rating', digits=(2, 1), default=5.0)
     review_count = fields.Integer(string='Number of Reviews', default=0)
     currency_id = fields.Many2one(
@@ -68,10 +110,11 @@ class RealEstateAgent(models.Model):
         'agent_id',
         string='Assigned Properties'
     )
-    active_property_count = fields.Integer(
-        string='Active Listings',
-        compute='_compute_active_property_count',
-        store=True
+    active_property_count = fields.Integer(string='Active Listings', readonly=True, copy=False)
+    recommended_score = fields.Float(
+        string='Recommended Score', digits=(5, 2), readonly=True, copy=False,
+        help='Ranking of the "Recommended" directory sort (0-100), recomputed every night from the sales, '
+             'deals, rating, active listings and recent activity of the agent.',
     )
 
     # Bio & Description
@@ -86,6 +129,15 @@ class RealEstateAgent(models.Model):
     is_active = fields.Boolean(string='Active Agent', default=True)
     is_accepting_clients = fields.Boolean(string='Accepting New Clients', default=True)
 
+    # Inquiries
+    inquiry_ids = fields.One2many('agent.inquiry', 'agent_id', string='Inquiries')
+    inquiry_notification = fields.Selection([
+        ('instant', 'Each Inquiry'),
+        ('digest', 'Daily Digest'),
+    ], string='Inquiry Notifications', default='instant',
+        help='Receive a mail per inquiry from the contact form, or a single mail a day listing them')
+    inquiry_digest_date = fields.Datetime(string='Last Inquiry Digest', readonly=True, copy=False)
+
     # SEO
     seo_keywords = fields.Char(string='SEO Keywords')
 
@@ -93,10 +145,26 @@ class RealEstateAgent(models.Model):
     linkedin_url = fields.Char(string='LinkedIn Profile')
     facebook_url = fields.Char(string='Facebook Profile')
 
-    @api.depends('property_ids', 'property_ids.is_published')
-    def _compute_active_property_count(self):
-        for agent in self:
-            agent.active_property_count = len(agent.property_ids.filtered('is_published'))
+    def init(self):
+        super().init()
+        create_index(
+            self.env.cr, 'real_estate_agent_recommended_score_id_idx', self._table,
+            ['recommended_score DESC', 'id DESC'], where='is_active',
+        )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        for vals in vals_list:
+            vals['total_sales_volume'] = vals.get('prior_sales_volume') or 0
+            vals['total_deals'] = vals.get('prior_deals') or 0
+            vals['active_property_count'] = 0
+        return super().create(vals_list)
+
+    def write(self, vals):
+        res = super().write(vals)
+        if AGENT_PRIOR_FIELDS & vals.keys():
+            self._reconcile_aggregates()
+        return res
 
     @api.constrains('email')
     def _check_email(self):
@@ -110,6 +178,220 @@ class RealEstateAgent(models.Model):
             if agent.avg_rating < 0 or agent.avg_rating > 5:
                 raise ValidationError("Rating must be between 0 and 5")
 
+    @api.model
+    def _get_directory_stats(self):
+        """Return ``(city_facets, total)`` for the active agents
+
+        ``city_facets`` holds ``[city, count]`` pairs sorted by city. Both are
+        aggregated in one query and cached until an agent changes (see
+        _get_agent_data_version).
+        """
+        def build():
+            groups = self._read_group([('is_active', '=', True)], ['city'], ['__count'], order='city')
+            return [(city, count) for city, count in groups if city], sum(count for _city, count in groups)
+
+        return self._get_cached_aggregate('directory_stats', self._get_agent_data_version(), [], build)
+
+    # -------------------- DIRECTORY --------------------
+    @api.model
+    def _get_directory_domain(self, search='', city='', expertise=''):
+        domain = [('is_active', '=', True)]
+        if search:
+            domain += self._get_search_domain(search)
+        if city:
+            domain.append(('city', '=', city))
+        if expertise:
+            domain.append(('expertise_level', '=', expertise))
+        return domain
+
+    @api.model
+    def _get_directory_count(self, search='', city='', expertise=''):
+        """Number of agents matching the filters, cached until an agent changes"""
+        return self._get_cached_aggregate(
+            'directory_count', self._get_agent_data_version(), [search, city, expertise],
+            lambda: self.search_count(self._get_directory_domain(search, city, expertise)),
+        )
+
+    @api.model
+    def _get_directory_page(self, field_names, search='', city='', expertise='', sort='recommended', page=1,
+                            limit=DIRECTORY_PAGE_SIZE):
+        """Rows of one page of the directory, best search matches first when sorting by ``relevance``"""
+        domain = self._get_directory_domain(search, city, expertise)
+        offset = (page - 1) * limit
+        if sort == 'relevance' and search:
+            ids = self._search_ranked(domain, search, limit=limit, offset=offset)
+            position = {agent_id: index for index, agent_id in enumerate(ids)}
+            rows = self._fetch_public_rows([('id', 'in', ids)], field_names, image_fields=['image'])
+            rows.sort(key=lambda row: position[row['id']])
+            return rows
+        order = DIRECTORY_SORTS.get(sort, DIRECTORY_SORTS['recommended'])
+        return self._fetch_public_rows(
+            domain, field_names, image_fields=['image'], order=order, limit=limit, offset=offset,
+        )
+
+    @api.model
+    def _get_agent_data_version(self):
+        """Token changing with any create, write or unlink of an agent"""
+        [(last_write, count)] = self.with_context(active_test=False)._read_group(
+            [], [], ['write_date:max', '__count'],
+        )
+        return f'{last_write}|{count}'
+
+    @api.model
+    def _get_directory_version(self):
+        """Token changing whenever the content of a directory page may change"""
+        [(property_write, property_count)] = self.env['property.property']._read_group(
+            [('agent_id', '!=', False)], [], ['write_date:max', '__count'],
+        )
+        scores_date = self.env['ir.config_parameter'].sudo().get_param('real_estate.agent_scores_date', '')
+        return f'{self._get_agent_data_version()}|{property_write}|{property_count}|{scores_date}'
+
+    # -------------------- AGGREGATES --------------------
+    @api.model
+    def _apply_aggregate_deltas(self, deltas):
+        """Add ``{agent_id: (listings, deals, volume)}`` to the aggregates of the agents in one UPDATE
+
+        The increments are applied in SQL, so that concurrent transactions
+        changing properties of the same agent add up instead of overwriting
+        each other's counts.
+        """
+        deltas = {agent_id: delta for agent_id, delta in deltas.items() if any(delta)}
+        if not deltas:
+            return
+        self.flush_model(AGENT_AGGREGATE_FIELDS)
+        values = SQL(", ").join(
+            SQL("(%s, %s, %s, %s::numeric)", agent_id, listings, deals, volume)
+            for agent_id, (listings, deals, volume) in sorted(deltas.items())
+        )
+        self.env.cr.execute(SQL(
+            """
+            UPDATE real_estate_agent a
+               SET active_property_count = coalesce(a.active_property_count, 0) + d.listings,
+                   total_deals = coalesce(a.total_deals, 0) + d.deals,
+                   total_sales_volume = coalesce(a.total_sales_volume, 0) + d.volume
+              FROM (VALUES %s) AS d(id, listings, deals, volume)
+             WHERE a.id = d.id
+            """,
+            values,
+        ))
+        self.browse(deltas).invalidate_recordset(AGENT_AGGREGATE_FIELDS)
+
+    def _reconcile_aggregates(self):
+        """Recompute the aggregates of the agents (all of them if empty) from their properties in SQL
+
+        Returns the number of agents whose stored aggregates were wrong.
+        """
+        self.flush_model()
+        self.env['property.property'].flush_model(['agent_id', 'is_published', 'deal_state', 'closing_price'])
+        agent_filter = SQL("WHERE a.id IN %s", tuple(self.ids)) if self else SQL()
+        self.env.cr.execute(SQL(
+            """
+            WITH stats AS (
+                SELECT a.id,
+                       count(p.id) FILTER (WHERE p.is_published) AS listings,
+                       count(p.id) FILTER (WHERE p.deal_state = 'closed') AS deals,
+                       coalesce(sum(p.closing_price) FILTER (WHERE p.deal_state = 'closed'), 0) AS volume
+                  FROM real_estate_agent a
+             LEFT JOIN property_property p ON p.agent_id = a.id
+                %s
+              GROUP BY a.id
+            )
+            UPDATE real_estate_agent a
+               SET active_property_count = s.listings,
+                   total_deals = coalesce(a.prior_deals, 0) + s.deals,
+                   total_sales_volume = coalesce(a.prior_sales_volume, 0) + s.volume,
+                   write_date = now() at time zone 'UTC'
+              FROM stats s
+             WHERE s.id = a.id
+               AND (a.active_property_count IS DISTINCT FROM s.listings
+                    OR a.total_deals IS DISTINCT FROM coalesce(a.prior_deals, 0) + s.deals
+                    OR a.total_sales_volume IS DISTINCT FROM coalesce(a.prior_sales_volume, 0) + s.volume)
+            """,
+            agent_filter,
+        ))
+        fixed = self.env.cr.rowcount
+        self.invalidate_model(AGENT_AGGREGATE_FIELDS + ['write_date'])
+        return fixed
+
+    @api.model
+    def _cron_reconcile_aggregates(self):
+        """Correct the aggregates of every agent, should an increment have been missed"""
+        fixed = self.browse()._reconcile_aggregates()
+        if fixed:
+            _logger.warning("Aggregates of %s agents were out of date and have been recomputed", fixed)
+
+    @api.model
+    def _init_aggregates(self):
+        """Compute the aggregates maintained from the properties
+
+        The totals entered by hand before are kept as the prior deals and
+        sales volume by the 1.2 pre-migration.
+        """
+        self.browse()._reconcile_aggregates()
+
+    # -------------------- RECOMMENDED SCORE --------------------
+    @api.model
+    def _cron_compute_recommended_scores(self):
+        """Recompute the recommended score of every agent in one SQL statement
+
+        Sales volume, deals and active listings count by percentile among
+        the active agents, the rating is shrunk towards a prior mean for
+        agents with few reviews, and recency decays exponentially with the
+        age of the agent's last listing. Inactive agents score 0.
+        """
+        self.flush_model()
+        self.env['property.property'].flush_model(['agent_id', 'create_date'])
+        weights = RECOMMENDED_SCORE_WEIGHTS
+        prior_rating, prior_reviews = RECOMMENDED_RATING_PRIOR
+        self.env.cr.execute(SQL(
+            """
+            WITH last_listing AS (
+                SELECT agent_id, max(create_date) AS date
+                  FROM property_property
+                 WHERE agent_id IS NOT NULL
+              GROUP BY agent_id
+            ), components AS (
+                SELECT a.id,
+                       percent_rank() OVER (ORDER BY coalesce(a.total_sales_volume, 0)) AS sales,
+                       percent_rank() OVER (ORDER BY coalesce(a.total_deals, 0)) AS deals,
+                       percent_rank() OVER (ORDER BY coalesce(a.active_property_count, 0)) AS listings,
+                       (coalesce(a.avg_rating, 0) * coalesce(a.review_count, 0) + %(prior_rating)s * %(prior_reviews)s)
+                           / (coalesce(a.review_count, 0) + %(prior_reviews)s) / 5.0 AS rating,
+                       exp(-extract(epoch FROM now() at time zone 'UTC' - coalesce(l.date, a.create_date))
+                           / 86400.0 / %(recency_days)s) AS recency
+                  FROM real_estate_agent a
+             LEFT JOIN last_listing l ON l.agent_id = a.id
+                 WHERE a.is_active
+            ), scores AS (
+                SELECT a.id,
+                       coalesce(round((100 * (%(w_sales)s * c.sales + %(w_deals)s * c.deals + %(w_rating)s * c.rating
+                                              + %(w_listings)s * c.listings + %(w_recency)s * c.recency))::numeric, 2),
+                                0) AS score
+                  FROM real_estate_agent a
+             LEFT JOIN components c ON c.id = a.id
+            )
+            UPDATE real_estate_agent a
+               SET recommended_score = s.score
+              FROM scores s
+             WHERE s.id = a.id AND a.recommended_score IS DISTINCT FROM s.score
+            """,
+            prior_rating=prior_rating, prior_reviews=prior_reviews, recency_days=RECOMMENDED_RECENCY_DAYS,
+            w_sales=weights['sales'], w_deals=weights['deals'], w_rating=weights['rating'],
+            w_listings=weights['listings'], w_recency=weights['recency'],
+        ))
+        _logger.info("Recommended score of %s agents updated", self.env.cr.rowcount)
+        self.invalidate_model(['recommended_score'])
+        self.env['ir.config_parameter'].sudo().set_param(
+            'real_estate.agent_scores_date', fields.Datetime.to_string(fields.Datetime.now()),
+        )
+
+    def _get_image_url(self):
+        """Cacheable URL of the profile photo, empty if the agent has none"""
+        self.ensure_one()
+        if not self.with_context(bin_size=True).image:
+            return ''
+        return image_url(self._name, self.id, 'image', self.write_date)
+
     def action_view_properties(self):
         """View all properties assigned to this agent"""
         return {
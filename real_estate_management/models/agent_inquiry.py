@@ -0,0 +1,175 @@
+from odoo import models, fields, api
+from odoo.tools import SQL, plaintext2html
+from odoo.tools.sql import create_index
+from markupsafe import Markup
+from datetime import timedelta
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Inquiries accepted from one IP address, and for one agent: (count, seconds), per worker
+INQUIRY_IP_LIMIT = (5, 600)
+INQUIRY_AGENT_LIMIT = (30, 3600)
+
+# Longest stored values of the contact form
+INQUIRY_FIELD_MAX_LENGTH = 200
+INQUIRY_MESSAGE_MAX_LENGTH = 4000
+
+# Inquiries notified per dispatcher run
+INQUIRY_DISPATCH_BATCH = 500
+
+# Agents receiving more inquiries than this in one run get them in a single digest mail
+INQUIRY_DIGEST_THRESHOLD = 3
+
+# Time between two digests of the agents notified in digest mode
+INQUIRY_DIGEST_INTERVAL = timedelta(days=1)
+
+
+class AgentInquiry(models.Model):
+    _name = 'agent.inquiry'
+    _description = 'Agent Inquiry'
+    _order = 'id desc'
+
+    agent_id = fields.Many2one('real.estate.agent', string='Agent', required=True, ondelete='cascade', index=True)
+    property_id = fields.Many2one('property.property', string='Property', ondelete='set null')
+    name = fields.Char(string='Name', required=True)
+    email = fields.Char(string='Email', required=True)
+    phone = fields.Char(string='Phone')
+    message = fields.Text(string='Message')
+    ip_address = fields.Char(string='IP Address', readonly=True)
+    notification_state = fields.Selection([
+        ('pending', 'Pending'),
+        ('sent', 'Sent'),
+    ], string='Notification', default='pending', required=True, readonly=True)
+    notification_date = fields.Datetime(string='Notified On', readonly=True)
+
+    def init(self):
+        super().init()
+        create_index(
+            self.env.cr, 'agent_inquiry_pending_idx', self._table, ['id'], where="notification_state = 'pending'",
+        )
+
+    @api.model
+    def _sanitize_inquiry(self, params):
+        """Stored values of a contact form, None if its name or email is missing"""
+        values = {
+            fname: (params.get(fname) or '').strip()[:INQUIRY_FIELD_MAX_LENGTH]
+            for fname in ('name', 'email', 'phone')
+        }
+        values['message'] = (params.get('message') or '').strip()[:INQUIRY_MESSAGE_MAX_LENGTH]
+        try:
+            values['property_id'] = int(params.get('property_id') or 0) or None
+        except (TypeError, ValueError):
+            values['property_id'] = None
+        if not values['name'] or '@' not in values['email']:
+            return None
+        return values
+
+    @api.model
+    def _record_inquiry(self, agent_id, values, ip_address):
+        """Store an inquiry for an active agent in a single statement
+
+        The agent is checked, the inquiry inserted and the agent's contact
+        details read back in one round trip; the notification is left to
+        the dispatcher. Returns ``(name, email, phone)`` of the agent, None
+        if it does not exist or is inactive.
+        """
+        self.env.cr.execute(SQL(
+            """
+            WITH agent AS (
+                SELECT id, name, email, phone
+                  FROM real_estate_agent
+                 WHERE id = %(agent_id)s AND is_active
+            ), inquiry AS (
+                INSERT INTO agent_inquiry (agent_id, property_id, name, email, phone, message, ip_address,
+                                           notification_state, create_uid, create_date, write_uid, write_date)
+                SELECT agent.id, (SELECT id FROM property_property WHERE id = %(property_id)s),
+                       %(name)s, %(email)s, %(phone)s, %(message)s, %(ip_address)s, 'pending',
+                       %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+                  FROM agent
+             RETURNING id
+            )
+            SELECT agent.name, agent.email, agent.phone FROM agent, inquiry
+            """,
+            agent_id=agent_id, ip_address=ip_address, uid=self.env.uid, **values,
+        ))
+        return self.env.cr.fetchone()
+
+    # -------------------- NOTIFICATIONS --------------------
+    @api.model
+    def _cron_dispatch_notifications(self, batch_size=INQUIRY_DISPATCH_BATCH):
+        """Queue the notification mails of the pending inquiries
+
+        Inquiries are grouped per agent: an agent gets a mail per inquiry,
+        or one digest when it received many of them since the last run.
+        Agents in digest mode get their inquiries once a day. The mails are
+        sent by the mail queue, never during the request that stored them.
+        """
+        now = fields.Datetime.now()
+        self.env.cr.execute(SQL(
+            """
+            SELECT i.id
+              FROM agent_inquiry i
+              JOIN real_estate_agent a ON a.id = i.agent_id
+             WHERE i.notification_state = 'pending'
+               AND (a.inquiry_notification IS DISTINCT FROM 'digest'
+                    OR a.inquiry_digest_date IS NULL OR a.inquiry_digest_date <= %s)
+          ORDER BY i.id
+             LIMIT %s
+               FOR UPDATE OF i SKIP LOCKED
+            """,
+            now - INQUIRY_DIGEST_INTERVAL, batch_size,
+        ))
+        inquiries = self.browse([row[0] for row in self.env.cr.fetchall()])
+        if not inquiries:
+            return
+
+        mail_values = []
+        digest_agents = self.env['real.estate.agent']
+        for agent, agent_inquiries in inquiries.grouped('agent_id').items():
+            if agent.inquiry_notification == 'digest':
+                digest_agents |= agent
+            if agent.inquiry_notification == 'digest' or len(agent_inquiries) > INQUIRY_DIGEST_THRESHOLD:
+                mail_values.append(agent_inquiries._prepare_digest_mail_values(agent))
+            else:
+                mail_values.extend(inquiry._prepare_mail_values() for inquiry in agent_inquiries)
+        self.env['mail.mail'].sudo().create(mail_values)
+        inquiries.write({'notification_state': 'sent', 'notification_date': now})
+        digest_agents.write({'inquiry_digest_date': now})
+        _logger.info("Queued %s notification mails for %s agent inquiries", len(mail_values), len(inquiries))
+
+    def _get_mail_details(self):
+        """HTML summary of an inquiry, the part of the notification mails describing it"""
+        self.ensure_one()
+        details = Markup("<p><strong>%s</strong> &lt;%s&gt;") % (self.name, self.email)
+        if self.phone:
+            details += Markup("<br/>Phone: %s") % self.phone
+        if self.property_id:
+            details += Markup("<br/>Property: %s") % self.property_id.name
+        details += Markup("</p>")
+        if self.message:
+            details += plaintext2html(self.message)
+        return details
+
+    def _prepare_mail_values(self):
+        self.ensure_one()
+        return {
+            'subject': f"New inquiry from {self.name}",
+            'email_from': self.env.company.email_formatted,
+            'email_to': self.agent_id.email,
+            'reply_to': self.email,
+            'body_html': Markup("<p>Dear %s,</p><p>You received a new inquiry on the website:</p>%s")
+                         % (self.agent_id.name, self._get_mail_details()),
+            'auto_delete': True,
+        }
+
+    def _prepare_digest_mail_values(self, agent):
+        return {
+            'subject': f"{len(self)} new inquiries",
+            'email_from': self.env.company.email_formatted,
+            'email_to': agent.email,
+            'body_html': Markup("<p>Dear %s,</p><p>You received %s new inquiries on the website:</p>%s") % (
+                agent.name, len(self), Markup("<hr/>").join(inquiry._get_mail_details() for inquiry in self),
+            ),
+            'auto_delete': True,
+        }
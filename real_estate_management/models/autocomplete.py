@@ -0,0 +1,155 @@
+from odoo import models, api
+from datetime import timedelta
+from .search_mixin import normalize_search_text
+from ..tools.prefix_index import PrefixIndex
+import logging
+import re
+import threading
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Records suggested by the search boxes: model -> (domain, {field: suggestion kind}, URL of the record kind)
+AUTOCOMPLETE_SOURCES = {
+    'property.property': (
+        [('is_published', '=', True)],
+        {'name': 'property', 'city': 'city', 'zip_code': 'zip', 'nearby_landmarks': 'landmark'},
+        '/property/%s',
+    ),
+    'real.estate.agent': (
+        [('is_active', '=', True)],
+        {'name': 'agent', 'city': 'city', 'zip_code': 'zip'},
+        '/agent/%s',
+    ),
+}
+AUTOCOMPLETE_LIMIT = 10
+
+# Seconds between two checks for changed records, per worker
+AUTOCOMPLETE_CHECK_INTERVAL = 2.0
+
+# Changed records are looked up from a bit before the last seen write_date, to catch slow transactions
+AUTOCOMPLETE_WATERMARK_OVERLAP = timedelta(minutes=5)
+
+# Words of a label starting an index key (a key per word, up to this many)
+AUTOCOMPLETE_MAX_WORDS = 6
+
+# Separators of the landmarks listed in nearby_landmarks
+LANDMARK_SEPARATORS = re.compile(r'[,;\n•]+')
+
+# Prefix index of each database, per worker process
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+class RealEstateAutocomplete(models.AbstractModel):
+    _name = 'real.estate.autocomplete'
+    _description = 'Search box suggestions'
+
+    @api.model
+    def _autocomplete(self, term, limit=AUTOCOMPLETE_LIMIT, kinds=None):
+        """Suggestions for the search box ``term``, matching the start of any of their words
+
+        Answered from the worker's in-memory prefix index, built on first
+        use then refreshed with the records changed since. Returns dicts
+        with ``kind``, ``label``, ``url`` (empty unless the suggestion is a
+        record) and ``count`` (number of records sharing it).
+        """
+        prefix = normalize_search_text(term)
+        if not prefix:
+            return []
+        index = self._get_autocomplete_index()
+        return [
+            {'kind': kind, 'label': label, 'url': url, 'count': count}
+            for kind, label, url, count in index.search(prefix, limit=limit, kinds=kinds)
+        ]
+
+    # -------------------- INDEX --------------------
+    @api.model
+    def _get_autocomplete_entries(self, record, fields_kinds, url_pattern):
+        """``(key, kind, label, url)`` index entries of a record"""
+        entries = []
+        for fname, kind in fields_kinds.items():
+            value = record[fname]
+            if not value:
+                continue
+            labels = [value.strip()] if fname != 'nearby_landmarks' else [
+                label.strip(' -*') for label in LANDMARK_SEPARATORS.split(value)
+            ]
+            url = url_pattern % record.id if kind in ('property', 'agent') else ''
+            for label in labels:
+                words = normalize_search_text(label).split()
+                for start in range(min(len(words), AUTOCOMPLETE_MAX_WORDS)):
+                    entries.append((' '.join(words[start:]), kind, label, url))
+        return entries
+
+    @api.model
+    def _get_autocomplete_version(self, model_name):
+        """Last write date and number of rows of a model, changing with any create, write or unlink"""
+        Model = self.env[model_name].sudo().with_context(active_test=False)
+        [(last_write, count)] = Model._read_group([], [], ['write_date:max', '__count'])
+        return last_write, count
+
+    @api.model
+    def _get_autocomplete_index(self):
+        dbname = self.env.cr.dbname
+        state = _indexes.get(dbname)
+        if state is None:
+            with _indexes_lock:
+                state = _indexes.get(dbname)
+                if state is None:
+                    state = _indexes[dbname] = self._build_autocomplete_index()
+        elif time.monotonic() - state['checked'] > AUTOCOMPLETE_CHECK_INTERVAL:
+            state['checked'] = time.monotonic()
+            self._refresh_autocomplete_index(state)
+        return state['index']
+
+    @api.model
+    def _build_autocomplete_index(self):
+        started = time.monotonic()
+        documents = {}
+        versions = {}
+        for model_name, (domain, fields_kinds, url_pattern) in AUTOCOMPLETE_SOURCES.items():
+            versions[model_name] = self._get_autocomplete_version(model_name)
+            records = self.env[model_name].sudo().search_fetch(domain, list(fields_kinds))
+            for record in records:
+                documents[model_name, record.id] = self._get_autocomplete_entries(record, fields_kinds, url_pattern)
+        index = PrefixIndex()
+        index.load(documents)
+        _logger.info(
+            "Autocomplete index of %s built: %s records, %s keys in %.2fs",
+            self.env.cr.dbname, len(documents), len(index), time.monotonic() - started,
+        )
+        return {'index': index, 'versions': versions, 'checked': time.monotonic()}
+
+    @api.model
+    def _refresh_autocomplete_index(self, state):
+        """Apply the records created, changed or deleted since the index was last refreshed"""
+        index = state['index']
+        for model_name, (domain, fields_kinds, url_pattern) in AUTOCOMPLETE_SOURCES.items():
+            version = self._get_autocomplete_version(model_name)
+            previous = state['versions'].get(model_name)
+            if version == previous:
+                continue
+            Model = self.env[model_name].sudo().with_context(active_test=False)
+            field_names = list(fields_kinds) + ['create_date']
+            since = previous and previous[0]
+            if since:
+                domain_changed = [('write_date', '>=', since - AUTOCOMPLETE_WATERMARK_OVERLAP)]
+                changed = Model.search_fetch(domain_changed, field_names)
+            else:
+                changed = Model.search_fetch([], field_names)
+            listed = changed.filtered_domain(domain)
+            for record in changed:
+                if record in listed:
+                    entries = self._get_autocomplete_entries(record, fields_kinds, url_pattern)
+                    index.update((model_name, record.id), entries)
+                else:
+                    index.remove((model_name, record.id))
+
+            created = len(changed.filtered(lambda rec: since and rec.create_date > since))
+            if since and version[1] < previous[1] + created:
+                # rows were deleted: drop the documents whose record no longer exists
+                indexed = [doc_id for doc_model, doc_id in index.documents() if doc_model == model_name]
+                for record_id in set(indexed) - set(Model.browse(indexed).exists().ids):
+                    index.remove((model_name, record_id))
+            state['versions'][model_name] = version
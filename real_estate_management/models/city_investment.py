@@ -0,0 +1,177 @@
+from odoo import models, fields, api, SUPERUSER_ID
+from odoo.exceptions import UserError
+from ..tools.llm_client import LLMError, get_llm_client, to_html
+from datetime import timedelta
+from markupsafe import Markup
+import logging
+import zlib
+
+_logger = logging.getLogger(__name__)
+
+# First key of the two-key PostgreSQL advisory locks taken while generating
+CITY_INVESTMENT_LOCK_NAMESPACE = 7312
+
+# Keys of the JSON answered by the LLM for a city
+CITY_AI_KEYS = ('investment_reasons', 'growth_potential', 'infrastructure', 'market_trends')
+
+# Delay before a failed generation is attempted again
+CITY_INVESTMENT_RETRY_DELAY = timedelta(hours=1)
+
+# Cities generated per cron run
+CITY_INVESTMENT_BATCH = 20
+
+
+def normalize_city(city_name):
+    """Cache key of a city: case and whitespace insensitive"""
+    return ' '.join((city_name or '').split()).casefold()
+
+
+class CityInvestment(models.Model):
+    _name = 'city.investment'
+    _description = 'City Investment Insights'
+    _order = 'name'
+
+    name = fields.Char(string='City', required=True)
+    key = fields.Char(string='Key', required=True, index=True, readonly=True)
+    investment_reasons = fields.Html(string='Investment Reasons', readonly=True)
+    growth_potential = fields.Html(string='Growth Potential', readonly=True)
+    infrastructure = fields.Html(string='Infrastructure', readonly=True)
+    market_trends = fields.Html(string='Market Trends', readonly=True)
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Generated'),
+        ('failed', 'Failed'),
+    ], string='Status', default='pending', required=True, index=True)
+    date_generated = fields.Datetime(string='Generated On', readonly=True)
+    date_expires = fields.Datetime(string='Expires On', readonly=True, index=True)
+    next_attempt = fields.Datetime(string='Next Attempt', readonly=True)
+    last_error = fields.Text(string='Last Error', readonly=True)
+
+    _sql_constraints = [
+        ('key_uniq', 'unique(key)', 'Insights already exist for this city.'),
+    ]
+
+    # -------------------- LOOKUP --------------------
+    @api.model
+    def _get_info(self, city_name):
+        """Investment insights of ``city_name`` for the home page
+
+        Never calls the LLM: unknown cities are queued for the background
+        generation and get a placeholder meanwhile, expired ones keep being
+        served until they are regenerated. Only the cities of published
+        properties are queued, None is returned for any other name.
+        """
+        key = normalize_city(city_name)
+        if not key:
+            return None
+        info = self.search_fetch([('key', '=', key)], [
+            'investment_reasons', 'growth_potential', 'infrastructure', 'market_trends', 'date_generated',
+        ], limit=1)
+        if not info:
+            city_name = next((
+                city for city, _count in self.env['property.property']._get_city_facets()
+                if normalize_city(city) == key
+            ), None)
+            if not city_name:
+                return None
+            self.env.cr.execute("""
+                INSERT INTO city_investment (name, key, state, create_uid, create_date, write_uid, write_date)
+                     VALUES (%s, %s, 'pending', %s, now() at time zone 'UTC', %s, now() at time zone 'UTC')
+                ON CONFLICT (key) DO NOTHING
+            """, [city_name.strip(), key, self.env.uid, self.env.uid])
+            if self.env.cr.rowcount:
+                self.env.ref('real_estate_management.ir_cron_city_investment')._trigger()
+        if not info.date_generated:
+            return self._get_placeholder(city_name)
+        return {
+            'city': city_name,
+            'ai_investment_reasons': info.investment_reasons or '',
+            'ai_growth_potential': info.growth_potential or '',
+            'ai_infrastructure': info.infrastructure or '',
+            'ai_market_trends': info.market_trends or '',
+            'ai_content_generated': True,
+        }
+
+    @api.model
+    def _get_placeholder(self, city_name):
+        pending = Markup('<p>Our analysts are preparing insights for this city, check back shortly.</p>')
+        return {
+            'city': city_name,
+            'ai_investment_reasons': pending,
+            'ai_growth_potential': pending,
+            'ai_infrastructure': pending,
+            'ai_market_trends': pending,
+            'ai_content_generated': False,
+        }
+
+    # -------------------- GENERATION --------------------
+    @api.model
+    def _cron_generate(self):
+        """Generate the queued cities and refresh the expired ones"""
+        now = fields.Datetime.now()
+        cities = self.search([
+            '|', '|',
+            ('state', '=', 'pending'),
+            '&', ('state', '=', 'failed'), ('next_attempt', '<=', now),
+            '&', ('state', '=', 'done'), ('date_expires', '<=', now),
+        ], order='date_generated asc nulls first, id', limit=CITY_INVESTMENT_BATCH)
+        for city_id in cities.ids:
+            with self.env.registry.cursor() as cr:
+                env = api.Environment(cr, SUPERUSER_ID, {})
+                env['city.investment'].browse(city_id)._generate()
+        remaining = self.search_count([('state', '=', 'pending')])
+        if remaining:
+            self.env.ref('real_estate_management.ir_cron_city_investment')._trigger()
+
+    def _generate(self):
+        """Generate the insights of the city, once at a time per city
+
+        Returns False when another worker is already generating them.
+        """
+        self.ensure_one()
+        lock_id = zlib.crc32(self.key.encode('utf-8')) - 2 ** 31
+        self.env.cr.execute("SELECT pg_try_advisory_xact_lock(%s, %s)", [CITY_INVESTMENT_LOCK_NAMESPACE, lock_id])
+        if not self.env.cr.fetchone()[0]:
+            return False
+
+        _logger.info(f"📝 Generating city investment data for: {self.name}")
+        prompt = (
+            f"Create real estate investment summary for {self.name}, India.\n\n"
+            f"Return JSON with these keys (each as array of 2-3 bullet points):\n"
+            f"- investment_reasons: Why invest here\n"
+            f"- growth_potential: Future developments\n"
+            f"- infrastructure: Transport & amenities\n"
+            f"- market_trends: Current property trends\n\n"
+            f"Return ONLY valid JSON."
+        )
+        try:
+            city_data = get_llm_client(self.env).complete_json(prompt, keys=CITY_AI_KEYS)
+        except LLMError as e:
+            _logger.error(f"❌ City investment generation failed for {self.name}: {e}")
+            self.write({
+                'state': 'failed',
+                'last_error': str(e),
+                'next_attempt': fields.Datetime.now() + CITY_INVESTMENT_RETRY_DELAY,
+            })
+            return True
+
+        ttl_days = int(self.env['ir.config_parameter'].sudo().get_param('real_estate.city_investment_ttl_days', 30))
+        now = fields.Datetime.now()
+        self.write({
+            'investment_reasons': to_html(city_data.get('investment_reasons', '')),
+            'growth_potential': to_html(city_data.get('growth_potential', '')),
+            'infrastructure': to_html(city_data.get('infrastructure', '')),
+            'market_trends': to_html(city_data.get('market_trends', '')),
+            'state': 'done',
+            'date_generated': now,
+            'date_expires': now + timedelta(days=ttl_days),
+            'last_error': False,
+        })
+        _logger.info(f"✅ City investment data saved for {self.name}")
+        return True
+
+    def action_refresh(self):
+        """Button to regenerate the insights now"""
+        for rec in self:
+            if not rec._generate():
+                raise UserError(f"The insights of {rec.name} are already being generated.")
@@ -1,15 +1,36 @@
 from odoo import models, fields, api, _
+from ..tools.llm_client import LLMError, get_llm_client, to_html
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import logging
-import requests
-import json
+import time
 
 _logger = logging.getLogger(__name__)
 
+# Fields used in the AI prompt, changing them queues a regeneration
+AI_PROMPT_FIELDS = {'name', 'city', 'price', 'plot_area'}
+
+# Keys of the JSON answered by the LLM for a property
+PROPERTY_AI_KEYS = ('key_highlights', 'investment_data', 'nearby_places', 'unique_features', 'lifestyle_benefits')
+
+# Properties packed in one LLM request in batch mode, and completion budget of each
+AI_BATCH_SIZE = 5
+AI_TOKENS_PER_PROPERTY = 800
+
+# Fields feeding the similar properties features (see property.similarity)
+SIMILARITY_FIELDS = {
+    'is_published', 'price', 'plot_area', 'category_id', 'facing_direction', 'title_status',
+    'latitude', 'longitude',
+}
+
+# Similar properties shown on the detail page
+SIMILAR_PROPERTIES_LIMIT = 6
+
 
 class Property(models.Model):
     _name = 'property.property'
-    _inherit = ['mail.thread', 'mail.activity.mixin']
+    _inherit = ['mail.thread', 'mail.activity.mixin', 'real.estate.public.data.mixin', 'real.estate.search.mixin']
     _description = 'Real Estate Property'
+    _search_document_fields = ('name', 'city', 'zip_code', 'street', 'short_description', 'nearby_landmarks')
 
     # Core details
     name = fields.Char(string='Property Name*', required=True, tracking=True)
@@ -55,6 +76,9 @@ class Property(models.Model):
 
     property_website_url = fields.Char(string='Property Website*')
     image = fields.Image(string='Cover Image')
+    card_image = fields.Image(string='Card Thumbnail', max_width=512, max_height=512, readonly=True, copy=False,
+                              help='Thumbnail of the cover image, or of the first gallery image, '
+                                   'used by the map, listings and agent pages')
 
     # Address
     street = fields.Char(string='Street*')
@@ -82,12 +106,10 @@ class Property(models.Model):
     gated_community = fields.Boolean(string='Gated Community')
 
     # Geolocation
-    latitude = fields.Float(string='Latitude', digits=(16, 5),
-                            compute='_compute_geolocation', store=True)
-    longitude = fields.Float(string='Longitude', digits=(16, 5),
-                             compute='_compute_geolocation', store=True)
-    date_localization = fields.Date(string='Geolocation Date',
-                                    compute='_compute_geolocation', store=True)
+    # Resolved in the background from the address, see property_geocode.py
+    latitude = fields.Float(string='Latitude', digits=(16, 5), copy=False)
+    longitude = fields.Float(string='Longitude', digits=(16, 5), copy=False)
+    date_localization = fields.Date(string='Geolocation Date', copy=False)
 
     # Contact Info
     contact_name = fields.Char(string='Contact Person*',required=True)
@@ -128,14 +150,35 @@ class Property(models.Model):
     ai_content_generated = fields.Boolean(default=False)
     ai_generation_date = fields.Datetime()
 
-    # ==================== CITY INVESTMENT FIELDS ====================
-    city_investment_reasons = fields.Html(string='City Investment Reasons', readonly=True)
-    city_growth_potential = fields.Html(string='City Growth Potential', readonly=True)
-    city_infrastructure = fields.Html(string='City Infrastructure', readonly=True)
-    city_market_trends = fields.Html(string='City Market Trends', readonly=True)
-    city_investment_generated = fields.Boolean(default=False)
-    city_investment_date = fields.Datetime()
-    last_city_processed = fields.Char(string='Last City Processed')
+    similarity_dirty = fields.Boolean(string='Similar Properties Outdated', default=True, copy=False, index=True,
+                                      help='Set when the features of the property change, '
+                                           'cleared once its similar properties are recomputed.')
+
+    # -------------------- CRUD --------------------
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        records.filtered(lambda rec: rec.image or rec.gallery_image_ids)._refresh_card_image()
+        if not self.env.context.get('skip_ai_generation'):
+            self.env['property.ai.job'].sudo()._enqueue(records)
+        return records
+
+    def write(self, vals):
+        if SIMILARITY_FIELDS & vals.keys():
+            vals = dict(vals, similarity_dirty=True)
+        res = super().write(vals)
+        if 'image' in vals or 'gallery_image_ids' in vals:
+            self._refresh_card_image()
+        if AI_PROMPT_FIELDS & vals.keys() and not self.env.context.get('skip_ai_generation'):
+            self.env['property.ai.job'].sudo()._enqueue(self)
+        return res
+
+    def unlink(self):
+        # the properties listing these ones as similar must look for others
+        self.env['property.similarity'].sudo().search([
+            ('neighbour_id', 'in', self.ids),
+        ]).property_id.filtered(lambda rec: rec not in self).write({'similarity_dirty': True})
+        return super().unlink()
 
     # -------------------- COMPUTE METHODS --------------------
     @api.depends('price', 'plot_area')
@@ -153,71 +196,93 @@ class Property(models.Model):
         for rec in self:
             rec.image_count = len(rec.gallery_image_ids)
 
-    @api.depends('street', 'street2', 'city', 'zip_code', 'state_id', 'country_id')
-    def _compute_geolocation(self):
-        geo = self.env['base.geocoder']
-        for rec in self:
-            # Construct full address
-            street = ' '.join(filter(None, [rec.street, rec.street2]))
-            address_components = {
-                'street': street,
-                'zip': rec.zip_code or '',
-                'city': rec.city or '',
-                'state': rec.state_id.name or '',
-                'country': rec.country_id.name or '',
-            }
-            if not (address_components['street'] or address_components['zip'] or address_components['city']):
-                rec.latitude = rec.longitude = False
-                rec.date_localization = False
-                _logger.info(f"Skipping geocode for {rec.name}: insufficient address info {address_components}")
-                continue
-
-            try:
-                # Log the query
-                _logger.info(f"Geocoding property {rec.name} with params: {address_components}")
-
-                # Query geocoder with structured parameters
-                query = geo.geo_query_address(**address_components)
-                coords = geo.geo_find(query, force_country=address_components['country'])
-
-                # Fallback: try single string query if structured fails
-                if not coords or len(coords) != 2:
-                    address_str = ', '.join(
-                        filter(None, [rec.street, rec.street2, rec.city, rec.state_id.name, rec.country_id.name]))
-                    _logger.info(
-                        f"Structured geocode failed for {rec.name}, trying fallback with address string: {address_str}")
-                    coords = geo.geo_find(address_str)
-
-                if coords and len(coords) == 2:
-                    rec.latitude, rec.longitude = coords
-                    rec.date_localization = fields.Date.context_today(rec)
-                    _logger.info(f"Geocoded {rec.name}: latitude={rec.latitude}, longitude={rec.longitude}")
-                else:
-                    rec.latitude = rec.longitude = False
-                    rec.date_localization = False
-                    _logger.error(f"Geocode failed for {rec.name}: {address_components}")
+    # -------------------- FACETS --------------------
+    @api.model
+    def _get_city_facets(self):
+        """``[city, count]`` pairs of the published properties, sorted by city
+
+        Aggregated in the database and cached until the published properties
+        change (see _get_map_data_version).
+        """
+        def build():
+            return self._read_group(
+                [('is_published', '=', True), ('city', '!=', False)], ['city'], ['__count'], order='city',
+            )
 
-            except Exception as e:
-                rec.latitude = rec.longitude = False
-                rec.date_localization = False
-                _logger.error(f"Geocode error for {rec.name}: {e}")
+        return self._get_cached_aggregate('city_facets', self._get_map_data_version(), [], build)
 
-    def generate_ai_content(self):
-        """Generate AI content using FREE Groq API"""
+    # -------------------- SIMILAR PROPERTIES --------------------
+    def _get_similar_properties(self, limit=SIMILAR_PROPERTIES_LIMIT):
+        """Published properties closest to this one, nearest first
+
+        Read from the neighbours precomputed by ``property.similarity``; until
+        they are computed, falls back to properties of the same category in
+        a +/- 20% price range.
+        """
         self.ensure_one()
+        similar = self.env['property.similarity'].sudo().search_fetch([
+            ('property_id', '=', self.id),
+            ('neighbour_id.is_published', '=', True),
+        ], ['neighbour_id'], limit=limit).neighbour_id
+        if similar:
+            return similar
+        domain = [
+            ('id', '!=', self.id),
+            ('is_published', '=', True),
+            ('category_id', '=', self.category_id.id),
+        ]
+        similar = self.search(domain + [
+            ('price', '>=', self.price * 0.8),
+            ('price', '<=', self.price * 1.2),
+        ], limit=limit)
+        if len(similar) < limit:
+            similar |= self.search(domain + [('id', 'not in', similar.ids)], limit=limit - len(similar))
+        return similar
+
+    # -------------------- THUMBNAILS --------------------
+    def _refresh_card_image(self):
+        """Generate the card thumbnail once from the cover or first gallery image"""
+        for rec in self:
+            rec.card_image = rec.image or rec.gallery_image_ids[:1].datas or False
 
-        # Get Groq API key (FREE from https://console.groq.com)
-        api_key = self.env['ir.config_parameter'].sudo().get_param('groq.api_key')
+    @api.model
+    def _init_card_images(self):
+        """Generate the card thumbnails missing on existing properties"""
+        done_ids = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_field', '=', 'card_image'),
+        ]).mapped('res_id')
+        missing = self.search([('id', 'not in', done_ids)])
+        missing.filtered(lambda rec: rec.image or rec.gallery_image_ids)._refresh_card_image()
+
+    def _get_ai_prompt_details(self):
+        self.ensure_one()
+        return (
+            f"'{self.name}' in {self.city}.\n"
+            f"Price: ₹{self.price:,.0f}, Area: {self.plot_area} sqft"
+        )
 
-        if not api_key:
-            _logger.error("❌ Groq API key not configured. Get free key from https://console.groq.com")
-            return False
+    @api.model
+    def _prepare_ai_content_values(self, ai_data):
+        """Values of the ``ai_*`` fields from the JSON answered by the LLM"""
+        empty = '<ul><li>Information not available</li></ul>'
+        return {
+            'ai_key_highlights': to_html(ai_data.get('key_highlights', []), empty),
+            'ai_investment_data': to_html(ai_data.get('investment_data', []), empty),
+            'ai_nearby_places': to_html(ai_data.get('nearby_places', []), empty),
+            'ai_unique_features': to_html(ai_data.get('unique_features', []), empty),
+            'ai_lifestyle_benefits': to_html(ai_data.get('lifestyle_benefits', []), empty),
+            'ai_content_generated': True,
+            'ai_generation_date': fields.Datetime.now(),
+        }
 
+    def generate_ai_content(self):
+        """Generate AI content using FREE Groq API"""
+        self.ensure_one()
         _logger.info(f"🔄 Generating AI content for property: {self.name}")
 
         prompt = (
-            f"Generate real estate data for '{self.name}' in {self.city}.\n"
-            f"Price: ₹{self.price:,.0f}, Area: {self.plot_area} sqft\n\n"
+            f"Generate real estate data for {self._get_ai_prompt_details()}\n\n"
             f"Return JSON with these keys (each as array of 3-4 points):\n"
             f"- key_highlights\n"
             f"- investment_data\n"
@@ -227,241 +292,128 @@ class Property(models.Model):
             f"Return ONLY valid JSON."
         )
 
-        headers = {
-            'Authorization': f'Bearer {api_key}',
-            'Content-Type': 'application/json'
-        }
-
-        payload = {
-            'model': 'llama-3.3-70b-versatile',  # FREE Groq model
-            'messages': [
-                {'role': 'system', 'content': 'You are a real estate analyst. Return only JSON.'},
-                {'role': 'user', 'content': prompt}
-            ],
-            'max_tokens': 800,
-            'temperature': 0.3
-        }
+        try:
+            ai_data = get_llm_client(self.env).complete_json(prompt, keys=PROPERTY_AI_KEYS)
+        except LLMError as e:
+            _logger.error(f"❌ AI generation failed for property {self.id}: {e}")
+            return False
 
+        self.with_context(skip_ai_generation=True).write(self._prepare_ai_content_values(ai_data))
+        _logger.info(f"✅ AI content saved for property: {self.name}")
+        return True
+
+    def _generate_ai_content_batch(self, batch_size=None, concurrency=None):
+        """Generate the AI content of many properties with few LLM requests
+
+        Properties are packed ``batch_size`` per prompt, and up to
+        ``concurrency`` prompts run at once (the LLM client bounds the
+        worker-wide total). Answers are written back as they arrive;
+        progress and throughput are logged and reported to the running cron.
+
+        Returns ``{'done': count, 'failed': {property_id: error}, 'elapsed': seconds}``.
+        """
+        params = self.env['ir.config_parameter'].sudo()
+        batch_size = batch_size or max(1, int(params.get_param('real_estate.ai_batch_properties', AI_BATCH_SIZE)))
+        concurrency = concurrency or max(1, int(params.get_param('real_estate.ai_job_concurrency', 2)))
+        started = time.monotonic()
+        result = {'done': 0, 'failed': {}, 'elapsed': 0.0}
+        if not self:
+            return result
         try:
-            _logger.info("📤 Calling FREE Groq API...")
+            client = get_llm_client(self.env)
+        except LLMError as e:
+            _logger.error(f"❌ AI batch generation not possible: {e}")
+            result['failed'] = dict.fromkeys(self.ids, str(e))
+            return result
+
+        # prompts are built here, the threads only wait on the LLM
+        batches = []
+        for start in range(0, len(self), batch_size):
+            batch = self[start:start + batch_size]
+            details = '\n'.join(f"- id {rec.id}: {rec._get_ai_prompt_details()}" for rec in batch)
+            prompt = (
+                f"Generate real estate data for each of these properties:\n{details}\n\n"
+                f"Return a JSON object mapping each id (as a string) to an object with these keys "
+                f"(each as array of 3-4 points):\n"
+                f"- key_highlights\n"
+                f"- investment_data\n"
+                f"- nearby_places\n"
+                f"- unique_features\n"
+                f"- lifestyle_benefits\n"
+                f"Return ONLY valid JSON."
+            )
+            batches.append((batch.ids, prompt))
 
-            response = requests.post(
-                'https://api.groq.com/openai/v1/chat/completions',  # Groq endpoint
-                headers=headers,
-                json=payload,
-                timeout=30
+        def run(ids, prompt):
+            return client.complete_json(
+                prompt, keys={str(pid): PROPERTY_AI_KEYS for pid in ids}, max_tokens=AI_TOKENS_PER_PROPERTY * len(ids),
             )
 
-            _logger.info(f"📥 Response status: {response.status_code}")
-
-            if response.status_code != 200:
-                _logger.error(f"API Error: {response.text}")
-                return False
-
-            response_data = response.json()
-            response_text = response_data['choices'][0]['message']['content'].strip()
-
-            # Clean JSON
-            if response_text.startswith('```'):
-                lines = response_text.split('\n')
-                response_text = '\n'.join(lines[1:-1]) if len(lines) > 2 else response_text
-                response_text = response_text.replace('```json', '').replace('```', '').strip()
-
-            try:
-                ai_data = json.loads(response_text)
-                _logger.info(f"✅ Parsed AI data with keys: {list(ai_data.keys())}")
-            except json.JSONDecodeError as e:
-                _logger.error(f"JSON parse error: {e}\nResponse: {response_text}")
-                return False
-
-            # Convert to HTML
-            def to_html(data):
-                if not data:
-                    return '<ul><li>Information not available</li></ul>'
-                if isinstance(data, list):
-                    items = ''.join([f'<li>{item}</li>' for item in data])
-                    return f'<ul>{items}</ul>'
-                return f'<ul><li>{data}</li></ul>'
-
-            self.write({
-                'ai_key_highlights': to_html(ai_data.get('key_highlights', [])),
-                'ai_investment_data': to_html(ai_data.get('investment_data', [])),
-                'ai_nearby_places': to_html(ai_data.get('nearby_places', [])),
-                'ai_unique_features': to_html(ai_data.get('unique_features', [])),
-                'ai_lifestyle_benefits': to_html(ai_data.get('lifestyle_benefits', [])),
-                'ai_content_generated': True,
-                'ai_generation_date': fields.Datetime.now(),
-            })
-
-            _logger.info(f"✅ AI content saved for property: {self.name}")
-            return True
-
-        except Exception as e:
-            _logger.error(f"❌ Error: {e}")
-            return False
+        writer = self.with_context(skip_ai_generation=True, tracking_disable=True)
+        processed = 0
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='property_ai_batch') as executor:
+            futures = {executor.submit(run, ids, prompt): ids for ids, prompt in batches}
+            for future in as_completed(futures):
+                ids = futures[future]
+                try:
+                    answer = future.result()
+                except Exception as e:
+                    if not isinstance(e, LLMError):
+                        _logger.exception("AI batch of properties %s crashed", ids)
+                    result['failed'].update(dict.fromkeys(ids, str(e)))
+                else:
+                    for pid in ids:
+                        ai_data = answer.get(str(pid))
+                        if isinstance(ai_data, dict):
+                            writer.browse(pid).write(self._prepare_ai_content_values(ai_data))
+                            result['done'] += 1
+                        else:
+                            result['failed'][pid] = 'Property missing from the batch answer'
+                processed += len(ids)
+                elapsed = time.monotonic() - started
+                _logger.info(
+                    "AI batch generation: %s/%s properties, %.2f properties/s",
+                    processed, len(self), processed / elapsed if elapsed else 0.0,
+                )
+                self.env['ir.cron']._notify_progress(done=processed, remaining=len(self) - processed)
+        result['elapsed'] = time.monotonic() - started
+        return result
 
-    @api.model
-    def get_city_investment_info(self, city_name):
-        """Generate city investment info using FREE Groq API"""
-        if not city_name:
-            return None
-
-        # Check cache
-        cached = self.search([
-            ('last_city_processed', '=', city_name),
-            ('city_investment_generated', '=', True)
-        ], limit=1)
-
-        if cached:
-            _logger.info(f"✅ Found cached city data for {city_name}")
+    def action_regenerate_ai_content(self):
+        """Button to regenerate AI content"""
+        result = self._generate_ai_content_batch()
+        rate = result['done'] / result['elapsed'] if result['elapsed'] else 0.0
+        if result['failed']:
             return {
-                'city': city_name,
-                'ai_investment_reasons': cached.city_investment_reasons or '',
-                'ai_growth_potential': cached.city_growth_potential or '',
-                'ai_infrastructure': cached.city_infrastructure or '',
-                'ai_market_trends': cached.city_market_trends or '',
-                'ai_content_generated': True,
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': 'Error',
+                    'message': f"Failed to generate AI content for {len(result['failed'])} of {len(self)} "
+                               f"properties. Check logs.",
+                    'type': 'danger',
+                }
             }
-
-        # Get Groq API key
-        api_key = self.env['ir.config_parameter'].sudo().get_param('groq.api_key')
-
-        if not api_key:
-            _logger.error("❌ Groq API key not configured")
-            return {
-                'city': city_name,
-                'ai_investment_reasons': '<p>Please configure Groq API key to see investment data.</p>',
-                'ai_growth_potential': '<p>Get free API key from https://console.groq.com</p>',
-                'ai_infrastructure': '<p>Configuration needed.</p>',
-                'ai_market_trends': '<p>Configuration needed.</p>',
-                'ai_content_generated': False,
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'Success',
+                'message': f"AI content regenerated for {result['done']} properties "
+                           f"in {result['elapsed']:.1f}s ({rate:.2f} properties/s).",
+                'type': 'success',
             }
-
-        _logger.info(f"📝 Generating city investment data for: {city_name}")
-
-        prompt = (
-            f"Create real estate investment summary for {city_name}, India.\n\n"
-            f"Return JSON with these keys (each as array of 2-3 bullet points):\n"
-            f"- investment_reasons: Why invest here\n"
-            f"- growth_potential: Future developments\n"
-            f"- infrastructure: Transport & amenities\n"
-            f"- market_trends: Current property trends\n\n"
-            f"Return ONLY valid JSON."
-        )
-
-        headers = {
-            'Authorization': f'Bearer {api_key}',
-            'Content-Type': 'application/json'
-        }
-
-        payload = {
-            'model': 'llama-3.3-70b-versatile',
-            'messages': [
-                {'role': 'system', 'content': 'You are a real estate analyst. Return only JSON.'},
-                {'role': 'user', 'content': prompt}
-            ],
-            'max_tokens': 800,
-            'temperature': 0.3
         }
 
-        try:
-            _logger.info("📤 Calling Groq API for city data...")
-
-            response = requests.post(
-                'https://api.groq.com/openai/v1/chat/completions',
-                headers=headers,
-                json=payload,
-                timeout=30
-            )
-
-            if response.status_code != 200:
-                _logger.error(f"API Error: {response.text}")
-                return None
-
-            response_data = response.json()
-            response_text = response_data['choices'][0]['message']['content'].strip()
-
-            # Clean JSON
-            if response_text.startswith('```'):
-                lines = response_text.split('\n')
-                response_text = '\n'.join(lines[1:-1]) if len(lines) > 2 else response_text
-                response_text = response_text.replace('```json', '').replace('```', '').strip()
-
-            try:
-                city_data = json.loads(response_text)
-                _logger.info(f"✅ Parsed city data with keys: {list(city_data.keys())}")
-            except json.JSONDecodeError as e:
-                _logger.error(f"JSON parse error: {e}")
-                return None
-
-            # Convert to HTML
-            def to_html(data):
-                if not data:
-                    return '<p>Information not available.</p>'
-                if isinstance(data, list):
-                    items = ''.join([f'<li>{item}</li>' for item in data])
-                    return f'<ul>{items}</ul>'
-                if isinstance(data, str):
-                    return f'<p>{data}</p>'
-                return '<p>Information not available.</p>'
-
-            investment_reasons = to_html(city_data.get('investment_reasons', ''))
-            growth_potential = to_html(city_data.get('growth_potential', ''))
-            infrastructure = to_html(city_data.get('infrastructure', ''))
-            market_trends = to_html(city_data.get('market_trends', ''))
-
-            # Cache the data
-            city_property = self.search([
-                ('city', '=', city_name),
-                ('is_published', '=', True)
-            ], limit=1)
-
-            if city_property:
-                city_property.write({
-                    'city_investment_reasons': investment_reasons,
-                    'city_growth_potential': growth_potential,
-                    'city_infrastructure': infrastructure,
-                    'city_market_trends': market_trends,
-                    'city_investment_generated': True,
-                    'city_investment_date': fields.Datetime.now(),
-                    'last_city_processed': city_name,
-                })
-                _logger.info(f"✅ Cached city data in property ID: {city_property.id}")
-
-            return {
-                'city': city_name,
-                'ai_investment_reasons': investment_reasons,
-                'ai_growth_potential': growth_potential,
-                'ai_infrastructure': infrastructure,
-                'ai_market_trends': market_trends,
-                'ai_content_generated': True,
+    def action_queue_ai_content(self):
+        """Server action: regenerate the AI content of the selection in the background"""
+        jobs = self.env['property.ai.job'].sudo()._enqueue(self)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': 'AI Generation Queued',
+                'message': f"{len(jobs)} properties queued, follow them in Background Jobs.",
+                'type': 'info',
             }
-
-        except Exception as e:
-            _logger.error(f"❌ Error: {e}")
-            return None
-
-    def action_regenerate_ai_content(self):
-        """Button to regenerate AI content"""
-        for rec in self:
-            success = rec.generate_ai_content()
-            if success:
-                return {
-                    'type': 'ir.actions.client',
-                    'tag': 'display_notification',
-                    'params': {
-                        'title': 'Success',
-                        'message': 'AI content regenerated successfully!',
-                        'type': 'success',
-                    }
-                }
-            else:
-                return {
-                    'type': 'ir.actions.client',
-                    'tag': 'display_notification',
-                    'params': {
-                        'title': 'Error',
-                        'message': 'Failed to generate AI content. Check logs.',
-                        'type': 'danger',
-                    }
-                }
+        }
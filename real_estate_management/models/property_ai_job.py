@@ -0,0 +1,195 @@
+from odoo import models, fields, api
+from odoo.tools import SQL
+from odoo.tools.sql import index_exists
+from datetime import timedelta
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Failed jobs are retried with an exponential backoff until this many attempts
+AI_JOB_MAX_ATTEMPTS = 5
+
+# Jobs left running longer than this are considered lost (worker killed)
+AI_JOB_TIMEOUT = timedelta(minutes=30)
+
+# States of the jobs still to run, a property has at most one of them (see init)
+AI_JOB_ACTIVE_STATES = ('pending', 'running')
+
+
+class PropertyAiJob(models.Model):
+    _name = 'property.ai.job'
+    _description = 'Property AI Content Generation Job'
+    _order = 'id desc'
+
+    property_id = fields.Many2one('property.property', string='Property', required=True,
+                                  index=True, ondelete='cascade')
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='pending', required=True, index=True)
+    attempts = fields.Integer(string='Attempts', default=0)
+    next_attempt = fields.Datetime(string='Next Attempt', default=fields.Datetime.now, index=True)
+    date_started = fields.Datetime(string='Started On')
+    date_done = fields.Datetime(string='Finished On')
+    duration = fields.Float(string='Duration (s)', digits=(16, 2))
+    last_error = fields.Text(string='Last Error')
+
+    def init(self):
+        super().init()
+        if not index_exists(self.env.cr, 'property_ai_job_active_property_uniq'):
+            # keep the oldest active job of each property
+            self.env.cr.execute(SQL(
+                """
+                DELETE FROM property_ai_job j
+                      USING property_ai_job k
+                      WHERE j.property_id = k.property_id AND j.id > k.id
+                        AND j.state IN %(states)s AND k.state IN %(states)s
+                """,
+                states=AI_JOB_ACTIVE_STATES,
+            ))
+            self.env.cr.execute(SQL(
+                "CREATE UNIQUE INDEX property_ai_job_active_property_uniq ON property_ai_job (property_id)"
+                " WHERE state IN %s",
+                AI_JOB_ACTIVE_STATES,
+            ))
+
+    @api.model
+    def _enqueue(self, properties, skip_failed=False):
+        """Queue AI generation for ``properties``, skipping those already queued
+
+        A single insert relying on the unique index of the active jobs, so
+        that concurrent views of a new property queue it once. With
+        ``skip_failed``, properties whose generation failed for good are
+        skipped too: page views must not retry them forever, they are queued
+        again by ``action_retry`` or a change of their prompt fields.
+        """
+        if not properties:
+            return self.browse()
+        self.flush_model(['property_id', 'state'])
+        failed_filter = SQL(
+            "AND NOT EXISTS (SELECT 1 FROM property_ai_job f WHERE f.property_id = p.id AND f.state = 'failed')"
+        ) if skip_failed else SQL()
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO property_ai_job (property_id, state, attempts, next_attempt,
+                                         create_uid, create_date, write_uid, write_date)
+                 SELECT p.id, 'pending', 0, now() at time zone 'UTC',
+                        %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+                   FROM property_property p
+                  WHERE p.id IN %(ids)s %(failed_filter)s
+            ON CONFLICT (property_id) WHERE state IN %(states)s DO NOTHING
+              RETURNING id
+            """,
+            uid=self.env.uid, ids=tuple(properties.ids), failed_filter=failed_filter, states=AI_JOB_ACTIVE_STATES,
+        ))
+        jobs = self.browse([row[0] for row in self.env.cr.fetchall()])
+        if not jobs:
+            return jobs
+        cron = self.env.ref('real_estate_management.ir_cron_property_ai_jobs', raise_if_not_found=False)
+        if cron:
+            cron._trigger()
+        return jobs
+
+    @api.model
+    def _claim_jobs(self, limit):
+        """Lock and mark as running the next ``limit`` due jobs"""
+        self.env.cr.execute("""
+            SELECT id FROM property_ai_job
+             WHERE state = 'pending' AND (next_attempt IS NULL OR next_attempt <= now() at time zone 'UTC')
+          ORDER BY next_attempt, id
+             LIMIT %s
+               FOR UPDATE SKIP LOCKED
+        """, [limit])
+        jobs = self.browse([row[0] for row in self.env.cr.fetchall()])
+        jobs.write({'state': 'running', 'date_started': fields.Datetime.now()})
+        return jobs
+
+    @api.model
+    def _cron_process_jobs(self):
+        """Run the due jobs through the batched AI generation
+
+        Jobs per run, properties per LLM request and concurrent requests are
+        read from the ``real_estate.ai_job_batch_size``,
+        ``real_estate.ai_batch_properties`` and ``real_estate.ai_job_concurrency``
+        system parameters.
+        """
+        params = self.env['ir.config_parameter'].sudo()
+        batch_size = max(1, int(params.get_param('real_estate.ai_job_batch_size', 50)))
+
+        # Requeue jobs whose worker died while running them
+        self.search([
+            ('state', '=', 'running'),
+            ('date_started', '<', fields.Datetime.now() - AI_JOB_TIMEOUT),
+        ]).write({'state': 'pending'})
+
+        jobs = self._claim_jobs(batch_size)
+        if not jobs:
+            return
+        # Release the row locks and publish the running state before the slow part
+        self.env.cr.commit()
+
+        result = jobs.property_id._generate_ai_content_batch()
+        duration = result['elapsed'] / len(jobs)
+        for job in jobs:
+            error = result['failed'].get(job.property_id.id)
+            job._finish(not error, error, duration)
+        _logger.info(
+            "Processed %s AI generation jobs in %.1fs, %s failed",
+            len(jobs), result['elapsed'], len(result['failed']),
+        )
+        remaining = self.search_count([
+            ('state', '=', 'pending'),
+            ('next_attempt', '<=', fields.Datetime.now()),
+        ])
+        # the cron is rescheduled right away while due jobs remain
+        self.env['ir.cron']._notify_progress(done=len(jobs), remaining=remaining)
+
+    def _execute(self):
+        self.ensure_one()
+        started = time.monotonic()
+        try:
+            success = self.property_id.generate_ai_content()
+            error = False if success else 'AI generation failed, see the server logs.'
+        except Exception as e:
+            _logger.exception("AI generation job %s crashed", self.id)
+            success, error = False, str(e)
+        self._finish(success, error, time.monotonic() - started)
+
+    def _finish(self, success, error, duration):
+        """Record the outcome of one attempt, scheduling a retry on failure"""
+        for job in self:
+            attempts = job.attempts + 1
+            vals = {'attempts': attempts, 'duration': duration, 'date_done': fields.Datetime.now()}
+            if success:
+                vals.update(state='done', last_error=False)
+            elif attempts >= AI_JOB_MAX_ATTEMPTS:
+                vals.update(state='failed', last_error=error)
+            else:
+                vals.update(
+                    state='pending',
+                    last_error=error,
+                    next_attempt=fields.Datetime.now() + timedelta(minutes=2 ** attempts),
+                )
+            job.write(vals)
+
+    def action_retry(self):
+        """Queue the jobs again, skipping the properties queued by another job"""
+        queued = self.search([
+            ('property_id', 'in', self.property_id.ids),
+            ('state', 'in', AI_JOB_ACTIVE_STATES),
+            ('id', 'not in', self.ids),
+        ]).property_id
+        jobs = self.browse([
+            (prop_jobs.filtered(lambda job: job.state in AI_JOB_ACTIVE_STATES) or prop_jobs)[:1].id
+            for prop, prop_jobs in self.grouped('property_id').items() if prop not in queued
+        ])
+        jobs.write({'state': 'pending', 'attempts': 0, 'next_attempt': fields.Datetime.now(), 'last_error': False})
+        self.env.ref('real_estate_management.ir_cron_property_ai_jobs')._trigger()
+
+    def action_run_now(self):
+        for job in self:
+            job.write({'state': 'running', 'date_started': fields.Datetime.now()})
+            job._execute()
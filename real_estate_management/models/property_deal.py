@@ -0,0 +1,76 @@
+from odoo import models, fields, api
+from odoo.exceptions import ValidationError
+from collections import defaultdict
+
+# Fields of a property counting in the aggregates of its agent (see _get_agent_contribution)
+AGENT_AGGREGATE_SOURCE_FIELDS = {'agent_id', 'is_published', 'deal_state', 'closing_price'}
+
+
+class Property(models.Model):
+    _inherit = 'property.property'
+
+    # indexed for the per-agent aggregates and their reconciliation
+    agent_id = fields.Many2one(index='btree_not_null')
+
+    deal_state = fields.Selection([
+        ('open', 'Open'),
+        ('closed', 'Closed'),
+    ], string='Deal', default='open', required=True, tracking=True, copy=False)
+    closing_price = fields.Monetary(string='Closing Price', currency_field='currency_id', tracking=True, copy=False,
+                                    help='Price the property was sold at, counted in the sales volume of its agent')
+    closing_date = fields.Date(string='Closing Date', copy=False)
+
+    @api.constrains('deal_state', 'closing_price')
+    def _check_closing_price(self):
+        for rec in self:
+            if rec.deal_state == 'closed' and rec.closing_price <= 0:
+                raise ValidationError("Please enter the closing price of the deal")
+
+    @api.onchange('deal_state')
+    def _onchange_deal_state(self):
+        if self.deal_state == 'closed':
+            self.closing_price = self.closing_price or self.price
+            self.closing_date = self.closing_date or fields.Date.context_today(self)
+
+    # -------------------- AGENT AGGREGATES --------------------
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        self.env['real.estate.agent']._apply_aggregate_deltas(records._get_agent_deltas(sign=1))
+        return records
+
+    def write(self, vals):
+        if not AGENT_AGGREGATE_SOURCE_FIELDS & vals.keys():
+            return super().write(vals)
+        deltas = self._get_agent_deltas(sign=-1)
+        res = super().write(vals)
+        self._get_agent_deltas(sign=1, deltas=deltas)
+        self.env['real.estate.agent']._apply_aggregate_deltas(deltas)
+        return res
+
+    def unlink(self):
+        deltas = self._get_agent_deltas(sign=-1)
+        res = super().unlink()
+        self.env['real.estate.agent']._apply_aggregate_deltas(deltas)
+        return res
+
+    def _get_agent_contribution(self):
+        """``(active listings, closed deals, sales volume)`` the property adds to its agent"""
+        self.ensure_one()
+        closed = self.deal_state == 'closed'
+        return (1 if self.is_published else 0, 1 if closed else 0, (self.closing_price or 0.0) if closed else 0.0)
+
+    def _get_agent_deltas(self, sign, deltas=None):
+        """Add (``sign=1``) or remove (``sign=-1``) the contributions of the properties to their agents
+
+        Returns ``{agent_id: [listings, deals, volume]}``, only reading the
+        properties themselves, never the other listings of their agents.
+        """
+        deltas = defaultdict(lambda: [0, 0, 0.0]) if deltas is None else deltas
+        for rec in self.sudo():
+            if not rec.agent_id:
+                continue
+            delta = deltas[rec.agent_id.id]
+            for index, value in enumerate(rec._get_agent_contribution()):
+                delta[index] += sign * value
+        return deltas
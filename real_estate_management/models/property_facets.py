@@ -0,0 +1,153 @@
+from odoo import models, api
+from odoo.osv import expression
+from odoo.tools import SQL
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Price bands of the price facet: key -> (label, lower bound included, upper bound excluded)
+FACET_PRICE_BANDS = {
+    'under_25l': ('Under ₹25L', 0, 2500000),
+    '25l_50l': ('₹25L – ₹50L', 2500000, 5000000),
+    '50l_1cr': ('₹50L – ₹1Cr', 5000000, 10000000),
+    '1cr_2cr': ('₹1Cr – ₹2Cr', 10000000, 20000000),
+    'over_2cr': ('Above ₹2Cr', 20000000, None),
+}
+
+# Plot area bands of the area facet, in sq.ft
+FACET_AREA_BANDS = {
+    'under_1000': ('Under 1,000 sq.ft', 0, 1000),
+    '1000_2000': ('1,000 – 2,000 sq.ft', 1000, 2000),
+    '2000_5000': ('2,000 – 5,000 sq.ft', 2000, 5000),
+    '5000_10000': ('5,000 – 10,000 sq.ft', 5000, 10000),
+    'over_10000': ('Above 10,000 sq.ft', 10000, None),
+}
+
+# Facets of /properties, in display order: URL parameter -> (label, field, bands)
+LISTING_FACETS = {
+    'category': ('Category', 'category_id', None),
+    'price': ('Price', 'price', FACET_PRICE_BANDS),
+    'area': ('Plot Area', 'plot_area', FACET_AREA_BANDS),
+    'facing': ('Facing', 'facing_direction', None),
+    'title': ('Title Status', 'title_status', None),
+    'gated': ('Gated Community', 'gated_community', None),
+    'emi': ('EMI Available', 'emi_available', None),
+}
+
+
+class Property(models.Model):
+    _inherit = 'property.property'
+
+    # -------------------- FILTERS --------------------
+    @api.model
+    def _get_facet_options(self, facet):
+        """``(value, label)`` pairs a facet can be filtered on"""
+        _label, fname, bands = LISTING_FACETS[facet]
+        field = self._fields[fname]
+        if bands:
+            return [(key, band[0]) for key, band in bands.items()]
+        if field.type == 'many2one':
+            return [(str(rec.id), rec.display_name) for rec in self.env[field.comodel_name].search([])]
+        if field.type == 'selection':
+            return field._description_selection(self.env)
+        return [('1', 'Yes')]
+
+    @api.model
+    def _normalize_facet_filters(self, params):
+        """Canonical signature of the facet filters found in ``params``
+
+        Each facet parameter holds one or more values, repeated or comma
+        separated. Unknown values are dropped, and facets and values are
+        sorted, so that equivalent URLs share their cached counts. Returns a
+        tuple of ``(facet, values)`` pairs.
+        """
+        filters = []
+        for facet in LISTING_FACETS:
+            raw = params.get(facet) or []
+            if isinstance(raw, str):
+                raw = [raw]
+            requested = {value.strip() for item in raw for value in item.split(',')}
+            values = tuple(sorted(value for value, _label in self._get_facet_options(facet) if value in requested))
+            if values:
+                filters.append((facet, values))
+        return tuple(filters)
+
+    @api.model
+    def _get_facet_value_domain(self, facet, values):
+        """Domain of the properties matching any of the ``values`` of ``facet``"""
+        _label, fname, bands = LISTING_FACETS[facet]
+        field = self._fields[fname]
+        if bands:
+            domains = []
+            for value in values:
+                _band_label, low, high = bands[value]
+                domains.append([(fname, '>=', low)] + ([(fname, '<', high)] if high is not None else []))
+            return expression.OR(domains)
+        if field.type == 'many2one':
+            return [(fname, 'in', [int(value) for value in values])]
+        if field.type == 'boolean':
+            return [(fname, '=', True)]
+        return [(fname, 'in', list(values))]
+
+    @api.model
+    def _get_facet_domain(self, filters):
+        """Domain of the properties matching every facet of ``filters``"""
+        domain = []
+        for facet, values in filters:
+            domain += self._get_facet_value_domain(facet, values)
+        return domain
+
+    # -------------------- COUNTS --------------------
+    def _get_facet_condition(self, facet, values):
+        """WHERE condition of a facet selection, on the property table of the listing query"""
+        return self.with_context(active_test=False)._search(self._get_facet_value_domain(facet, values)).where_clause
+
+    @api.model
+    def _get_facet_counts(self, search='', city='', zip_code='', filters=(), geo=None):
+        """Facet values of the listing with their live count, cached until a listing changes
+
+        See _read_facet_counts.
+        """
+        return self._get_cached_aggregate(
+            'facet_counts', self._get_map_data_version(), [search, city, zip_code, filters, geo],
+            lambda: self._read_facet_counts(search, city, zip_code, filters, geo),
+        )
+
+    @api.model
+    def _read_facet_counts(self, search='', city='', zip_code='', filters=(), geo=None):
+        """Facet values of the listing with their live count, in one aggregated query
+
+        A value counts the properties it would show if it were selected,
+        with the other facets' filters applied but not its own facet's, so
+        that values of a facet stay alternatives to each other. All counts
+        are ``count(*) FILTER (...)`` aggregates of a single pass over the
+        listing query.
+
+        Returns ``{facet: [(value, label, count, selected)]}`` in the order
+        of ``LISTING_FACETS``, without the values matching nothing unless
+        selected.
+        """
+        query = self._search(self._get_listing_domain(search, city, zip_code, geo=geo))
+        selected = dict(filters)
+        conditions = {facet: self._get_facet_condition(facet, values) for facet, values in filters}
+
+        aggregates = []
+        keys = []
+        for facet in LISTING_FACETS:
+            others = [condition for other, condition in conditions.items() if other != facet]
+            for value, label in self._get_facet_options(facet):
+                condition = SQL(" AND ").join(others + [self._get_facet_condition(facet, (value,))])
+                aggregates.append(SQL("count(*) FILTER (WHERE %s)", condition))
+                keys.append((facet, value, label))
+        if not aggregates:
+            return {}
+        query.order = None
+        self.env.cr.execute(query.select(*aggregates))
+        counts = self.env.cr.fetchone()
+
+        facets = {facet: [] for facet in LISTING_FACETS}
+        for (facet, value, label), count in zip(keys, counts):
+            is_selected = value in selected.get(facet, ())
+            if count or is_selected:
+                facets[facet].append((value, label, count, is_selected))
+        return facets
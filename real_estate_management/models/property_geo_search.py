@@ -0,0 +1,256 @@
+from odoo import models, fields, api
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+from ..tools.geo import (
+    GEOHASH_PRECISION, EARTH_RADIUS_KM, bbox_around, geohash_cover, geohash_encode, polygon_bbox, polygon_centroid,
+)
+import logging
+import statistics
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Largest searchable radius, and vertices accepted in a drawn polygon
+GEO_MAX_RADIUS_KM = 500
+GEO_MAX_POLYGON_POINTS = 100
+
+# Results of the JSON location search, by default and at most
+GEO_SEARCH_LIMIT = 100
+GEO_SEARCH_MAX_LIMIT = 500
+
+# Location filters timed by _benchmark_geo_search when none are given, around Hyderabad
+BENCHMARK_GEO_FILTERS = (
+    ('radius', 17.385, 78.4867, 2.0),
+    ('radius', 17.385, 78.4867, 10.0),
+    ('polygon', ((17.36, 78.44), (17.45, 78.44), (17.45, 78.52), (17.36, 78.52))),
+    ('polygon', ((17.2, 78.2), (17.6, 78.3), (17.5, 78.7), (17.25, 78.6))),
+)
+
+# Box the benchmark properties are spread over: (south, west, north, east)
+BENCHMARK_GEO_BOX = (17.2, 78.2, 17.6, 78.7)
+
+
+class Property(models.Model):
+    _inherit = 'property.property'
+
+    geo_cell = fields.Char(
+        string='Geohash', compute='_compute_geo_cell', store=True, readonly=True, unaccent=False,
+        help='Geohash of the coordinates, indexed to find the properties of an area by prefix.',
+    )
+
+    def init(self):
+        super().init()
+        create_index(
+            self.env.cr, 'property_property_geo_cell_idx', self._table, ['geo_cell text_pattern_ops'],
+            where='is_published AND geo_cell IS NOT NULL',
+        )
+
+    @api.depends('latitude', 'longitude')
+    def _compute_geo_cell(self):
+        for rec in self:
+            has_coordinates = rec.latitude or rec.longitude
+            rec.geo_cell = geohash_encode(rec.latitude, rec.longitude, GEOHASH_PRECISION) if has_coordinates else False
+
+    # -------------------- FILTERS --------------------
+    @api.model
+    def _parse_geo_filter(self, params):
+        """Normalized location filter of the request ``params``, None without a valid one
+
+        ``lat``, ``lng`` and ``radius_km`` select the properties within a
+        distance of a point, giving ``('radius', lat, lng, km)``; ``polygon``
+        (``lat,lng;lat,lng;...``) those inside a drawn polygon, giving
+        ``('polygon', ((lat, lng), ...))``. Coordinates are rounded to about a
+        meter so that close requests share their cached counts.
+        """
+        try:
+            if params.get('polygon'):
+                polygon = tuple(
+                    (round(float(lat), 5), round(float(lng), 5))
+                    for lat, lng in (point.split(',') for point in params['polygon'].split(';') if point.strip())
+                )
+                if 3 <= len(polygon) <= GEO_MAX_POLYGON_POINTS and all(
+                    -90 <= lat <= 90 and -180 <= lng <= 180 for lat, lng in polygon
+                ):
+                    return ('polygon', polygon)
+            elif params.get('lat') and params.get('lng') and params.get('radius_km'):
+                lat, lng = round(float(params['lat']), 5), round(float(params['lng']), 5)
+                radius = round(float(params['radius_km']), 3)
+                if -90 <= lat <= 90 and -180 <= lng <= 180 and 0 < radius <= GEO_MAX_RADIUS_KM:
+                    return ('radius', lat, lng, radius)
+        except ValueError:
+            pass
+        return None
+
+    @api.model
+    def _get_geo_center(self, geo):
+        """Point the results of a location filter are ranked from: the circle center or polygon centroid"""
+        return polygon_centroid(geo[1]) if geo[0] == 'polygon' else (geo[1], geo[2])
+
+    def _get_distance_sql(self, latitude, longitude):
+        """Exact (haversine) distance in km between the property and a point"""
+        lat = SQL.identifier(self._table, 'latitude')
+        lng = SQL.identifier(self._table, 'longitude')
+        return SQL(
+            "2 * %(radius)s * asin(sqrt(least(1.0, power(sin(radians(%(lat)s - %(lat0)s) / 2), 2)"
+            " + cos(radians(%(lat0)s)) * cos(radians(%(lat)s)) * power(sin(radians(%(lng)s - %(lng0)s) / 2), 2))))",
+            radius=EARTH_RADIUS_KM, lat=lat, lng=lng, lat0=latitude, lng0=longitude,
+        )
+
+    def _get_geo_area_condition(self, south, west, north, east):
+        """Condition matching the geohash cells covering a box, served by the geo_cell index, then the box"""
+        geo_cell = SQL.identifier(self._table, 'geo_cell')
+        cells = SQL(" OR ").join(
+            SQL("%s LIKE %s", geo_cell, f'{cell}%') for cell in geohash_cover(south, west, north, east)
+        )
+        return SQL(
+            "%s IS NOT NULL AND (%s) AND %s BETWEEN %s AND %s AND %s BETWEEN %s AND %s",
+            geo_cell, cells,
+            SQL.identifier(self._table, 'latitude'), south, north,
+            SQL.identifier(self._table, 'longitude'), west, east,
+        )
+
+    def _get_geo_condition(self, geo):
+        """Exact condition of a location filter: the distance to the center, or the polygon containment"""
+        if geo[0] == 'radius':
+            _mode, lat, lng, radius = geo
+            return SQL("%s <= %s", self._get_distance_sql(lat, lng), radius)
+        polygon = '(%s)' % ','.join(f'({lng!r},{lat!r})' for lat, lng in geo[1])
+        return SQL(
+            "point(%s, %s) <@ %s::polygon",
+            SQL.identifier(self._table, 'longitude'), SQL.identifier(self._table, 'latitude'), polygon,
+        )
+
+    @api.model
+    def _get_geo_domain(self, geo):
+        """Domain of the properties matching a location filter (see _parse_geo_filter)
+
+        The geohash cells covering the filter narrow the candidates on the
+        geo_cell index, the exact condition is then checked in the database.
+        """
+        if not geo:
+            return []
+        if geo[0] == 'radius':
+            _mode, lat, lng, radius = geo
+            area = bbox_around(lat, lng, radius)
+        else:
+            area = polygon_bbox(geo[1])
+        query = self._search([('is_published', '=', True)])
+        query.add_where(self._get_geo_area_condition(*area))
+        query.add_where(self._get_geo_condition(geo))
+        return [('id', 'in', query)]
+
+    @api.model
+    def _search_nearest(self, domain, latitude, longitude, limit=None, offset=0):
+        """``(id, distance_km)`` of the properties of ``domain``, nearest to a point first"""
+        query = self._search(domain)
+        distance = self._get_distance_sql(latitude, longitude)
+        query.order = SQL("%s, %s", distance, SQL.identifier(self._table, 'id'))
+        query.limit = limit
+        query.offset = offset
+        self.env.cr.execute(query.select(SQL.identifier(self._table, 'id'), distance))
+        return self.env.cr.fetchall()
+
+    # -------------------- JSON API --------------------
+    @api.model
+    def _geo_search(self, geo, limit=GEO_SEARCH_LIMIT):
+        """Published properties matching a location filter, nearest to its center first, as plain dicts"""
+        latitude, longitude = self._get_geo_center(geo)
+        domain = [('is_published', '=', True)] + self._get_geo_domain(geo)
+        nearest = self._search_nearest(domain, latitude, longitude, limit=limit)
+        distances = dict(nearest)
+        rows = self._fetch_public_rows(
+            [('id', 'in', list(distances))],
+            ['name', 'category_id.name', 'price', 'plot_area', 'city', 'zip_code', 'latitude', 'longitude'],
+            image_fields=['card_image'],
+        )
+        for row in rows:
+            row['distance_km'] = round(distances[row['id']], 3)
+            row['url'] = f"/property/{row['id']}"
+        rows.sort(key=lambda row: (row['distance_km'], row['id']))
+        return rows
+
+    # -------------------- BENCHMARK --------------------
+    @api.model
+    def _benchmark_geo_search(self, size=200000, filters=BENCHMARK_GEO_FILTERS, limit=24, repeat=5):
+        """Compare the location search latency with and without the geohash index
+
+        ``size`` published copies of an existing property are inserted at
+        random coordinates of ``BENCHMARK_GEO_BOX``, then each filter is
+        searched ``repeat`` times (count and nearest first page) with the
+        exact condition alone, a sequential scan, and with the geohash cells
+        first. Everything is rolled back at the end.
+
+        Returns ``{filter: {'scan_ms', 'indexed_ms', 'scan_count', 'indexed_count'}}``
+        with median timings, and logs them.
+        """
+        template = self.search([], limit=1)
+        if not template:
+            return {}
+        self.flush_model()
+        cr = self.env.cr
+        columns = [
+            SQL.identifier(fname) for fname, field in self._fields.items()
+            if field.store and field.column_type
+            and fname not in ('id', 'latitude', 'longitude', 'geo_cell', 'is_published')
+        ]
+        south, west, north, east = BENCHMARK_GEO_BOX
+        results = {}
+        cr.execute("SAVEPOINT geo_search_benchmark")
+        try:
+            cr.execute(SQL("""
+                INSERT INTO %(table)s (%(columns)s, latitude, longitude, is_published)
+                SELECT %(columns)s, %(south)s + random() * %(height)s, %(west)s + random() * %(width)s, TRUE
+                  FROM %(table)s p, generate_series(1, %(size)s) n
+                 WHERE p.id = %(template)s
+             RETURNING id, latitude, longitude
+            """, table=SQL.identifier(self._table), columns=SQL(", ").join(columns), size=size,
+                template=template.id, south=south, west=west, height=north - south, width=east - west))
+            rows = cr.fetchall()
+            for start in range(0, len(rows), 10000):
+                cr.execute(SQL(
+                    "UPDATE %s t SET geo_cell = v.cell FROM (VALUES %s) v(id, cell) WHERE t.id = v.id",
+                    SQL.identifier(self._table),
+                    SQL(", ").join(
+                        SQL("(%s, %s)", record_id, geohash_encode(lat, lng))
+                        for record_id, lat, lng in rows[start:start + 10000]
+                    ),
+                ))
+            cr.execute(SQL("ANALYZE %s", SQL.identifier(self._table)))
+
+            def timed(func):
+                timings = []
+                for _i in range(repeat):
+                    started = time.perf_counter()
+                    value = func()
+                    timings.append((time.perf_counter() - started) * 1000)
+                return statistics.median(timings), value
+
+            def scan_domain(geo):
+                query = self._search([('is_published', '=', True)])
+                query.add_where(self._get_geo_condition(geo))
+                return [('id', 'in', query)]
+
+            for geo in filters:
+                latitude, longitude = self._get_geo_center(geo)
+                timings = {}
+                for name, get_domain in (('scan', scan_domain), ('indexed', self._get_geo_domain)):
+                    def search(get_domain=get_domain):
+                        domain = [('is_published', '=', True)] + get_domain(geo)
+                        self._search_nearest(domain, latitude, longitude, limit=limit)
+                        return self.search_count(domain)
+
+                    timings[f'{name}_ms'], timings[f'{name}_count'] = timed(search)
+                label = f'radius {geo[3]} km' if geo[0] == 'radius' else f'polygon of {len(geo[1])} points'
+                results[label] = {
+                    'scan_ms': round(timings['scan_ms'], 2), 'indexed_ms': round(timings['indexed_ms'], 2),
+                    'scan_count': timings['scan_count'], 'indexed_count': timings['indexed_count'],
+                }
+                _logger.info(
+                    "Geo search benchmark on %s rows, %s: scan %.2fms (%s hits), geohash %.2fms (%s hits)",
+                    size, label, timings['scan_ms'], timings['scan_count'], timings['indexed_ms'],
+                    timings['indexed_count'],
+                )
+        finally:
+            cr.execute("ROLLBACK TO SAVEPOINT geo_search_benchmark")
+            self.invalidate_model()
+        return results
@@ -0,0 +1,169 @@
+from odoo import models, fields, api
+from datetime import timedelta
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Changing one of these fields queues the property for geocoding
+GEOCODE_ADDRESS_FIELDS = {'street', 'street2', 'city', 'zip_code', 'state_id', 'country_id'}
+
+# Failed lookups are retried with an exponential backoff until this many attempts
+GEOCODE_MAX_ATTEMPTS = 5
+GEOCODE_RETRY_BASE = timedelta(hours=1)
+
+
+class Property(models.Model):
+    _inherit = 'property.property'
+
+    geocode_state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Geocoded'),
+        ('failed', 'Failed'),
+    ], string='Geocoding', copy=False, index=True, readonly=True)
+    geocode_attempts = fields.Integer(string='Geocoding Attempts', copy=False, readonly=True)
+    geocode_next_attempt = fields.Datetime(string='Next Geocoding Attempt', copy=False, readonly=True)
+    geocode_error = fields.Char(string='Geocoding Error', copy=False, readonly=True)
+
+    # -------------------- QUEUE --------------------
+    @api.model_create_multi
+    def create(self, vals_list):
+        records = super().create(vals_list)
+        # bulk imports queue their properties with each chunk
+        if not self.env.context.get('defer_geocode'):
+            records.filtered(lambda rec: not rec.latitude and not rec.longitude)._queue_geocode()
+        return records
+
+    def write(self, vals):
+        res = super().write(vals)
+        # coordinates set by hand win over the geocoder
+        if GEOCODE_ADDRESS_FIELDS & vals.keys() and not {'latitude', 'longitude'} & vals.keys():
+            self._queue_geocode()
+        return res
+
+    def _queue_geocode(self):
+        """Mark the properties for the geocoding cron, the save never waits on the geocoder"""
+        if not self:
+            return
+        self.write({
+            'geocode_state': 'pending',
+            'geocode_attempts': 0,
+            'geocode_next_attempt': fields.Datetime.now(),
+            'geocode_error': False,
+        })
+        cron = self.env.ref('real_estate_management.ir_cron_property_geocode', raise_if_not_found=False)
+        if cron:
+            cron.sudo()._trigger()
+
+    @api.model
+    def _init_geocode_queue(self):
+        """Queue the properties with an address but no coordinates"""
+        self.search([
+            ('geocode_state', '=', False),
+            ('latitude', '=', False),
+            ('longitude', '=', False),
+        ])._queue_geocode()
+
+    def _get_geocode_address(self):
+        """Address components passed to the geocoder, None when too incomplete"""
+        self.ensure_one()
+        address = {
+            'street': ' '.join(filter(None, [self.street, self.street2])),
+            'zip': self.zip_code or '',
+            'city': self.city or '',
+            'state': self.state_id.name or '',
+            'country': self.country_id.name or '',
+        }
+        if not (address['street'] or address['zip'] or address['city']):
+            return None
+        return address
+
+    # -------------------- WORKER --------------------
+    @api.model
+    def _cron_geocode_pending(self):
+        """Geocode the queued properties, at most ``real_estate.geocode_rps`` requests per second
+
+        Each property is committed as soon as it is resolved, so its marker
+        shows up on the map without waiting for the rest of the batch. Only
+        requests actually sent to the geocoder are throttled, addresses
+        known to the geocode cache are resolved right away.
+        """
+        params = self.env['ir.config_parameter'].sudo()
+        rps = float(params.get_param('real_estate.geocode_rps', 1.0)) or 1.0
+        batch_size = max(1, int(params.get_param('real_estate.geocode_batch_size', 50)))
+
+        self.env.cr.execute("""
+            SELECT id FROM property_property
+             WHERE geocode_state = 'pending'
+               AND (geocode_next_attempt IS NULL OR geocode_next_attempt <= now() at time zone 'UTC')
+          ORDER BY geocode_next_attempt, id
+             LIMIT %s
+               FOR UPDATE SKIP LOCKED
+        """, [batch_size])
+        properties = self.browse([row[0] for row in self.env.cr.fetchall()])
+
+        last_request = [0.0]
+
+        def throttle():
+            wait = last_request[0] + 1.0 / rps - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            last_request[0] = time.monotonic()
+
+        started = time.monotonic()
+        for prop in properties:
+            prop._geocode(throttle=throttle)
+            self.env.cr.commit()
+        if properties:
+            _logger.info(
+                "Geocoded %s properties in %.1fs", len(properties), time.monotonic() - started,
+            )
+
+        remaining = self.search_count([
+            ('geocode_state', '=', 'pending'),
+            ('geocode_next_attempt', '<=', fields.Datetime.now()),
+        ])
+        # the cron is rescheduled right away while due properties remain
+        self.env['ir.cron']._notify_progress(done=len(properties), remaining=remaining)
+
+    def _geocode(self, force=False, throttle=None):
+        """Resolve the coordinates of the property, scheduling a retry on failure"""
+        self.ensure_one()
+        address = self._get_geocode_address()
+        coords = address and self.env['property.geocode.cache'].sudo()._geocode(
+            **address, force=force, throttle=throttle,
+        )
+        if coords:
+            self.write({
+                'latitude': coords[0],
+                'longitude': coords[1],
+                'date_localization': fields.Date.context_today(self),
+                'geocode_state': 'done',
+                'geocode_error': False,
+            })
+            _logger.info(f"Geocoded {self.name}: latitude={self.latitude}, longitude={self.longitude}")
+            return True
+
+        attempts = self.geocode_attempts + 1
+        vals = {
+            'latitude': False,
+            'longitude': False,
+            'date_localization': False,
+            'geocode_attempts': attempts,
+            'geocode_error': 'Incomplete address' if not address else 'Address not found by the geocoder',
+        }
+        if not address or attempts >= GEOCODE_MAX_ATTEMPTS:
+            vals['geocode_state'] = 'failed'
+        else:
+            vals['geocode_next_attempt'] = fields.Datetime.now() + GEOCODE_RETRY_BASE * 2 ** (attempts - 1)
+        self.write(vals)
+        _logger.error(f"Geocode failed for {self.name} (attempt {attempts}): {address}")
+        return False
+
+    def action_geocode_now(self):
+        """Button: geocode now, asking the geocoder again even for cached failures"""
+        for rec in self:
+            rec._geocode(force=True)
+
+    def action_retry_geocode(self):
+        self._queue_geocode()
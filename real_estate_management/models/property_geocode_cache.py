@@ -0,0 +1,105 @@
+from odoo import models, fields, api
+from datetime import timedelta
+import logging
+import re
+
+_logger = logging.getLogger(__name__)
+
+# How long a failed lookup is remembered before the geocoder is asked again
+GEOCODE_NOT_FOUND_RETRY = timedelta(days=1)
+GEOCODE_ERROR_RETRY = timedelta(hours=1)
+
+
+def normalize_address(address):
+    """Cache key of an address: lowercase words, single spaces, no punctuation"""
+    return ' '.join(re.sub(r'[^\w]+', ' ', (address or '').casefold()).split())
+
+
+class PropertyGeocodeCache(models.Model):
+    _name = 'property.geocode.cache'
+    _description = 'Geocoding Result Cache'
+    _order = 'date desc'
+
+    key = fields.Char(string='Normalized Address', required=True, index=True)
+    address = fields.Char(string='Address')
+    latitude = fields.Float(string='Latitude', digits=(16, 5))
+    longitude = fields.Float(string='Longitude', digits=(16, 5))
+    provider = fields.Char(string='Provider')
+    state = fields.Selection([
+        ('found', 'Found'),
+        ('not_found', 'Not Found'),
+        ('error', 'Error'),
+    ], string='Status', required=True)
+    date = fields.Datetime(string='Looked Up On')
+    retry_after = fields.Datetime(string='Retry After',
+                                  help='Failed lookups are answered from the cache until this date.')
+    hits = fields.Integer(string='Cache Hits', default=0)
+
+    _sql_constraints = [
+        ('key_uniq', 'unique(key)', 'An address can only be cached once.'),
+    ]
+
+    @api.model
+    def _geocode(self, street='', zip='', city='', state='', country='', force=False, throttle=None):
+        """Coordinates ``(latitude, longitude)`` of an address, or None
+
+        The cache is checked before any network call: known addresses are
+        answered from it, and failed lookups are not retried before their
+        ``retry_after`` unless ``force`` is set. ``throttle`` is called before
+        each request to the geocoder. Raises nothing, geocoder errors are
+        cached as failures.
+        """
+        address = ', '.join(filter(None, [street, zip, city, state, country]))
+        key = normalize_address(address)
+        if not key:
+            return None
+        self.env.cr.execute("""
+            UPDATE property_geocode_cache SET hits = hits + 1
+             WHERE key = %s AND (state = 'found' OR (retry_after > now() at time zone 'UTC' AND NOT %s))
+         RETURNING state, latitude, longitude
+        """, [key, force])
+        row = self.env.cr.fetchone()
+        if row:
+            state_, latitude, longitude = row
+            return (latitude, longitude) if state_ == 'found' else None
+
+        geo = self.env['base.geocoder']
+        provider = geo._get_provider().tech_name
+        throttle = throttle or (lambda: None)
+        try:
+            throttle()
+            coords = geo.geo_find(geo.geo_query_address(street=street, zip=zip, city=city, state=state,
+                                                        country=country), force_country=country)
+            if not coords or len(coords) != 2:
+                # Fallback: try single string query if structured fails
+                throttle()
+                coords = geo.geo_find(', '.join(filter(None, [street, city, state, country])))
+        except Exception as e:
+            _logger.error(f"Geocode error for {key}: {e}")
+            self._store(key, address, provider, 'error', retry_in=GEOCODE_ERROR_RETRY)
+            return None
+
+        if coords and len(coords) == 2:
+            self._store(key, address, provider, 'found', coords)
+            return tuple(coords)
+        self._store(key, address, provider, 'not_found', retry_in=GEOCODE_NOT_FOUND_RETRY)
+        return None
+
+    @api.model
+    def _store(self, key, address, provider, state, coords=(None, None), retry_in=None):
+        self.env.cr.execute("""
+            INSERT INTO property_geocode_cache (key, address, latitude, longitude, provider, state, date,
+                                                retry_after, hits, create_uid, create_date, write_uid, write_date)
+                 VALUES (%(key)s, %(address)s, %(lat)s, %(lng)s, %(provider)s, %(state)s, now() at time zone 'UTC',
+                         now() at time zone 'UTC' + %(retry)s, 0,
+                         %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC')
+            ON CONFLICT (key) DO UPDATE
+                    SET latitude = EXCLUDED.latitude, longitude = EXCLUDED.longitude,
+                        provider = EXCLUDED.provider, state = EXCLUDED.state, date = EXCLUDED.date,
+                        retry_after = EXCLUDED.retry_after, write_uid = EXCLUDED.write_uid,
+                        write_date = EXCLUDED.write_date
+        """, {
+            'key': key, 'address': address, 'lat': coords[0], 'lng': coords[1], 'provider': provider,
+            'state': state, 'retry': retry_in, 'uid': self.env.uid,
+        })
+        self.invalidate_model()
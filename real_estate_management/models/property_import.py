@@ -0,0 +1,292 @@
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+import csv
+import io
+import json
+import logging
+import time
+
+_logger = logging.getLogger(__name__)
+
+# Columns accepted in import files, named after the property fields
+PROPERTY_IMPORT_FIELDS = [
+    'name', 'short_description', 'detailed_description', 'is_featured', 'is_published', 'price', 'plot_area',
+    'facing_direction', 'road_width', 'title_status', 'street', 'street2', 'city', 'zip_code',
+    'emi_available', 'registration_charges', 'water_connection', 'electricity_connection', 'drainage_facility',
+    'gated_community', 'latitude', 'longitude', 'contact_name', 'contact_phone', 'contact_email',
+    'seo_title', 'seo_description', 'nearby_landmarks', 'property_website_url',
+]
+
+# Many2one columns resolved by name, and the column aliases they accept
+PROPERTY_IMPORT_RELATIONS = {
+    'category_id': ('category_id', 'category'),
+    'state_id': ('state_id', 'state'),
+}
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y', 't'}
+FALSE_VALUES = {'', '0', 'false', 'no', 'n', 'f'}
+
+# Context of the bulk creations: no chatter, no tracking, no per-record jobs
+PROPERTY_IMPORT_CONTEXT = {
+    'tracking_disable': True,
+    'mail_create_nolog': True,
+    'mail_create_nosubscribe': True,
+    'mail_notrack': True,
+    'skip_ai_generation': True,
+    'defer_geocode': True,
+}
+
+
+class PropertyImportJob(models.Model):
+    _name = 'property.import.job'
+    _description = 'Property Bulk Import'
+    _order = 'id desc'
+
+    name = fields.Char(string='Name', required=True, default=lambda self: _('Property Import'))
+    file = fields.Binary(string='File', attachment=True, required=True)
+    filename = fields.Char(string='File Name')
+    file_format = fields.Selection([
+        ('csv', 'CSV'),
+        ('jsonl', 'JSON Lines'),
+    ], string='Format', compute='_compute_file_format', store=True, readonly=False)
+    chunk_size = fields.Integer(string='Chunk Size', default=500,
+                                help='Rows created per batch, each batch is committed on its own.')
+    generate_ai_content = fields.Boolean(string='Generate AI Content',
+                                         help='Queue the AI content generation of the imported properties.')
+    state = fields.Selection([
+        ('draft', 'Draft'),
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    ], string='Status', default='draft', required=True, readonly=True)
+    date_start = fields.Datetime(string='Started On', readonly=True)
+    date_done = fields.Datetime(string='Finished On', readonly=True)
+    rows_read = fields.Integer(string='Rows Read', readonly=True)
+    rows_imported = fields.Integer(string='Rows Imported', readonly=True)
+    rows_failed = fields.Integer(string='Rows Failed', readonly=True)
+    duration = fields.Float(string='Duration (s)', digits=(16, 2), readonly=True)
+    rows_per_second = fields.Float(string='Rows / Second', digits=(16, 1), readonly=True)
+    last_error = fields.Text(string='Last Error', readonly=True)
+    error_ids = fields.One2many('property.import.error', 'job_id', string='Row Errors', readonly=True)
+
+    @api.depends('filename')
+    def _compute_file_format(self):
+        for job in self:
+            name = (job.filename or '').lower()
+            job.file_format = 'jsonl' if name.endswith(('.jsonl', '.ndjson', '.json')) else 'csv'
+
+    # -------------------- ACTIONS --------------------
+    def action_start(self):
+        """Queue the import, the cron runs it in the background"""
+        self.write({'state': 'queued'})
+        self.env.ref('real_estate_management.ir_cron_property_import')._trigger()
+
+    def action_reset(self):
+        self.error_ids.unlink()
+        self.write({
+            'state': 'draft', 'rows_read': 0, 'rows_imported': 0, 'rows_failed': 0,
+            'duration': 0, 'rows_per_second': 0, 'last_error': False,
+        })
+
+    @api.model
+    def _cron_process_imports(self):
+        for job in self.search([('state', '=', 'queued')], order='id'):
+            job._run()
+
+    # -------------------- ENGINE --------------------
+    def _open_file(self):
+        """Binary stream of the uploaded file, read from the filestore when possible"""
+        self.ensure_one()
+        attachment = self.env['ir.attachment'].sudo().search([
+            ('res_model', '=', self._name),
+            ('res_field', '=', 'file'),
+            ('res_id', '=', self.id),
+        ], limit=1)
+        if not attachment:
+            raise UserError(_("Upload a file to import."))
+        if attachment.store_fname:
+            return open(attachment._full_path(attachment.store_fname), 'rb')
+        return io.BytesIO(attachment.raw)
+
+    def _iter_rows(self, stream):
+        """Yield ``(line_number, row dict)`` without loading the whole file"""
+        text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+        if self.file_format == 'jsonl':
+            for line_number, line in enumerate(text, 1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except json.JSONDecodeError as e:
+                    row = e
+                yield line_number, row
+        else:
+            reader = csv.DictReader(text)
+            for row in reader:
+                yield reader.line_num, row
+
+    @api.model
+    def _get_lookups(self):
+        """Name -> id maps of the many2one targets, loaded once per import"""
+        country = self.env.company.country_id
+        categories = {}
+        for category in self.env['property.category'].search_fetch([], ['name']):
+            categories.setdefault(category.name.strip().casefold(), category.id)
+        states = {}
+        for state in self.env['res.country.state'].search_fetch([('country_id', '=', country.id)], ['name', 'code']):
+            states.setdefault(state.name.strip().casefold(), state.id)
+            states.setdefault(state.code.strip().casefold(), state.id)
+        return {'category_id': categories, 'state_id': states}
+
+    @api.model
+    def _prepare_property_vals(self, row, lookups):
+        """Create values of one file row, raises ValueError on invalid data"""
+        if isinstance(row, Exception):
+            raise ValueError(f"Invalid JSON: {row}")
+        if not isinstance(row, dict):
+            raise ValueError("Expected an object per line")
+        Property = self.env['property.property']
+        vals = {}
+        for fname in PROPERTY_IMPORT_FIELDS:
+            value = row.get(fname)
+            if value is None:
+                continue
+            field = Property._fields[fname]
+            if isinstance(value, str):
+                value = value.strip()
+            if field.type in ('float', 'monetary'):
+                vals[fname] = float(value) if value != '' else 0.0
+            elif field.type == 'boolean':
+                if isinstance(value, bool):
+                    vals[fname] = value
+                elif str(value).casefold() in TRUE_VALUES | FALSE_VALUES:
+                    vals[fname] = str(value).casefold() in TRUE_VALUES
+                else:
+                    raise ValueError(f"{fname}: expected a boolean, got {value!r}")
+            elif field.type == 'selection':
+                selection = dict(field._description_selection(self.env))
+                if value in selection:
+                    vals[fname] = value
+                else:
+                    by_label = {label.casefold(): key for key, label in selection.items()}
+                    if str(value).casefold() not in by_label:
+                        raise ValueError(f"{fname}: unknown value {value!r}")
+                    vals[fname] = by_label[str(value).casefold()]
+            else:
+                vals[fname] = value or False
+
+        for fname, aliases in PROPERTY_IMPORT_RELATIONS.items():
+            value = next((row[alias] for alias in aliases if row.get(alias) not in (None, '')), None)
+            if value is None:
+                continue
+            record_id = lookups[fname].get(str(value).strip().casefold())
+            if not record_id:
+                raise ValueError(f"{fname}: no match for {value!r}")
+            vals[fname] = record_id
+
+        missing = [fname for fname in ('name', 'price', 'plot_area') if fname not in vals]
+        if missing:
+            raise ValueError(f"Missing required columns: {', '.join(missing)}")
+        return vals
+
+    def _run(self):
+        """Import the file chunk by chunk, committing the progress after each chunk
+
+        A chunk is created with a single ``create`` call; when it fails, its
+        rows are created one by one to isolate the faulty ones, which are
+        logged as row errors without stopping the import. Geocoding and AI
+        generation are queued with each chunk, in its transaction, so the
+        rows committed before a failure are queued too.
+        """
+        self.ensure_one()
+        self.write({'state': 'running', 'date_start': fields.Datetime.now()})
+        self.env.cr.commit()
+
+        Property = self.env['property.property'].with_context(**PROPERTY_IMPORT_CONTEXT)
+        Error = self.env['property.import.error']
+        lookups = self._get_lookups()
+        chunk_size = max(1, self.chunk_size)
+        started = time.monotonic()
+        stats = {'read': 0, 'imported': 0, 'failed': 0}
+        imported_ids = []
+
+        def flush(chunk):
+            errors = []
+            vals_list = []
+            chunk_ids = []
+            for line_number, row in chunk:
+                try:
+                    vals_list.append((line_number, row, self._prepare_property_vals(row, lookups)))
+                except (ValueError, TypeError) as e:
+                    errors.append((line_number, row, str(e)))
+            try:
+                with self.env.cr.savepoint():
+                    records = Property.create([vals for _line, _row, vals in vals_list])
+                chunk_ids.extend(records.ids)
+            except Exception:
+                for line_number, row, vals in vals_list:
+                    try:
+                        with self.env.cr.savepoint():
+                            chunk_ids.extend(Property.create([vals]).ids)
+                    except Exception as e:
+                        errors.append((line_number, row, str(e)))
+            imported_ids.extend(chunk_ids)
+            imported = self.env['property.property'].browse(chunk_ids)
+            imported.filtered(lambda rec: not rec.latitude and not rec.longitude)._queue_geocode()
+            if self.generate_ai_content:
+                self.env['property.ai.job'].sudo()._enqueue(imported)
+            Error.create([{
+                'job_id': self.id,
+                'line_number': line_number,
+                'message': message,
+                'raw_data': row if isinstance(row, str) else json.dumps(row, default=str)[:2000],
+            } for line_number, row, message in errors])
+            stats['read'] += len(chunk)
+            stats['failed'] += len(errors)
+            stats['imported'] = len(imported_ids)
+            elapsed = time.monotonic() - started
+            self.write({
+                'rows_read': stats['read'],
+                'rows_imported': stats['imported'],
+                'rows_failed': stats['failed'],
+                'duration': elapsed,
+                'rows_per_second': stats['read'] / elapsed if elapsed else 0.0,
+            })
+            self.env.cr.commit()
+            _logger.info(
+                "Property import %s: %s rows read, %s imported, %s failed, %.1f rows/s",
+                self.id, stats['read'], stats['imported'], stats['failed'], self.rows_per_second,
+            )
+
+        try:
+            with self._open_file() as stream:
+                chunk = []
+                for item in self._iter_rows(stream):
+                    chunk.append(item)
+                    if len(chunk) >= chunk_size:
+                        flush(chunk)
+                        chunk = []
+                if chunk:
+                    flush(chunk)
+        except Exception as e:
+            self.env.cr.rollback()
+            _logger.exception("Property import %s failed", self.id)
+            self.write({'state': 'failed', 'last_error': str(e), 'date_done': fields.Datetime.now()})
+            self.env.cr.commit()
+            return False
+
+        self.write({'state': 'done', 'date_done': fields.Datetime.now()})
+        self.env.cr.commit()
+        return True
+
+
+class PropertyImportError(models.Model):
+    _name = 'property.import.error'
+    _description = 'Property Import Row Error'
+    _order = 'job_id, line_number'
+
+    job_id = fields.Many2one('property.import.job', string='Import', required=True, index=True, ondelete='cascade')
+    line_number = fields.Integer(string='Line')
+    message = fields.Char(string='Error')
+    raw_data = fields.Text(string='Row')
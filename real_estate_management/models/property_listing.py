@@ -0,0 +1,208 @@
+from odoo import models, api
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+from datetime import datetime
+import base64
+import json
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Sort options of /properties: key -> (label, field, direction), ties broken on id
+LISTING_SORTS = {
+    'newest': ('Newest', 'create_date', 'desc'),
+    'price_asc': ('Price: Low to High', 'price', 'asc'),
+    'price_desc': ('Price: High to Low', 'price', 'desc'),
+    'price_sqft_asc': ('Price/Sq.Ft: Low to High', 'price_per_sqft', 'asc'),
+    'price_sqft_desc': ('Price/Sq.Ft: High to Low', 'price_per_sqft', 'desc'),
+    'most_viewed': ('Most Viewed', 'views', 'desc'),
+}
+LISTING_DEFAULT_SORT = 'newest'
+# Sort offered, and applied by default, when searching: best search matches first
+LISTING_RELEVANCE_SORT = 'relevance'
+# Sort offered, and applied by default, with a location filter: nearest first
+LISTING_DISTANCE_SORT = 'distance'
+LISTING_PAGE_SIZE = 24
+LISTING_MAX_PAGE_SIZE = 60
+
+# Columns read for a listing card
+LISTING_CARD_FIELDS = ['name', 'category_id.name', 'price', 'plot_area', 'price_per_sqft', 'city', 'zip_code']
+
+
+class Property(models.Model):
+    _inherit = 'property.property'
+
+    def init(self):
+        super().init()
+        # one index per sort key, so that seeking to any page is an index range scan
+        for _label, fname, _direction in LISTING_SORTS.values():
+            create_index(
+                self.env.cr, f'property_property_listing_{fname}_id_idx', self._table, [fname, 'id'],
+                where='is_published',
+            )
+
+    @api.model
+    def _get_listing_domain(self, search='', city='', zip_code='', facets=(), geo=None):
+        """Domain of the listing
+
+        ``facets`` are normalized facet filters (see _normalize_facet_filters)
+        and ``geo`` a location filter (see _parse_geo_filter).
+        """
+        domain = [('is_published', '=', True)] + self._get_facet_domain(facets) + self._get_geo_domain(geo)
+        if search:
+            domain += self._get_search_domain(search)
+        if city:
+            domain.append(('city', 'ilike', city))
+        if zip_code:
+            domain.append(('zip_code', 'ilike', zip_code))
+        return domain
+
+    @api.model
+    def _get_listing_count(self, search='', city='', zip_code='', facets=(), geo=None):
+        """Number of listings matching the filters, cached until a listing changes"""
+        return self._get_cached_aggregate(
+            'listing_count', self._get_map_data_version(), [search, city, zip_code, facets, geo],
+            lambda: self.search_count(self._get_listing_domain(search, city, zip_code, facets, geo)),
+        )
+
+    # -------------------- KEYSET PAGINATION --------------------
+    @api.model
+    def _encode_listing_cursor(self, sort, row, value=None):
+        """Cursor token of ``row``, ``value`` defaults to its sort key"""
+        if value is None:
+            fname = LISTING_SORTS[sort][1]
+            value = row[fname]
+            if fname == 'create_date':
+                # full precision: the rows created in one transaction share their create_date
+                value = value.isoformat()
+        payload = json.dumps([sort, value, row['id']], separators=(',', ':'))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    @api.model
+    def _decode_listing_cursor(self, sort, token):
+        """``(value, id)`` of a cursor token, None when invalid or for another sort"""
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            token_sort, value, record_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (ValueError, TypeError):
+            return None
+        if token_sort != sort or not isinstance(record_id, int) or isinstance(record_id, bool):
+            return None
+        if sort in LISTING_SORTS:
+            if LISTING_SORTS[sort][1] == 'create_date':
+                try:
+                    value = datetime.fromisoformat(value)
+                except (ValueError, TypeError):
+                    return None
+            elif not isinstance(value, (int, float)) or isinstance(value, bool):
+                return None
+        return value, record_id
+
+    @api.model
+    def _get_keyset_condition(self, sort, cursor, forward=True):
+        """SQL condition of the rows after (or before) ``cursor`` in the ``sort`` order
+
+        A row comparison on ``(sort key, id)``, which PostgreSQL answers with
+        a range scan of the index of the sort key.
+        """
+        _label, fname, direction = LISTING_SORTS[sort]
+        value, record_id = cursor
+        return SQL(
+            "(%s, %s) %s (%s, %s)",
+            SQL.identifier(self._table, fname), SQL.identifier(self._table, 'id'),
+            SQL('>' if (direction == 'asc') == forward else '<'), value, record_id,
+        )
+
+    @api.model
+    def _get_listing_page(self, domain, sort=LISTING_DEFAULT_SORT, limit=LISTING_PAGE_SIZE, after=None, before=None,
+                          search='', geo=None):
+        """One page of listing cards, seeking from a cursor instead of an offset
+
+        ``after``/``before`` are the cursor tokens of the last/first card of
+        the adjacent page. Every page is read from the sort key index the
+        same way, so deep pages cost as much as the first one.
+
+        Returns ``{'rows', 'next_cursor', 'prev_cursor'}``.
+        """
+        if sort == LISTING_RELEVANCE_SORT and search:
+            def rank(limit, offset):
+                return self._search_ranked(domain, search, limit=limit, offset=offset)
+
+            return self._get_ranked_page(sort, rank, limit=limit, after=after, before=before)
+        if sort == LISTING_DISTANCE_SORT and geo:
+            latitude, longitude = self._get_geo_center(geo)
+
+            def rank(limit, offset):
+                nearest = self._search_nearest(domain, latitude, longitude, limit=limit, offset=offset)
+                return [record_id for record_id, _distance in nearest]
+
+            return self._get_ranked_page(sort, rank, limit=limit, after=after, before=before)
+        sort = sort if sort in LISTING_SORTS else LISTING_DEFAULT_SORT
+        _label, fname, direction = LISTING_SORTS[sort]
+        after = after and self._decode_listing_cursor(sort, after)
+        before = not after and before and self._decode_listing_cursor(sort, before)
+
+        backward = bool(before)
+        if backward:
+            reverse_direction = 'asc' if direction == 'desc' else 'desc'
+            order = f'{fname} {reverse_direction}, id {reverse_direction}'
+        else:
+            order = f'{fname} {direction}, id {direction}'
+        query = self._search(domain, order=order, limit=limit + 1)
+        if before or after:
+            query.add_where(self._get_keyset_condition(sort, before or after, forward=not backward))
+
+        field_names = LISTING_CARD_FIELDS + ([fname] if fname not in LISTING_CARD_FIELDS else [])
+        rows = self._fetch_public_rows([('id', 'in', query)], field_names, image_fields=['card_image'], order=order)
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if backward:
+            rows.reverse()
+        has_next = bool(rows) and (has_more if not backward else True)
+        has_prev = bool(rows) and (bool(after) if not backward else has_more)
+        return {
+            'rows': rows,
+            'next_cursor': self._encode_listing_cursor(sort, rows[-1]) if has_next else None,
+            'prev_cursor': self._encode_listing_cursor(sort, rows[0]) if has_prev else None,
+        }
+
+    @api.model
+    def _get_ranked_page(self, sort, rank, limit=LISTING_PAGE_SIZE, after=None, before=None):
+        """One page of listing cards in a computed order, like relevance or distance
+
+        ``rank(limit, offset)`` returns the ids of a slice of the ranking.
+        The rank of a card is not stored, so the cursors hold its position
+        rather than a sort key; the ranking query only keeps the best
+        ``offset + limit`` rows, whatever the page.
+        """
+        def decode(token):
+            cursor = token and self._decode_listing_cursor(sort, token)
+            return cursor if cursor and isinstance(cursor[0], int) and cursor[0] >= 0 else None
+
+        after = decode(after)
+        before = not after and decode(before)
+        offset = 0
+        if after:
+            offset = after[0] + 1
+        elif before:
+            offset = max(0, before[0] - limit)
+            limit = before[0] - offset
+        if limit <= 0:
+            return {'rows': [], 'next_cursor': None, 'prev_cursor': None}
+
+        ids = rank(limit + 1, offset)
+        has_more = len(ids) > limit
+        ids = ids[:limit]
+        rows = self._fetch_public_rows([('id', 'in', ids)], LISTING_CARD_FIELDS, image_fields=['card_image'])
+        position = {record_id: index for index, record_id in enumerate(ids)}
+        rows.sort(key=lambda row: position[row['id']])
+        return {
+            'rows': rows,
+            'next_cursor': (
+                self._encode_listing_cursor(sort, rows[-1], offset + len(rows) - 1)
+                if rows and (has_more or before) else None
+            ),
+            'prev_cursor': (
+                self._encode_listing_cursor(sort, rows[0], offset) if rows and offset else None
+            ),
+        }
@@ -0,0 +1,260 @@
+from odoo import models, api
+from odoo.tools import SQL
+from ..tools.lru_cache import SizedLRUCache
+import json
+import logging
+import math
+
+_logger = logging.getLogger(__name__)
+
+# Reusable marker color palette, assigned to categories in name order
+MARKER_PALETTE = ["#059669", "#dc2626", "#7c3aed", "#ea580c", "#2563eb", "#d97706", "#0891b2", "#9333ea"]
+
+# Hard cap on markers returned for a single viewport request
+MAP_MARKER_LIMIT = 500
+
+# From this zoom level on, the map shows individual markers instead of clusters
+CLUSTER_MAX_ZOOM = 15
+
+# Size of a clustering grid cell, in screen pixels
+CLUSTER_CELL_PX = 64
+
+# Serialized viewport markers per database, data version, filters and snapped viewport, per worker process
+MAP_MARKER_CACHE = SizedLRUCache(32 * 1024 * 1024)
+
+# Columns read to build a map marker
+MAP_MARKER_FIELDS = [
+    'name', 'latitude', 'longitude', 'street', 'city', 'zip_code', 'price', 'plot_area',
+    'contact_phone', 'contact_email', 'contact_name', 'short_description', 'category_id.name',
+    'nearby_landmarks', 'views', 'seo_title',
+]
+
+
+class Property(models.Model):
+    _inherit = 'property.property'
+
+    @api.model
+    def _get_map_domain(self, city=None, category_id=None):
+        """Domain of published, geocoded properties shown on the home page map"""
+        domain = [
+            ('is_published', '=', True),
+            ('latitude', '!=', False),
+            ('longitude', '!=', False),
+        ]
+        if city:
+            domain.append(('city', '=', city))
+        if category_id:
+            domain.append(('category_id', '=', category_id))
+        return domain
+
+    @api.model
+    def _get_map_category_colors(self, city=None):
+        """Stable category -> color mapping for the categories present on the map"""
+        groups = self._read_group(self._get_map_domain(city), ['category_id'])
+        names = sorted({category.name or 'Property' for category, in groups})
+        return {name: MARKER_PALETTE[idx % len(MARKER_PALETTE)] for idx, name in enumerate(names)}
+
+    @api.model
+    def _get_map_bounds(self, city=None):
+        """Bounding box and count of the map properties, used for the initial view"""
+        [(south, north, west, east, count)] = self._read_group(
+            self._get_map_domain(city), [],
+            ['latitude:min', 'latitude:max', 'longitude:min', 'longitude:max', '__count'],
+        )
+        if not count:
+            return {'count': 0, 'bounds': None}
+        return {'count': count, 'bounds': [south, west, north, east]}
+
+    @api.model
+    def _get_map_data_version(self):
+        """Token changing whenever the published properties or categories change"""
+        [(last_write, count)] = self._read_group([('is_published', '=', True)], [], ['write_date:max', '__count'])
+        [(category_write,)] = self.env['property.category']._read_group([], [], ['write_date:max'])
+        return f'{last_write}|{count}|{category_write}'
+
+    @api.model
+    def _get_map_page_data(self, city=None):
+        """Initial bounds, count and legend colors of the home page map
+
+        Shared by the workers through ``property.map.cache`` for the whole
+        map and the cities of published properties; any other city is built
+        on each request rather than stored.
+        """
+        def build():
+            return json.dumps(dict(self._get_map_bounds(city), category_colors=self._get_map_category_colors(city)))
+
+        if city and city not in {facet_city for facet_city, _count in self._get_city_facets()}:
+            return json.loads(build())
+        payload = self.env['property.map.cache']._get_payload(
+            f"page|{city or ''}", self._get_map_data_version(), build,
+        )
+        return json.loads(payload)
+
+    @api.model
+    def _get_map_markers_json(self, bounds, zoom=None, city=None, category_id=None):
+        """Serialized ``get_map_markers`` result, cached per viewport in the worker
+
+        The zoom is clamped to the clustering levels and the viewport snapped
+        outward to their grid, so that visitors looking at the same area
+        share cache entries and edge clusters are always complete.
+        """
+        zoom = None if zoom is None else max(0, min(int(zoom), CLUSTER_MAX_ZOOM))
+        cell = self._get_map_cluster_cell_size(CLUSTER_MAX_ZOOM if zoom is None else zoom)
+        south, west, north, east = bounds
+        snapped = [
+            math.floor(south / cell) * cell,
+            math.floor(west / cell) * cell,
+            math.ceil(north / cell) * cell,
+            math.ceil(east / cell) * cell,
+        ]
+        key = '|'.join([
+            self.env.cr.dbname, self._get_map_data_version(), city or '', str(category_id or ''),
+            '' if zoom is None else str(zoom), ','.join('%.6f' % value for value in snapped),
+        ])
+        payload = MAP_MARKER_CACHE.get(key)
+        if payload is None:
+            payload = json.dumps(self.get_map_markers(snapped, zoom=zoom, city=city, category_id=category_id))
+            MAP_MARKER_CACHE.set(key, payload)
+        return payload
+
+    @api.model
+    def _get_map_viewport_domain(self, bounds, city=None, category_id=None):
+        """Map domain restricted to a (south, west, north, east) bounding box"""
+        south, west, north, east = bounds
+        return self._get_map_domain(city, category_id) + [
+            ('latitude', '>=', max(south, -90.0)),
+            ('latitude', '<=', min(north, 90.0)),
+            ('longitude', '>=', max(west, -180.0)),
+            ('longitude', '<=', min(east, 180.0)),
+        ]
+
+    @api.model
+    def get_map_markers(self, bounds, zoom=None, city=None, category_id=None, limit=MAP_MARKER_LIMIT):
+        """Return the markers or clusters inside a (south, west, north, east) viewport
+
+        Below ``CLUSTER_MAX_ZOOM`` properties are bucketed on a grid whose cell
+        size depends on the zoom level; cells holding a single property are
+        still returned as plain markers.
+        """
+        domain = self._get_map_viewport_domain(bounds, city, category_id)
+        category_colors = self._get_map_category_colors(city)
+        if zoom is None or zoom >= CLUSTER_MAX_ZOOM:
+            rows = self._fetch_public_rows(
+                domain, MAP_MARKER_FIELDS, image_fields=['card_image'], order='id', limit=limit + 1,
+            )
+            return {
+                'clusters': [],
+                'markers': [self._prepare_map_marker(row, category_colors) for row in rows[:limit]],
+                'truncated': len(rows) > limit,
+                'category_colors': category_colors,
+            }
+
+        clusters, single_ids = self._get_map_clusters(domain, zoom)
+        rows = self._fetch_public_rows(
+            [('id', 'in', single_ids[:limit])], MAP_MARKER_FIELDS, image_fields=['card_image'], order='id',
+        )
+        return {
+            'clusters': clusters,
+            'markers': [self._prepare_map_marker(row, category_colors) for row in rows],
+            'truncated': len(single_ids) > limit,
+            'category_colors': category_colors,
+        }
+
+    @api.model
+    def _get_map_cluster_cell_size(self, zoom):
+        """Grid cell size in degrees for a zoom level (256px web mercator tiles)"""
+        zoom = max(0, min(int(zoom), CLUSTER_MAX_ZOOM))
+        return 360.0 * CLUSTER_CELL_PX / (256 * math.pow(2, zoom))
+
+    @api.model
+    def _get_map_clusters(self, domain, zoom):
+        """Aggregate the properties matching ``domain`` on a per-zoom grid
+
+        Returns ``(clusters, single_ids)``: the cluster centroids with their
+        counts and per-category breakdown, and the ids of the properties alone
+        in their cell.
+        """
+        self.flush_model(['latitude', 'longitude', 'category_id', 'is_published', 'city'])
+        cell = self._get_map_cluster_cell_size(zoom)
+        query = self._search(domain)
+        latitude = SQL.identifier(self._table, 'latitude')
+        longitude = SQL.identifier(self._table, 'longitude')
+        self.env.cr.execute(SQL(
+            """
+            SELECT floor(%(lat)s / %(cell)s)::int, floor(%(lng)s / %(cell)s)::int, %(category)s,
+                   count(*), sum(%(lat)s), sum(%(lng)s),
+                   min(%(lat)s), min(%(lng)s), max(%(lat)s), max(%(lng)s), min(%(id)s)
+              FROM %(table)s
+             WHERE %(where)s
+          GROUP BY 1, 2, 3
+            """,
+            lat=latitude,
+            lng=longitude,
+            cell=cell,
+            category=SQL.identifier(self._table, 'category_id'),
+            id=SQL.identifier(self._table, 'id'),
+            table=query.from_clause,
+            where=query.where_clause,
+        ))
+        rows = self.env.cr.fetchall()
+
+        category_names = {
+            category.id: category.name
+            for category in self.env['property.category'].browse({row[2] for row in rows if row[2]})
+        }
+        cells = {}
+        for cell_y, cell_x, category_id, count, sum_lat, sum_lng, south, west, north, east, min_id in rows:
+            bucket = cells.setdefault((cell_y, cell_x), {
+                'count': 0, 'sum_lat': 0.0, 'sum_lng': 0.0, 'categories': {},
+                'bounds': [south, west, north, east], 'min_id': min_id,
+            })
+            bucket['count'] += count
+            bucket['sum_lat'] += sum_lat
+            bucket['sum_lng'] += sum_lng
+            name = category_names.get(category_id) or 'Property'
+            bucket['categories'][name] = bucket['categories'].get(name, 0) + count
+            bounds = bucket['bounds']
+            bucket['bounds'] = [min(bounds[0], south), min(bounds[1], west), max(bounds[2], north), max(bounds[3], east)]
+            bucket['min_id'] = min(bucket['min_id'], min_id)
+
+        clusters = []
+        single_ids = []
+        for bucket in cells.values():
+            if bucket['count'] == 1:
+                single_ids.append(bucket['min_id'])
+                continue
+            clusters.append({
+                'latitude': bucket['sum_lat'] / bucket['count'],
+                'longitude': bucket['sum_lng'] / bucket['count'],
+                'count': bucket['count'],
+                'categories': bucket['categories'],
+                'bounds': bucket['bounds'],
+            })
+        return clusters, sorted(single_ids)
+
+    @api.model
+    def _prepare_map_marker(self, row, category_colors):
+        """Build the JSON marker of a property from its ``MAP_MARKER_FIELDS`` row"""
+        cat = row['category_id.name'] or 'Property'
+        return {
+            'id': row['id'],
+            'name': row['name'] or '',
+            'latitude': float(row['latitude']),
+            'longitude': float(row['longitude']),
+            'street': row['street'] or '',
+            'city': row['city'] or '',
+            'zip_code': row['zip_code'] or '',
+            'price': float(row['price']) if row['price'] else 0,
+            'plot_area': row['plot_area'] or 0,
+            'contact_phone': row['contact_phone'] or '',
+            'contact_email': row['contact_email'] or '',
+            'contact_name': row['contact_name'] or '',
+            'short_description': row['short_description'] or '',
+            'image_url': row['card_image_url'] or None,
+            'property_type': cat,
+            'nearby_landmarks': row['nearby_landmarks'] or '',
+            'views': row['views'] or 0,
+            'seo_title': row['seo_title'] or '',
+            'marker_color': category_colors.get(cat, '#4f46e5'),
+            'full_address': ", ".join(filter(None, [row['street'], row['city'], row['zip_code']])),
+        }
@@ -0,0 +1,68 @@
+from odoo import models, fields, api
+from datetime import timedelta
+from psycopg2 import errors
+import logging
+import zlib
+
+_logger = logging.getLogger(__name__)
+
+# First key of the two-key PostgreSQL advisory locks taken while rebuilding
+MAP_CACHE_LOCK_NAMESPACE = 7311
+
+
+class PropertyMapCache(models.Model):
+    _name = 'property.map.cache'
+    _description = 'Property Map Payload Cache'
+    _log_access = False
+
+    key = fields.Char(string='Key', required=True, index=True)
+    version = fields.Char(string='Data Version', required=True)
+    payload = fields.Text(string='Serialized Payload')
+    date = fields.Datetime(string='Built On')
+
+    _sql_constraints = [
+        ('key_uniq', 'unique(key)', 'A map cache key must be unique.'),
+    ]
+
+    @api.model
+    def _read_payload(self, key, version):
+        self.env.cr.execute("SELECT payload FROM property_map_cache WHERE key = %s AND version = %s", [key, version])
+        row = self.env.cr.fetchone()
+        return row[0] if row else None
+
+    @api.model
+    def _get_payload(self, key, version, build):
+        """Return the payload cached for ``key`` at ``version``, building it on a miss
+
+        Entries live in the database so every worker shares them. Everything
+        happens in the transaction of the request: on a burst of misses on
+        the same key, only the request holding its advisory lock stores the
+        payload, the others serve the one they built without writing.
+        """
+        payload = self._read_payload(key, version)
+        if payload is not None:
+            return payload
+
+        payload = build()
+        lock_id = zlib.crc32(key.encode('utf-8')) - 2 ** 31
+        self.env.cr.execute("SELECT pg_try_advisory_xact_lock(%s, %s)", [MAP_CACHE_LOCK_NAMESPACE, lock_id])
+        if not self.env.cr.fetchone()[0]:
+            return payload
+        try:
+            with self.env.cr.savepoint(flush=False):
+                self.env.cr.execute("""
+                    INSERT INTO property_map_cache (key, version, payload, date)
+                         VALUES (%s, %s, %s, now() at time zone 'UTC')
+                    ON CONFLICT (key) DO UPDATE
+                            SET version = EXCLUDED.version, payload = EXCLUDED.payload, date = EXCLUDED.date
+                """, [key, version, payload])
+        except errors.SerializationFailure:
+            # stored meanwhile by a request committed after this one started
+            return payload
+        _logger.debug("Rebuilt map payload %s (version %s)", key, version)
+        return payload
+
+    @api.model
+    def _gc_map_cache(self, days=1):
+        """Drop entries not rebuilt for ``days``, typically cities no longer listed"""
+        self.search([('date', '<', fields.Datetime.now() - timedelta(days=days))]).unlink()
@@ -0,0 +1,245 @@
+from odoo import models, fields, api
+import logging
+import numpy as np
+
+_logger = logging.getLogger(__name__)
+
+# Number of neighbours stored per property
+SIMILARITY_NEIGHBOURS = 6
+
+# Properties compared at once, bounds the distance matrix to CHUNK x published
+SIMILARITY_CHUNK = 512
+
+# Relative weight of each feature group in the distance
+SIMILARITY_WEIGHTS = {
+    'price': 2.0,
+    'plot_area': 1.0,
+    'price_per_sqft': 1.5,
+    'location': 2.0,
+    'category_id': 2.0,
+    'facing_direction': 0.5,
+    'title_status': 0.5,
+}
+
+
+def _standardize(values):
+    """Z-score of ``values``, missing (NaN) values land on the mean"""
+    if np.isnan(values).all():
+        return np.zeros_like(values)
+    std = np.nanstd(values) or 1.0
+    return np.nan_to_num((values - np.nanmean(values)) / std)
+
+
+def _one_hot(values):
+    """One-hot encoding of ``values``, missing values encode as all zeros
+
+    Columns are scaled so that two different categories are at distance 1.
+    """
+    categories = sorted({value for value in values if value})
+    if not categories:
+        return np.zeros((len(values), 0))
+    matrix = np.array([[value == category for category in categories] for value in values], dtype=float)
+    return matrix / np.sqrt(2)
+
+
+class PropertySimilarity(models.Model):
+    _name = 'property.similarity'
+    _description = 'Property Nearest Neighbour'
+    _order = 'property_id, rank'
+    _log_access = False
+
+    property_id = fields.Many2one('property.property', string='Property', required=True,
+                                  index=True, ondelete='cascade')
+    neighbour_id = fields.Many2one('property.property', string='Similar Property', required=True,
+                                   index=True, ondelete='cascade')
+    rank = fields.Integer(string='Rank', required=True)
+    distance = fields.Float(string='Distance', required=True)
+
+    # -------------------- FEATURES --------------------
+    @api.model
+    def _get_feature_matrix(self):
+        """Return ``(ids, features)`` for all the published properties
+
+        Numeric features are log-scaled and standardized, coordinates share
+        one scale so that distances stay isotropic, and selections and the
+        category are one-hot encoded. Each group is multiplied by its
+        ``SIMILARITY_WEIGHTS`` entry.
+        """
+        Property = self.env['property.property']
+        Property.flush_model([
+            'is_published', 'price', 'plot_area', 'price_per_sqft', 'latitude', 'longitude',
+            'category_id', 'facing_direction', 'title_status',
+        ])
+        self.env.cr.execute("""
+            SELECT id, price, plot_area, price_per_sqft, latitude, longitude,
+                   category_id, facing_direction, title_status
+              FROM property_property
+             WHERE is_published
+          ORDER BY id
+        """)
+        rows = self.env.cr.fetchall()
+        if not rows:
+            return np.zeros(0, dtype=int), np.zeros((0, 0))
+        data = list(zip(*rows))
+        ids = np.array(data[0], dtype=int)
+
+        columns = []
+        for idx, name in ((1, 'price'), (2, 'plot_area'), (3, 'price_per_sqft')):
+            # 0 means "on request" / unknown, not a free property
+            values = np.array([value or np.nan for value in data[idx]], dtype=float)
+            columns.append(_standardize(np.log1p(values))[:, None] * SIMILARITY_WEIGHTS[name])
+
+        coords = np.array([
+            [lat or np.nan, lng or np.nan] for lat, lng in zip(data[4], data[5])
+        ], dtype=float)
+        if not np.isnan(coords).all():
+            scale = np.nanstd(coords) or 1.0
+            coords = np.nan_to_num((coords - np.nanmean(coords, axis=0)) / scale)
+        else:
+            coords = np.zeros_like(coords)
+        columns.append(coords * SIMILARITY_WEIGHTS['location'])
+
+        for idx, name in ((6, 'category_id'), (7, 'facing_direction'), (8, 'title_status')):
+            columns.append(_one_hot(data[idx]) * SIMILARITY_WEIGHTS[name])
+
+        return ids, np.hstack(columns)
+
+    @api.model
+    def _iter_distances(self, features, indexes):
+        """Yield ``(chunk, distances)`` from the rows ``indexes`` to every row
+
+        Squared euclidean distances are computed as matrix products, one
+        chunk of ``SIMILARITY_CHUNK`` rows at a time; a row is at an infinite
+        distance from itself.
+        """
+        norms = np.einsum('ij,ij->i', features, features)
+        for start in range(0, len(indexes), SIMILARITY_CHUNK):
+            chunk = np.asarray(indexes[start:start + SIMILARITY_CHUNK])
+            distances = norms[chunk, None] + norms[None, :] - 2.0 * features[chunk] @ features.T
+            np.maximum(distances, 0.0, out=distances)
+            distances[np.arange(len(chunk)), chunk] = np.inf
+            yield chunk, distances
+
+    @api.model
+    def _compute_neighbours(self, ids, features, indexes, k=SIMILARITY_NEIGHBOURS):
+        """Return ``{property_id: [(neighbour_id, distance)]}`` for the rows ``indexes``"""
+        k = min(k, len(ids) - 1)
+        result = {}
+        if k <= 0:
+            return {int(ids[idx]): [] for idx in indexes}
+        for chunk, distances in self._iter_distances(features, indexes):
+            nearest = np.argpartition(distances, k - 1, axis=1)[:, :k]
+            nearest_distances = np.take_along_axis(distances, nearest, axis=1)
+            order = np.argsort(nearest_distances, axis=1)
+            nearest = np.take_along_axis(nearest, order, axis=1)
+            nearest_distances = np.take_along_axis(nearest_distances, order, axis=1)
+            for row, idx in enumerate(chunk):
+                result[int(ids[idx])] = [
+                    (int(ids[col]), float(np.sqrt(dist))) for col, dist in zip(nearest[row], nearest_distances[row])
+                ]
+        return result
+
+    # -------------------- STORAGE --------------------
+    @api.model
+    def _store_neighbours(self, neighbours):
+        """Replace the stored neighbours of the properties in ``neighbours``"""
+        property_ids = list(neighbours)
+        if not property_ids:
+            return
+        self.env.cr.execute("DELETE FROM property_similarity WHERE property_id = ANY(%s)", [property_ids])
+        rows = [
+            (property_id, neighbour_id, rank, distance)
+            for property_id, items in neighbours.items()
+            for rank, (neighbour_id, distance) in enumerate(items, 1)
+        ]
+        if rows:
+            self.env.cr.execute("""
+                INSERT INTO property_similarity (property_id, neighbour_id, rank, distance)
+                SELECT * FROM unnest(%s::int[], %s::int[], %s::int[], %s::float8[])
+            """, [list(column) for column in zip(*rows)])
+        self.invalidate_model()
+
+    @api.model
+    def _get_stored_radius(self, ids):
+        """Distance of the farthest stored neighbour of each row of ``ids``
+
+        Properties with less than ``SIMILARITY_NEIGHBOURS`` neighbours have an
+        infinite radius: any property is a candidate for them.
+        """
+        radius = np.full(len(ids), np.inf)
+        self.env.cr.execute("""
+            SELECT property_id, max(distance)
+              FROM property_similarity
+          GROUP BY property_id
+            HAVING count(*) >= %s
+        """, [SIMILARITY_NEIGHBOURS])
+        position = {int(property_id): idx for idx, property_id in enumerate(ids)}
+        for property_id, distance in self.env.cr.fetchall():
+            if property_id in position:
+                radius[position[property_id]] = distance
+        return radius
+
+    # -------------------- REFRESH --------------------
+    @api.model
+    def _refresh_similarities(self, full=False):
+        """Recompute the stored neighbours of the changed properties
+
+        Properties are flagged with ``similarity_dirty`` when a feature or
+        their publication changes. Their own neighbours are recomputed, as
+        well as those of the properties that listed them, or that are now
+        closer to them than their current farthest neighbour. The feature
+        scaling drifts slightly between full rebuilds, which ``full=True``
+        (run nightly) corrects.
+        """
+        self.env['property.property'].flush_model(['similarity_dirty'])
+        self.env.cr.execute("SELECT id, write_date FROM property_property WHERE similarity_dirty")
+        dirty = self.env.cr.fetchall()
+        if not dirty and not full:
+            return 0
+        dirty_ids = [property_id for property_id, _write_date in dirty]
+
+        ids, features = self._get_feature_matrix()
+        position = {int(property_id): idx for idx, property_id in enumerate(ids)}
+        if full:
+            targets = set(range(len(ids)))
+            self.env.cr.execute("DELETE FROM property_similarity WHERE property_id != ALL(%s)", [ids.tolist()])
+        else:
+            # unpublished properties lose their own neighbours
+            self.env.cr.execute(
+                "DELETE FROM property_similarity WHERE property_id = ANY(%s) AND property_id != ALL(%s)",
+                [dirty_ids, ids.tolist()],
+            )
+            changed = [position[property_id] for property_id in dirty_ids if property_id in position]
+            targets = set(changed)
+            self.env.cr.execute(
+                "SELECT DISTINCT property_id FROM property_similarity WHERE neighbour_id = ANY(%s)", [dirty_ids],
+            )
+            targets.update(position[row[0]] for row in self.env.cr.fetchall() if row[0] in position)
+            if changed:
+                radius = self._get_stored_radius(ids)
+                for _chunk, distances in self._iter_distances(features, changed):
+                    closer = (np.sqrt(distances) < radius[None, :]).any(axis=0)
+                    targets.update(np.flatnonzero(closer).tolist())
+
+        neighbours = self._compute_neighbours(ids, features, sorted(targets))
+        self._store_neighbours(neighbours)
+
+        if dirty:
+            # skip the properties changed again meanwhile, they stay dirty
+            self.env.cr.execute("""
+                UPDATE property_property p
+                   SET similarity_dirty = false
+                  FROM unnest(%s::int[], %s::timestamp[]) AS done(id, write_date)
+                 WHERE p.id = done.id AND p.write_date IS NOT DISTINCT FROM done.write_date
+            """, [dirty_ids, [write_date for _property_id, write_date in dirty]])
+            self.env['property.property'].invalidate_model(['similarity_dirty'])
+        _logger.info("Refreshed the similar properties of %s properties (%s changed)", len(neighbours), len(dirty))
+        return len(neighbours)
+
+    @api.model
+    def _cron_refresh_similarities(self):
+        self._refresh_similarities()
+
+    @api.model
+    def _cron_rebuild_similarities(self):
+        self._refresh_similarities(full=True)
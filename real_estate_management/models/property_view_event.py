@@ -0,0 +1,52 @@
+from odoo import models, fields, api
+import logging
+
+_logger = logging.getLogger(__name__)
+
+
+class PropertyViewEvent(models.Model):
+    _name = 'property.view.event'
+    _description = 'Property Page View Buffer'
+    _log_access = False
+
+    property_id = fields.Many2one('property.property', string='Property', required=True, ondelete='cascade')
+    date = fields.Datetime(string='Viewed On', required=True)
+
+    @api.model
+    def _record_view(self, property_id):
+        """Append a page view of ``property_id`` to the buffer
+
+        A plain insert: it never locks the property row, so concurrent
+        visitors of the same listing do not wait on each other.
+        """
+        self.env.cr.execute(
+            "INSERT INTO property_view_event (property_id, date) VALUES (%s, now() at time zone 'UTC')",
+            [property_id],
+        )
+
+    @api.model
+    def _cron_flush_view_events(self):
+        """Fold the buffered views into ``views`` and ``last_viewed``
+
+        The buffer is emptied and applied as one aggregated update per
+        property in a single statement, so views recorded while the flush
+        runs are kept for the next one.
+        """
+        self.env.cr.execute("""
+            WITH flushed AS (
+                DELETE FROM property_view_event RETURNING property_id, date
+            ), totals AS (
+                SELECT property_id, count(*) AS count, max(date) AS last_viewed
+                  FROM flushed
+              GROUP BY property_id
+            )
+            UPDATE property_property p
+               SET views = coalesce(p.views, 0) + totals.count,
+                   last_viewed = greatest(p.last_viewed, totals.last_viewed)
+              FROM totals
+             WHERE p.id = totals.property_id
+        """)
+        updated = self.env.cr.rowcount
+        self.env['property.property'].invalidate_model(['views', 'last_viewed'])
+        if updated:
+            _logger.info("Flushed buffered page views of %s properties", updated)
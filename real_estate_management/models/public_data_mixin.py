@@ -0,0 +1,90 @@
+from odoo import models, api
+from ..tools.image import image_url
+from ..tools.lru_cache import SizedLRUCache
+import json
+import logging
+
+_logger = logging.getLogger(__name__)
+
+# Aggregates of the public pages (counts, facets) per database, data version and arguments, per worker process
+PUBLIC_AGGREGATE_CACHE = SizedLRUCache(8 * 1024 * 1024)
+
+
+class RealEstatePublicDataMixin(models.AbstractModel):
+    _name = 'real.estate.public.data.mixin'
+    _description = 'Column-projected data access for public pages'
+
+    @api.model
+    def _fetch_public_rows(self, domain, field_names, image_fields=(), order=None, limit=None, offset=0):
+        """Fetch the records matching ``domain`` as plain dicts
+
+        Only the columns listed in ``field_names`` are read, so the large HTML
+        and binary fields are never loaded. ``<many2one>.<field>`` names are
+        resolved with one query per related model, and ``image_fields`` are
+        returned as ``<field>_url`` cacheable URLs (empty when there is no
+        image) without reading the image content.
+        """
+        columns = ['write_date'] if image_fields else []
+        related = {}
+        for name in field_names:
+            fname, _dot, subname = name.partition('.')
+            field = self._fields[fname]
+            if field.type == 'binary':
+                raise ValueError(f"Binary field {fname} must be requested through image_fields")
+            if subname:
+                if field.type != 'many2one':
+                    raise ValueError(f"Only many2one fields can be traversed, got {name}")
+                related.setdefault(fname, []).append(subname)
+            columns.append(fname)
+
+        records = self.search_fetch(domain, list(dict.fromkeys(columns)), offset=offset, limit=limit, order=order)
+        if not records:
+            return []
+
+        related_values = {}
+        for fname, subnames in related.items():
+            comodel_records = records.mapped(fname)
+            comodel_records.fetch(subnames)
+            related_values[fname] = {
+                rec.id: {subname: rec[subname] for subname in subnames} for rec in comodel_records
+            }
+
+        image_sizes = {}
+        bin_size_records = records.with_context(bin_size=True)
+        for fname in image_fields:
+            image_sizes[fname] = {rec.id: bool(rec[fname]) for rec in bin_size_records}
+
+        rows = []
+        for rec in records:
+            row = {'id': rec.id}
+            for name in field_names:
+                fname, _dot, subname = name.partition('.')
+                value = rec[fname]
+                if subname:
+                    row[name] = related_values[fname].get(value.id, {}).get(subname, False)
+                elif self._fields[fname].type == 'many2one':
+                    row[name] = value.id
+                else:
+                    row[name] = value
+            for fname in image_fields:
+                row[f'{fname}_url'] = (
+                    image_url(self._name, rec.id, fname, rec.write_date) if image_sizes[fname][rec.id] else ''
+                )
+            rows.append(row)
+        return rows
+
+    @api.model
+    def _get_cached_aggregate(self, name, version, args, build):
+        """JSON value of ``build()`` for the ``args`` of aggregate ``name``, cached while ``version`` is current
+
+        The data version is part of the key, so writes never have to clear
+        anything: entries of older versions are no longer looked up and get
+        evicted. The cache is bounded in size, whatever the free text
+        arguments visitors send.
+        """
+        key = json.dumps([self.env.cr.dbname, self._name, name, version, args], default=str)
+        payload = PUBLIC_AGGREGATE_CACHE.get(key)
+        if payload is None:
+            payload = json.dumps(build())
+            PUBLIC_AGGREGATE_CACHE.set(key, payload)
+        return json.loads(payload)
@@ -0,0 +1,187 @@
+from odoo import models, fields, api
+from odoo.tools import SQL
+from odoo.tools.sql import create_index
+import logging
+import re
+import statistics
+import time
+import unicodedata
+
+_logger = logging.getLogger(__name__)
+
+# Fields matched by the search boxes before the search document existed (see _benchmark_search)
+LEGACY_SEARCH_FIELDS = ('name', 'city', 'zip_code')
+
+# Search terms timed by _benchmark_search when none are given, the last two with typos
+BENCHMARK_SEARCH_TERMS = ('hyderabad', '500032', 'villa plot', 'hydrabad', 'banjra hils')
+
+
+def normalize_search_text(text):
+    """Searchable form of a text: lowercase words without accents nor punctuation"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(char for char in text if not unicodedata.combining(char))
+    return ' '.join(re.sub(r'[\W_]+', ' ', text.casefold()).split())
+
+
+class RealEstateSearchMixin(models.AbstractModel):
+    _name = 'real.estate.search.mixin'
+    _description = 'Trigram search over a normalized search document'
+
+    # Fields concatenated in the search document, set by the inheriting models
+    _search_document_fields = ()
+
+    search_document = fields.Char(
+        string='Search Document', compute='_compute_search_document', store=True, readonly=True,
+        prefetch=False, unaccent=False,
+        help='Normalized text of the searchable fields, indexed with trigrams.',
+    )
+
+    def init(self):
+        super().init()
+        if not self._abstract:
+            self._init_search_index()
+
+    def _init_search_index(self):
+        """Trigram index of the search document, serving both substring and fuzzy matches"""
+        cr = self.env.cr
+        if not self.env.registry.has_trigram:
+            try:
+                with cr.savepoint():
+                    cr.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+                self.env.registry.has_trigram = True
+            except Exception:
+                _logger.warning("pg_trgm is not available, the %s search falls back to sequential scans", self._name)
+                return
+        create_index(
+            cr, f'{self._table}_search_document_trgm_idx', self._table,
+            ['search_document gin_trgm_ops'], method='gin',
+        )
+
+    @api.depends(lambda self: self._search_document_fields)
+    def _compute_search_document(self):
+        for rec in self:
+            rec.search_document = normalize_search_text(' '.join(
+                str(rec[fname]) for fname in rec._search_document_fields if rec[fname]
+            )) or False
+
+    # -------------------- SEARCH --------------------
+    def _get_search_condition(self, term):
+        """SQL condition matching ``term``: every word as a substring, or the whole term with typos"""
+        document = SQL.identifier(self._table, 'search_document')
+        words = normalize_search_text(term).split()
+        condition = SQL(" AND ").join(SQL("%s LIKE %s", document, f'%{word}%') for word in words)
+        if self.env.registry.has_trigram:
+            # word_similarity above pg_trgm.word_similarity_threshold (0.6 by default)
+            condition = SQL("((%s) OR %s <%% %s)", condition, ' '.join(words), document)
+        return condition
+
+    @api.model
+    def _get_search_domain(self, term):
+        """Domain of the records matching the search box ``term``, served by the trigram index"""
+        if not normalize_search_text(term):
+            return []
+        query = self._search([])
+        query.add_where(self._get_search_condition(term))
+        return [('id', 'in', query)]
+
+    @api.model
+    def _search_ranked(self, domain, term, limit=None, offset=0):
+        """Ids of the records of ``domain`` matching ``term``, most relevant first
+
+        Relevance is the trigram word similarity between the term and the
+        search document: exact substrings score 1, typos score lower.
+        """
+        term = normalize_search_text(term)
+        query = self._search(domain)
+        if term:
+            query.add_where(self._get_search_condition(term))
+            document = SQL.identifier(self._table, 'search_document')
+            rank = SQL("word_similarity(%s, %s)", term, document) if self.env.registry.has_trigram else SQL("1")
+            query.order = SQL("%s DESC, %s", rank, SQL.identifier(self._table, 'id'))
+        else:
+            query.order = SQL.identifier(self._table, 'id')
+        query.limit = limit
+        query.offset = offset
+        self.env.cr.execute(query.select())
+        return [row[0] for row in self.env.cr.fetchall()]
+
+    # -------------------- BENCHMARK --------------------
+    @api.model
+    def _benchmark_search(self, size=100000, terms=BENCHMARK_SEARCH_TERMS, limit=24, repeat=5):
+        """Compare the search box latency before and after the trigram index
+
+        ``size`` copies of an existing record are inserted with varied names,
+        cities and ZIP codes, then each term is searched ``repeat`` times
+        with the legacy ``ilike`` domain and with the search document (count
+        and first page). Everything is rolled back at the end.
+
+        Returns ``{term: {'legacy_ms', 'trigram_ms', 'legacy_count', 'trigram_count'}}``
+        with median timings, and logs them.
+        """
+        template = self.search([], limit=1)
+        if not template:
+            return {}
+        self.flush_model()
+        cr = self.env.cr
+        columns = [
+            SQL.identifier(fname) for fname, field in self._fields.items()
+            if field.store and field.column_type and fname not in ('id', 'search_document', *LEGACY_SEARCH_FIELDS)
+        ]
+        document = SQL(" || ' ' || ").join(
+            SQL("coalesce(lower(regexp_replace(%s::text, '[^[:alnum:]]+', ' ', 'g')), '')", SQL.identifier(fname))
+            for fname in self._search_document_fields
+        )
+        results = {}
+        cr.execute("SAVEPOINT search_benchmark")
+        try:
+            cr.execute(SQL("""
+                WITH copies AS (
+                    SELECT p.*,
+                           (ARRAY['Hyderabad', 'Bengaluru', 'Chennai', 'Pune', 'Mumbai', 'Vijayawada',
+                                  'Warangal', 'Visakhapatnam'])[1 + n %% 8] AS bench_city,
+                           (500000 + (random() * 99999)::int)::text AS bench_zip,
+                           (ARRAY['Villa Plot', 'Open Plot', 'Farm Land', 'Commercial Site', 'Apartment'])[1 + n %% 5]
+                               || ' near ' || (ARRAY['Banjara Hills', 'Gachibowli', 'Whitefield', 'Kondapur',
+                                                     'Madhapur', 'Kukatpally'])[1 + n %% 6]
+                               || ' ' || n AS bench_name
+                      FROM %(table)s p, generate_series(1, %(size)s) n
+                     WHERE p.id = %(template)s
+                )
+                INSERT INTO %(table)s (%(columns)s, name, city, zip_code)
+                SELECT %(columns)s, bench_name, bench_city, bench_zip FROM copies
+            """, table=SQL.identifier(self._table), size=size, template=template.id,
+                columns=SQL(", ").join(columns)))
+            cr.execute(SQL(
+                "UPDATE %s SET search_document = %s WHERE search_document IS NULL",
+                SQL.identifier(self._table), document,
+            ))
+            cr.execute(SQL("ANALYZE %s", SQL.identifier(self._table)))
+
+            def timed(func):
+                timings = []
+                for _i in range(repeat):
+                    started = time.perf_counter()
+                    value = func()
+                    timings.append((time.perf_counter() - started) * 1000)
+                return statistics.median(timings), value
+
+            for term in terms:
+                legacy_domain = ['|'] * (len(LEGACY_SEARCH_FIELDS) - 1) + [
+                    (fname, 'ilike', term) for fname in LEGACY_SEARCH_FIELDS
+                ]
+                legacy_ms, legacy_count = timed(lambda: (
+                    self.search(legacy_domain, limit=limit), self.search_count(legacy_domain))[1])
+                trigram_ms, trigram_count = timed(lambda: (
+                    self._search_ranked([], term, limit=limit), self.search_count(self._get_search_domain(term)))[1])
+                results[term] = {
+                    'legacy_ms': round(legacy_ms, 2), 'trigram_ms': round(trigram_ms, 2),
+                    'legacy_count': legacy_count, 'trigram_count': trigram_count,
+                }
+                _logger.info(
+                    "Search benchmark on %s rows of %s, %r: ilike %.2fms (%s hits), trigram %.2fms (%s hits)",
+                    size, self._name, term, legacy_ms, legacy_count, trigram_ms, trigram_count,
+                )
+        finally:
+            cr.execute("ROLLBACK TO SAVEPOINT search_benchmark")
+            self.invalidate_model()
+        return results
@@ -0,0 +1,81 @@
+/** @odoo-module **/
+
+// Typeahead for the inputs marked with data-autocomplete="<kinds>" (comma separated,
+// empty for all kinds), filled from /autocomplete into a <datalist>.
+// Picking a property or agent opens it; with data-autocomplete-select="<select id>",
+// picking a suggestion selects it in that <select> and submits its form.
+
+const AUTOCOMPLETE_DELAY = 150;
+
+function initAutocomplete(input, index) {
+    const datalist = document.createElement('datalist');
+    datalist.id = `autocomplete-list-${index}`;
+    input.after(datalist);
+    input.setAttribute('list', datalist.id);
+    input.setAttribute('autocomplete', 'off');
+
+    const kinds = input.dataset.autocomplete || '';
+    let suggestions = [];
+    let timer = null;
+    let controller = null;
+
+    async function fetchSuggestions(term) {
+        if (controller) {
+            controller.abort();
+        }
+        controller = new AbortController();
+        const params = new URLSearchParams({ term, kinds });
+        try {
+            const response = await fetch(`/autocomplete?${params}`, { signal: controller.signal });
+            if (!response.ok) {
+                return;
+            }
+            suggestions = await response.json();
+        } catch (e) {
+            if (e.name !== 'AbortError') {
+                console.warn('Autocomplete request failed', e);
+            }
+            return;
+        }
+        datalist.replaceChildren(...suggestions.map((suggestion) => {
+            const option = document.createElement('option');
+            option.value = suggestion.label;
+            option.label = suggestion.kind === 'property' || suggestion.kind === 'agent'
+                ? suggestion.kind
+                : `${suggestion.kind} (${suggestion.count})`;
+            return option;
+        }));
+    }
+
+    input.addEventListener('input', () => {
+        const term = input.value.trim();
+        clearTimeout(timer);
+        const picked = suggestions.find((suggestion) => suggestion.label === input.value);
+        if (picked) {
+            onPick(picked);
+            return;
+        }
+        if (!term) {
+            datalist.replaceChildren();
+            return;
+        }
+        timer = setTimeout(() => fetchSuggestions(term), AUTOCOMPLETE_DELAY);
+    });
+
+    function onPick(suggestion) {
+        if (suggestion.url) {
+            window.location.href = suggestion.url;
+            return;
+        }
+        const select = input.dataset.autocompleteSelect && document.getElementById(input.dataset.autocompleteSelect);
+        if (select) {
+            const option = [...select.options].find((opt) => opt.value === suggestion.label);
+            if (option) {
+                select.value = option.value;
+                select.form.submit();
+            }
+        }
+    }
+}
+
+document.querySelectorAll('input[data-autocomplete]').forEach(initAutocomplete);
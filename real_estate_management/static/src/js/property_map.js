@@ -2,25 +2,23 @@
 console.log("Enhanced Property Map with Auto-Hide and Category Colors loaded ✅");
 
 function initPropertyMap() {
-    const dataEl = document.getElementById('property-data');
+    const mapEl = document.getElementById('propertyMap');
     const legendEl = document.getElementById('category-legend');
-    if (!dataEl || !legendEl) {
+    if (!mapEl || !legendEl) {
         console.warn('Property map: required DOM elements not found');
         return;
     }
 
-    // 1) Parse properties JSON safely
-    let properties = [];
+    const endpoint = mapEl.dataset.endpoint || '/property/map/markers';
+    const selectedCity = mapEl.dataset.city || '';
+
+    // 1) Parse initial bounds safely ([south, west, north, east] or null)
+    let initialBounds = null;
     try {
-        const rawProps = dataEl.dataset.properties || '[]';
-        properties = JSON.parse(rawProps);
-        if (!Array.isArray(properties)) {
-            console.error('Property data is not an array');
-            properties = [];
-        }
+        initialBounds = JSON.parse(mapEl.dataset.bounds || 'null');
     } catch (e) {
-        console.error('Invalid property JSON', e);
-        properties = [];
+        console.error('Invalid map bounds JSON', e);
+        initialBounds = null;
     }
 
     // 2) Parse category colors safely
@@ -33,9 +31,20 @@ function initPropertyMap() {
         categoryColors = {};
     }
 
-    console.log("Property map: loaded properties", properties.length);
     console.log("Property map: category colors", categoryColors);
 
+    function renderLegend() {
+        legendEl.innerHTML = Object.entries(categoryColors)
+            .map(
+                ([cat, col]) => `
+              <div class="legend-item">
+                <div class="legend-color" style="background:${col}"></div>
+                <span>${cat}</span>
+              </div>`
+            )
+            .join('');
+    }
+
     function initMap() {
         if (typeof L === 'undefined') {
             // wait for leaflet.js if it is still loading
@@ -43,19 +52,14 @@ function initPropertyMap() {
             return;
         }
 
-        const el = document.getElementById('propertyMap');
-        if (!el) {
-            console.warn('Property map: #propertyMap not found');
-            return;
-        }
-
-        const map = L.map(el);
+        const map = L.map(mapEl);
 
         L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
             attribution: '© OpenStreetMap contributors',
             maxZoom: 19,
         }).addTo(map);
 
+        const markerLayer = L.layerGroup().addTo(map);
         let openPopupMarker = null;
         let pointerInsidePopup = false;
 
@@ -99,20 +103,58 @@ function initPropertyMap() {
                 </div>`;
         }
 
-        const markerLatLngs = [];
+        function clusterIcon(cluster) {
+            // Bubble colored after the dominant category, sized by count
+            const [topCategory] = Object.entries(cluster.categories || {})
+                .sort((a, b) => b[1] - a[1])[0] || ['Property'];
+            const color = categoryColors[topCategory] || '#4f46e5';
+            const size = Math.round(Math.min(72, 32 + Math.log10(cluster.count) * 14));
+            return L.divIcon({
+                className: 'cluster-marker',
+                html: `<div style="
+                    width:${size}px;height:${size}px;border-radius:50%;
+                    background:${color};border:4px solid rgba(255,255,255,0.85);
+                    box-shadow:0 3px 12px rgba(0,0,0,0.3);
+                    display:flex;align-items:center;justify-content:center;
+                    font-size:13px;font-weight:700;color:white;cursor:pointer;
+                ">${cluster.count}</div>`,
+                iconSize: [size, size],
+                iconAnchor: [size / 2, size / 2],
+            });
+        }
+
+        function addCluster(cluster) {
+            const marker = L.marker([cluster.latitude, cluster.longitude], {
+                icon: clusterIcon(cluster),
+            }).addTo(markerLayer);
+
+            const breakdown = Object.entries(cluster.categories || {})
+                .map(([cat, count]) => `${cat}: ${count}`)
+                .join('<br/>');
+            marker.bindTooltip(`<strong>${cluster.count} properties</strong><br/>${breakdown}`, {
+                direction: 'top',
+            });
+
+            // Expand the cluster by zooming onto the properties it holds
+            marker.on('click', () => {
+                const [south, west, north, east] = cluster.bounds;
+                if (south === north && west === east) {
+                    map.setView([south, west], Math.min(map.getZoom() + 2, map.getMaxZoom()));
+                } else {
+                    map.fitBounds(L.latLngBounds([south, west], [north, east]).pad(0.1));
+                }
+            });
+        }
 
-        // 3) Add markers
-        properties.forEach((p) => {
+        function addMarker(p) {
             if (!p.latitude || !p.longitude) {
                 return;
             }
 
-            const color = categoryColors[p.property_type] || '#4f46e5';
+            const color = p.marker_color || categoryColors[p.property_type] || '#4f46e5';
             const marker = L.marker([p.latitude, p.longitude], {
                 icon: createIcon(color),
-            }).addTo(map);
-
-            markerLatLngs.push([p.latitude, p.longitude]);
+            }).addTo(markerLayer);
 
             marker.bindPopup(popupHtml(p), {
                 closeButton: false,
@@ -161,7 +203,79 @@ function initPropertyMap() {
                     }, 100);
                 });
             });
-        });
+        }
+
+        // 3) Load markers for the current viewport, cancelling stale requests
+        let pendingRequest = null;
+        let lastQuery = null;
+
+        function loadMarkers() {
+            const b = map.getBounds();
+            // the server only accepts coordinates of the world, not of its wrapped copies
+            const clamp = (value, limit) => Math.max(-limit, Math.min(limit, value)).toFixed(5);
+            const params = new URLSearchParams({
+                south: clamp(b.getSouth(), 90),
+                west: clamp(b.getWest(), 180),
+                north: clamp(b.getNorth(), 90),
+                east: clamp(b.getEast(), 180),
+                zoom: map.getZoom(),
+            });
+            if (selectedCity) {
+                params.set('city', selectedCity);
+            }
+            const query = params.toString();
+            if (query === lastQuery) {
+                // moveend and zoomend fire together, skip the duplicate
+                return;
+            }
+            lastQuery = query;
+
+            if (pendingRequest) {
+                pendingRequest.abort();
+            }
+            const controller = new AbortController();
+            pendingRequest = controller;
+
+            fetch(`${endpoint}?${query}`, {signal: controller.signal, credentials: 'same-origin'})
+                .then((response) => {
+                    if (!response.ok) {
+                        throw new Error(`HTTP ${response.status}`);
+                    }
+                    return response.json();
+                })
+                .then((data) => {
+                    if (pendingRequest !== controller) {
+                        return;
+                    }
+                    pendingRequest = null;
+                    if (data.category_colors) {
+                        categoryColors = data.category_colors;
+                        renderLegend();
+                    }
+                    if (openPopupMarker) {
+                        openPopupMarker.closePopup();
+                        openPopupMarker = null;
+                    }
+                    markerLayer.clearLayers();
+                    (data.clusters || []).forEach(addCluster);
+                    (data.markers || []).forEach(addMarker);
+                    if (data.truncated) {
+                        console.info('Property map: viewport truncated, zoom in to see every property');
+                    }
+                })
+                .catch((e) => {
+                    if (e.name === 'AbortError') {
+                        return;
+                    }
+                    if (pendingRequest === controller) {
+                        pendingRequest = null;
+                        lastQuery = null;
+                    }
+                    console.error('Property map: failed to load markers', e);
+                });
+        }
+
+        map.on('moveend zoomend', loadMarkers);
 
         map.on('click', () => {
             if (openPopupMarker) {
@@ -171,37 +285,22 @@ function initPropertyMap() {
         });
 
         // 4) Build legend
-        legendEl.innerHTML = Object.entries(categoryColors)
-            .map(
-                ([cat, col]) => `
-              <div class="legend-item">
-                <div class="legend-color" style="background:${col}"></div>
-                <span>${cat}</span>
-              </div>`
-            )
-            .join('');
+        renderLegend();
 
-        // 5) Fit map to markers
-        if (markerLatLngs.length === 1) {
-            // Single property in current filter
-            const only = markerLatLngs[0];
-            map.setView(only, 15);
-        } else if (markerLatLngs.length > 1) {
-            // Multiple properties: fit to all
-            const group = L.featureGroup(
-                markerLatLngs.map((latlng) => L.marker(latlng))
-            );
-            const bounds = group.getBounds();
-
-            if (bounds.isValid()) {
+        // 5) Fit map to the bounds of the (filtered) properties
+        if (Array.isArray(initialBounds) && initialBounds.length === 4) {
+            const [south, west, north, east] = initialBounds;
+            if (south === north && west === east) {
+                // Single property in current filter
+                map.setView([south, west], 15);
+            } else {
+                const bounds = L.latLngBounds([south, west], [north, east]);
                 map.fitBounds(bounds.pad(0.1));
 
                 // Clamp if Leaflet zooms out too much
                 if (map.getZoom() < 8) {
                     map.setView(bounds.getCenter(), 10);
                 }
-            } else {
-                map.setView([20.5937, 78.9629], 5);
             }
         } else {
             // No properties in filter: default India view
@@ -0,0 +1,10 @@
+from . import test_geo_search
+from . import test_rate_limit
+from . import test_llm_client
+from . import test_lru_cache
+from . import test_property_import
+from . import test_property_listing
+from . import test_property_facets
+from . import test_prefix_index
+from . import test_agent_aggregates
+from . import test_agent_inquiry
@@ -0,0 +1,51 @@
+from odoo.tests.common import TransactionCase
+
+
+class RealEstateCase(TransactionCase):
+    """Properties and agents created with their required values"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env = cls.env(context=dict(cls.env.context, tracking_disable=True, skip_ai_generation=True))
+        cls.env.company.country_id = cls.env.ref('base.in')
+        cls.state = cls.env['res.country.state'].create({
+            'name': 'Test State', 'code': 'TST', 'country_id': cls.env.ref('base.in').id,
+        })
+        cls.category = cls.env['property.category'].create({'name': 'Open Plot', 'seo_title': 'Open Plot'})
+
+    @classmethod
+    def _property_vals(cls, index=0, **vals):
+        return dict({
+            'name': f'Plot {index}',
+            'category_id': cls.category.id,
+            'price': 1000000 + 1000 * index,
+            'plot_area': 1200,
+            'facing_direction': 'east',
+            'road_width': 30,
+            'title_status': 'clear',
+            'city': 'Hyderabad',
+            'zip_code': '500032',
+            'state_id': cls.state.id,
+            'latitude': 17.385,
+            'longitude': 78.4867,
+            'contact_name': 'Owner',
+            'contact_phone': '9999999999',
+            'contact_email': 'owner@example.com',
+            'seo_title': f'Plot {index}',
+            'nearby_landmarks': 'Lake',
+            'is_published': True,
+        }, **vals)
+
+    @classmethod
+    def _create_properties(cls, count, **vals):
+        return cls.env['property.property'].create([cls._property_vals(index, **vals) for index in range(count)])
+
+    @classmethod
+    def _create_agent(cls, **vals):
+        return cls.env['real.estate.agent'].create(dict({
+            'name': 'Agent',
+            'email': 'agent@example.com',
+            'phone': '8888888888',
+            'city': 'Hyderabad',
+        }, **vals))
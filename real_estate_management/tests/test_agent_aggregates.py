@@ -0,0 +1,54 @@
+from odoo.tests.common import tagged
+from .common import RealEstateCase
+
+
+@tagged('post_install', '-at_install')
+class TestAgentAggregates(RealEstateCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.agent = cls._create_agent(name='Agent A', prior_deals=2, prior_sales_volume=1000000)
+        cls.other_agent = cls._create_agent(name='Agent B', email='other@example.com')
+
+    def assertAggregates(self, agent, listings, deals, volume):
+        self.assertEqual(
+            (agent.active_property_count, agent.total_deals, agent.total_sales_volume), (listings, deals, volume),
+        )
+        self.assertEqual((agent | self.other_agent)._reconcile_aggregates(), 0, "the deltas match a full recount")
+
+    def test_prior_totals(self):
+        self.assertAggregates(self.agent, 0, 2, 1000000)
+        self.agent.prior_deals = 4
+        self.assertAggregates(self.agent, 0, 4, 1000000)
+
+    def test_deltas(self):
+        properties = self._create_properties(3, agent_id=self.agent.id)
+        self.assertAggregates(self.agent, 3, 2, 1000000)
+
+        properties[0].write({'deal_state': 'closed', 'closing_price': 5000000})
+        self.assertAggregates(self.agent, 3, 3, 6000000)
+
+        properties[0].closing_price = 4500000
+        self.assertAggregates(self.agent, 3, 3, 5500000)
+
+        properties[1].is_published = False
+        self.assertAggregates(self.agent, 2, 3, 5500000)
+
+        properties[0].agent_id = self.other_agent
+        self.assertAggregates(self.agent, 1, 2, 1000000)
+        self.assertAggregates(self.other_agent, 1, 1, 4500000)
+
+        properties[0].unlink()
+        self.assertAggregates(self.other_agent, 0, 0, 0)
+
+        properties[1:].write({'agent_id': self.other_agent.id, 'is_published': True})
+        self.assertAggregates(self.agent, 0, 2, 1000000)
+        self.assertAggregates(self.other_agent, 2, 0, 0)
+
+    def test_reconcile_fixes_drift(self):
+        self._create_properties(2, agent_id=self.agent.id)
+        self.env.cr.execute("UPDATE real_estate_agent SET active_property_count = 7 WHERE id = %s", [self.agent.id])
+        self.agent.invalidate_recordset()
+        self.assertEqual(self.agent._reconcile_aggregates(), 1)
+        self.assertEqual(self.agent.active_property_count, 2)
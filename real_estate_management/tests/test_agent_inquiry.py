@@ -0,0 +1,65 @@
+from odoo.tests.common import tagged
+from .common import RealEstateCase
+from ..models.agent_inquiry import INQUIRY_DIGEST_THRESHOLD
+
+
+@tagged('post_install', '-at_install')
+class TestAgentInquiry(RealEstateCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.agent = cls._create_agent(name='Agent A', email='agent.a@example.com')
+        cls.property = cls._create_properties(1, agent_id=cls.agent.id)
+        cls.Inquiry = cls.env['agent.inquiry']
+
+    def _values(self, **params):
+        return self.Inquiry._sanitize_inquiry(dict({
+            'name': ' Buyer ', 'email': 'buyer@example.com', 'message': 'Is it available?',
+            'property_id': str(self.property.id),
+        }, **params))
+
+    def test_sanitize(self):
+        values = self._values(phone='9' * 500)
+        self.assertEqual(values['name'], 'Buyer')
+        self.assertEqual(values['property_id'], self.property.id)
+        self.assertEqual(len(values['phone']), 200)
+        self.assertIsNone(self._values(email='not an email'))
+        self.assertIsNone(self._values(name='  '))
+        self.assertIsNone(self._values(property_id='abc')['property_id'])
+
+    def test_record(self):
+        contact = self.Inquiry._record_inquiry(self.agent.id, self._values(), '10.0.0.1')
+        self.assertEqual(contact, ('Agent A', 'agent.a@example.com', '8888888888'))
+        inquiry = self.Inquiry.search([('agent_id', '=', self.agent.id)])
+        self.assertEqual(len(inquiry), 1)
+        self.assertRecordValues(inquiry, [{
+            'name': 'Buyer', 'email': 'buyer@example.com', 'property_id': self.property.id,
+            'ip_address': '10.0.0.1', 'notification_state': 'pending',
+        }])
+
+    def test_record_unknown_targets(self):
+        values = self._values(property_id='999999999')
+        self.assertIsNotNone(self.Inquiry._record_inquiry(self.agent.id, values, '10.0.0.1'))
+        self.assertFalse(self.Inquiry.search([('agent_id', '=', self.agent.id)]).property_id,
+                         "an unknown property is not linked")
+
+        self.agent.is_active = False
+        self.agent.flush_recordset()
+        self.assertIsNone(self.Inquiry._record_inquiry(self.agent.id, self._values(), '10.0.0.1'))
+        self.assertIsNone(self.Inquiry._record_inquiry(999999999, self._values(), '10.0.0.1'))
+        self.assertEqual(self.Inquiry.search_count([('agent_id', '=', self.agent.id)]), 1)
+
+    def test_dispatch(self):
+        other_agent = self._create_agent(name='Agent B', email='agent.b@example.com')
+        for _index in range(INQUIRY_DIGEST_THRESHOLD + 1):
+            self.Inquiry._record_inquiry(other_agent.id, self._values(), '10.0.0.1')
+        self.Inquiry._record_inquiry(self.agent.id, self._values(), '10.0.0.1')
+        mails_before = self.env['mail.mail'].search([])
+
+        self.Inquiry._cron_dispatch_notifications()
+        mails = self.env['mail.mail'].search([]) - mails_before
+        self.assertEqual(sorted(mails.mapped('email_to')), ['agent.a@example.com', 'agent.b@example.com'],
+                         "one mail for the single inquiry, one digest for the many")
+        inquiries = self.Inquiry.search([('agent_id', 'in', (self.agent | other_agent).ids)])
+        self.assertEqual(set(inquiries.mapped('notification_state')), {'sent'})
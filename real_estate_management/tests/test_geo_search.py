@@ -0,0 +1,92 @@
+from odoo.tests.common import BaseCase, tagged
+from ..tools.geo import (
+    bbox_around, geohash_cover, geohash_encode, haversine_km, point_in_polygon, polygon_bbox, polygon_centroid,
+)
+from .common import RealEstateCase
+
+
+@tagged('post_install', '-at_install')
+class TestGeo(BaseCase):
+
+    def test_geohash_encode(self):
+        # reference value of the geohash algorithm
+        self.assertEqual(geohash_encode(57.64911, 10.40744, 11), 'u4pruydqqvj')
+        self.assertEqual(geohash_encode(17.385, 78.4867, 7)[:5], geohash_encode(17.385, 78.4867, 5))
+
+    def test_geohash_cover(self):
+        south, west, north, east = bbox_around(17.385, 78.4867, 2)
+        cells = geohash_cover(south, west, north, east)
+        self.assertLessEqual(len(cells), 24)
+        self.assertEqual(cells, sorted(cells))
+        for lat, lng in [(17.385, 78.4867), (south, west), (north, east), (south, east), (north, west)]:
+            cell = geohash_encode(lat, lng)
+            self.assertTrue(any(cell.startswith(prefix) for prefix in cells), f"{lat},{lng} not covered")
+        self.assertEqual(geohash_cover(-90, -180, 90, 180), [''])
+
+    def test_haversine(self):
+        self.assertAlmostEqual(haversine_km(17.385, 78.4867, 17.385, 78.4867), 0.0)
+        # Hyderabad - Bengaluru, about 500 km as the crow flies
+        self.assertAlmostEqual(haversine_km(17.385, 78.4867, 12.9716, 77.5946), 500, delta=10)
+
+    def test_bbox_around(self):
+        south, west, north, east = bbox_around(17.385, 78.4867, 10)
+        self.assertAlmostEqual(haversine_km(17.385, 78.4867, north, 78.4867), 10, delta=0.1)
+        self.assertAlmostEqual(haversine_km(17.385, 78.4867, 17.385, east), 10, delta=0.1)
+        self.assertLess(south, 17.385)
+        self.assertLess(west, 78.4867)
+
+    def test_polygon(self):
+        square = [(0.0, 0.0), (0.0, 2.0), (2.0, 2.0), (2.0, 0.0)]
+        self.assertEqual(polygon_bbox(square), (0.0, 0.0, 2.0, 2.0))
+        self.assertEqual(polygon_centroid(square), (1.0, 1.0))
+        self.assertTrue(point_in_polygon(1.0, 1.0, square))
+        self.assertFalse(point_in_polygon(3.0, 1.0, square))
+        triangle = [(0.0, 0.0), (0.0, 4.0), (4.0, 0.0)]
+        self.assertTrue(point_in_polygon(1.0, 1.0, triangle))
+        self.assertFalse(point_in_polygon(3.0, 3.0, triangle))
+
+
+@tagged('post_install', '-at_install')
+class TestGeoSearch(RealEstateCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # a 9 x 9 grid of properties, about 1.1 km apart, around Hyderabad
+        cls.points = [(17.34 + 0.01 * i, 78.44 + 0.01 * j) for i in range(9) for j in range(9)]
+        cls.properties = cls.env['property.property'].create([
+            cls._property_vals(index, latitude=lat, longitude=lng) for index, (lat, lng) in enumerate(cls.points)
+        ])
+        cls.location = {rec.id: (rec.latitude, rec.longitude) for rec in cls.properties}
+
+    def _search(self, geo):
+        Property = self.env['property.property']
+        domain = [('id', 'in', self.properties.ids)] + Property._get_geo_domain(geo)
+        return set(Property.search(domain).ids)
+
+    def test_radius(self):
+        geo = self.env['property.property']._parse_geo_filter({'lat': '17.38', 'lng': '78.48', 'radius_km': '2.5'})
+        self.assertEqual(geo, ('radius', 17.38, 78.48, 2.5))
+        expected = {
+            record_id for record_id, (lat, lng) in self.location.items() if haversine_km(17.38, 78.48, lat, lng) <= 2.5
+        }
+        self.assertTrue(expected)
+        self.assertEqual(self._search(geo), expected)
+
+    def test_polygon(self):
+        geo = self.env['property.property']._parse_geo_filter({
+            'polygon': '17.345,78.445;17.415,78.445;17.375,78.525',
+        })
+        self.assertEqual(geo[0], 'polygon')
+        expected = {
+            record_id for record_id, (lat, lng) in self.location.items() if point_in_polygon(lat, lng, geo[1])
+        }
+        self.assertTrue(expected)
+        self.assertEqual(self._search(geo), expected, "the SQL containment matches the ray casting")
+
+    def test_nearest(self):
+        geo = ('radius', 17.38, 78.48, 5.0)
+        rows = self.env['property.property']._geo_search(geo, limit=5)
+        distances = [row['distance_km'] for row in rows]
+        self.assertEqual(distances, sorted(distances))
+        self.assertEqual(rows[0]['id'], self.properties[4 * 9 + 4].id, "the property at the center comes first")
@@ -0,0 +1,79 @@
+from unittest.mock import Mock, patch
+
+from odoo.tests.common import BaseCase, tagged
+from ..tools import llm_client
+from ..tools.llm_client import (
+    BREAKER_COOLDOWN, BREAKER_THRESHOLD, GroqBackend, LLMClient, LLMError, LLMUnavailable, StubBackend,
+    parse_json_content,
+)
+
+
+class FailingBackend:
+    name = 'failing'
+
+    def __init__(self):
+        self.calls = 0
+        self.fail = True
+
+    def complete(self, prompt, keys=(), max_tokens=800, temperature=0.3):
+        self.calls += 1
+        if self.fail:
+            raise LLMError("backend down")
+        return '{}', {}
+
+
+@tagged('post_install', '-at_install')
+class TestLLMClient(BaseCase):
+
+    def test_stub_backend(self):
+        client = LLMClient(StubBackend())
+        answer = client.complete_json('prompt', keys={'1': ('key_highlights', 'nearby_places')})
+        self.assertEqual(set(answer['1']), {'key_highlights', 'nearby_places'})
+        self.assertEqual(len(answer['1']['key_highlights']), 3)
+        self.assertEqual(client.metrics()['calls'], 1)
+
+    def test_parse_json_content(self):
+        self.assertEqual(parse_json_content('```json\n{"a": 1}\n```'), {'a': 1})
+        with self.assertRaises(LLMError):
+            parse_json_content('not json')
+        with self.assertRaises(LLMError):
+            parse_json_content('[1, 2]')
+
+    def test_unexpected_groq_response(self):
+        backend = GroqBackend('key')
+        response = Mock(status_code=200, text='{"error": "oops"}')
+        response.json.return_value = {'error': 'oops'}
+        backend.session = Mock(post=Mock(return_value=response))
+        with self.assertRaises(LLMError):
+            backend.complete('prompt')
+        response.json.side_effect = ValueError("not JSON")
+        with self.assertRaises(LLMError):
+            backend.complete('prompt')
+
+    def test_circuit_breaker(self):
+        backend = FailingBackend()
+        client = LLMClient(backend)
+        with patch.object(llm_client, 'time') as mock_time:
+            mock_time.monotonic.return_value = 1000.0
+            for _attempt in range(BREAKER_THRESHOLD):
+                with self.assertRaises(LLMError):
+                    client.complete('prompt')
+            with self.assertRaises(LLMUnavailable):
+                client.complete('prompt')
+            self.assertEqual(backend.calls, BREAKER_THRESHOLD, "open circuit rejects without calling")
+
+            # half-open: a single probe goes through, failing it reopens the circuit
+            mock_time.monotonic.return_value = 1000.0 + BREAKER_COOLDOWN + 1
+            client._check_breaker()
+            with self.assertRaises(LLMUnavailable):
+                client._check_breaker()
+            client._record_outcome(False)
+            with self.assertRaises(LLMUnavailable):
+                client.complete('prompt')
+
+            # a successful probe closes it
+            mock_time.monotonic.return_value = 1000.0 + 2 * BREAKER_COOLDOWN + 2
+            backend.fail = False
+            self.assertEqual(client.complete('prompt'), '{}')
+            self.assertEqual(client.complete('prompt'), '{}')
+            self.assertFalse(client.metrics()['circuit_open'])
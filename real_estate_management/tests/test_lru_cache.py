@@ -0,0 +1,30 @@
+from odoo.tests.common import BaseCase, tagged
+from ..tools.lru_cache import SizedLRUCache
+
+
+@tagged('post_install', '-at_install')
+class TestSizedLRUCache(BaseCase):
+
+    def test_get_set(self):
+        cache = SizedLRUCache(100)
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', 'x' * 10)
+        self.assertEqual(cache.get('a'), 'x' * 10)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        cache.set('a', 'y' * 20)
+        self.assertEqual(cache.size, 20)
+
+    def test_eviction(self):
+        cache = SizedLRUCache(30)
+        cache.set('a', 'a' * 10)
+        cache.set('b', 'b' * 10)
+        cache.set('c', 'c' * 10)
+        cache.get('a')
+        cache.set('d', 'd' * 10)
+        self.assertIsNone(cache.get('b'), "least recently used entry evicted")
+        self.assertEqual(cache.get('a'), 'a' * 10)
+        self.assertLessEqual(cache.size, 30)
+        cache.set('huge', 'h' * 31)
+        self.assertIsNone(cache.get('huge'), "values larger than the cache are not stored")
+        cache.clear()
+        self.assertEqual((len(cache), cache.size), (0, 0))
@@ -0,0 +1,33 @@
+from odoo.tests.common import BaseCase, tagged
+from ..tools.prefix_index import PrefixIndex
+
+
+@tagged('post_install', '-at_install')
+class TestPrefixIndex(BaseCase):
+
+    def test_search(self):
+        index = PrefixIndex()
+        index.load({
+            1: [('hyderabad', 'city', 'Hyderabad', '')],
+            2: [('hyderabad', 'city', 'Hyderabad', '')],
+            3: [('hyde park', 'property', 'Hyde Park', '/property/3'), ('park', 'property', 'Hyde Park', '/property/3')],
+        })
+        self.assertEqual(index.search('hyd'), [
+            ('city', 'Hyderabad', '', 2),
+            ('property', 'Hyde Park', '/property/3', 1),
+        ])
+        self.assertEqual(index.search('par'), [('property', 'Hyde Park', '/property/3', 1)])
+        self.assertEqual(index.search('hyd', kinds={'property'}), [('property', 'Hyde Park', '/property/3', 1)])
+        self.assertEqual(index.search('hyd', limit=1), [('city', 'Hyderabad', '', 2)])
+        self.assertEqual(index.search('xyz'), [])
+
+    def test_update_remove(self):
+        index = PrefixIndex()
+        index.load({1: [('pune', 'city', 'Pune', '')], 2: [('pune', 'city', 'Pune', '')]})
+        index.update(1, [('goa', 'city', 'Goa', '')])
+        self.assertEqual(index.search('pu'), [('city', 'Pune', '', 1)])
+        self.assertEqual(index.search('go'), [('city', 'Goa', '', 1)])
+        index.remove(2)
+        self.assertEqual(index.search('pu'), [])
+        self.assertEqual(index.documents(), {1})
+        self.assertEqual(len(index), 1)
@@ -0,0 +1,54 @@
+from odoo.tests.common import tagged
+from .common import RealEstateCase
+
+
+@tagged('post_install', '-at_install')
+class TestFacetCounts(RealEstateCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        Property = cls.env['property.property']
+        Property.create([
+            cls._property_vals(1, city='Facetville', facing_direction='east', price=2000000, plot_area=800),
+            cls._property_vals(2, city='Facetville', facing_direction='east', price=3000000, plot_area=1500),
+            cls._property_vals(3, city='Facetville', facing_direction='east', price=6000000, plot_area=1500,
+                               gated_community=True),
+            cls._property_vals(4, city='Facetville', facing_direction='west', price=3000000, plot_area=2500),
+            cls._property_vals(5, city='Facetville', facing_direction='west', price=6000000, plot_area=2500,
+                               gated_community=True),
+            cls._property_vals(6, city='Facetville', facing_direction='west', is_published=False),
+        ])
+
+    def _counts(self, filters=()):
+        counts = self.env['property.property']._read_facet_counts(city='Facetville', filters=filters)
+        return {facet: {value: (count, selected) for value, _label, count, selected in values}
+                for facet, values in counts.items()}
+
+    def test_counts(self):
+        counts = self._counts()
+        self.assertEqual(counts['facing'], {'east': (3, False), 'west': (2, False)})
+        self.assertEqual(counts['price'], {'under_25l': (1, False), '25l_50l': (2, False), '50l_1cr': (2, False)})
+        self.assertEqual(counts['gated'], {'1': (2, False)})
+
+    def test_counts_ignore_own_facet(self):
+        filters = self.env['property.property']._normalize_facet_filters({'facing': 'east', 'price': ['25l_50l']})
+        self.assertEqual(filters, (('price', ('25l_50l',)), ('facing', ('east',))))
+        counts = self._counts(filters)
+        # values of a facet stay alternatives: its own selection does not filter it
+        self.assertEqual(counts['facing'], {'east': (1, True), 'west': (1, False)})
+        self.assertEqual(counts['price'], {'under_25l': (1, False), '25l_50l': (1, True), '50l_1cr': (1, False)})
+        self.assertEqual(counts['area'], {'1000_2000': (1, False)})
+
+    def test_counts_match_search(self):
+        Property = self.env['property.property']
+        filters = Property._normalize_facet_filters({'area': '1000_2000,2000_5000', 'gated': '1'})
+        for facet, values in self._counts(filters).items():
+            others = tuple((other, other_values) for other, other_values in filters if other != facet)
+            for value, (count, _selected) in values.items():
+                domain = Property._get_listing_domain(city='Facetville', facets=others + ((facet, (value,)),))
+                self.assertEqual(count, Property.search_count(domain), f"{facet}={value}")
+
+    def test_unknown_values(self):
+        filters = self.env['property.property']._normalize_facet_filters({'facing': 'up,east', 'color': 'red'})
+        self.assertEqual(filters, (('facing', ('east',)),))
@@ -0,0 +1,58 @@
+import base64
+import json
+
+from odoo.tests.common import tagged
+from .common import RealEstateCase
+
+
+@tagged('post_install', '-at_install')
+class TestPropertyImport(RealEstateCase):
+
+    def _run_import(self, lines, chunk_size):
+        job = self.env['property.import.job'].create({
+            'file': base64.b64encode('\n'.join(lines).encode()),
+            'filename': 'properties.jsonl',
+            'chunk_size': chunk_size,
+        })
+        # the engine commits after each chunk
+        self.patch(type(self.env.cr), 'commit', lambda cr: None)
+        job._run()
+        return job
+
+    def _row(self, index, **values):
+        vals = self._property_vals(index, category='Open Plot', state='TST', **values)
+        for fname in ('category_id', 'state_id', 'latitude', 'longitude'):
+            vals.pop(fname)
+        return json.dumps(vals)
+
+    def test_chunk_fallback(self):
+        job = self._run_import([
+            self._row(1),
+            self._row(2, city=''),          # NOT NULL violation: the chunk is retried row by row
+            self._row(3),
+            '{"name": "broken',             # invalid JSON
+            self._row(5, price='abc'),      # invalid number
+            self._row(6),
+        ], chunk_size=3)
+
+        self.assertEqual(job.state, 'done')
+        self.assertEqual((job.rows_read, job.rows_imported, job.rows_failed), (6, 3, 3))
+        self.assertEqual(job.error_ids.mapped('line_number'), [2, 4, 5])
+        imported = self.env['property.property'].search([('name', 'in', ['Plot 1', 'Plot 3', 'Plot 6'])])
+        self.assertEqual(len(imported), 3)
+        self.assertEqual(set(imported.mapped('geocode_state')), {'pending'}, "imported rows are queued for geocoding")
+
+    def test_failed_import_queues_committed_chunks(self):
+        self.patch(type(self.env['property.import.job']), '_iter_rows', lambda job, stream: self._failing_rows())
+        # the committed chunks survive the rollback of the failure
+        self.patch(type(self.env.cr), 'rollback', lambda cr: None)
+        job = self._run_import(['{}'], chunk_size=2)
+        self.assertEqual(job.state, 'failed')
+        imported = self.env['property.property'].search([('name', 'in', ['Plot 1', 'Plot 2'])])
+        self.assertEqual(len(imported), 2)
+        self.assertEqual(set(imported.mapped('geocode_state')), {'pending'})
+
+    def _failing_rows(self):
+        yield 1, json.loads(self._row(1))
+        yield 2, json.loads(self._row(2))
+        raise UnicodeDecodeError('utf-8', b'\xff', 0, 1, 'invalid start byte')
@@ -0,0 +1,65 @@
+from odoo.tests.common import tagged
+from odoo.tools import SQL
+from .common import RealEstateCase
+
+
+@tagged('post_install', '-at_install')
+class TestListingKeysetPages(RealEstateCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # one transaction: the rows share their create_date, half of them with microseconds
+        cls.properties = cls._create_properties(20, price=1500000)
+        cls.env.flush_all()
+        cls.env.cr.execute(SQL(
+            """
+            UPDATE property_property
+               SET create_date = CASE WHEN id %% 2 = 0 THEN timestamp '2026-01-01 10:00:00'
+                                      ELSE timestamp '2026-01-01 10:00:00.5' END
+             WHERE id IN %s
+            """,
+            tuple(cls.properties.ids),
+        ))
+        cls.properties.invalidate_recordset(['create_date'])
+        cls.domain = [('is_published', '=', True), ('id', 'in', cls.properties.ids)]
+
+    def _page_through(self, sort, limit=3):
+        """Ids of every page read forward, then of every page read back from the last one"""
+        Property = self.env['property.property']
+        forward, pages, after = [], [], None
+        while True:
+            page = Property._get_listing_page(self.domain, sort=sort, limit=limit, after=after)
+            pages.append(page)
+            forward += [row['id'] for row in page['rows']]
+            after = page['next_cursor']
+            if not after:
+                break
+        backward = [row['id'] for row in pages[-1]['rows']]
+        before = pages[-1]['prev_cursor']
+        while before:
+            page = Property._get_listing_page(self.domain, sort=sort, limit=limit, before=before)
+            backward = [row['id'] for row in page['rows']] + backward
+            before = page['prev_cursor']
+        return forward, backward
+
+    def test_pages_share_create_date(self):
+        expected = self.env['property.property'].search(self.domain, order='create_date desc, id desc').ids
+        forward, backward = self._page_through('newest')
+        self.assertEqual(forward, expected, "no row skipped nor duplicated reading forward")
+        self.assertEqual(backward, expected, "no row skipped nor duplicated reading back")
+
+    def test_pages_share_sort_key(self):
+        expected = self.env['property.property'].search(self.domain, order='price asc, id asc').ids
+        forward, backward = self._page_through('price_asc', limit=4)
+        self.assertEqual(forward, expected)
+        self.assertEqual(backward, expected)
+
+    def test_cursor_of_another_sort(self):
+        Property = self.env['property.property']
+        first_page = Property._get_listing_page(self.domain, sort='newest', limit=5)
+        price_page = Property._get_listing_page(self.domain, sort='price_asc', limit=5)
+        page = Property._get_listing_page(self.domain, sort='newest', limit=5, after=price_page['next_cursor'])
+        self.assertEqual(page['rows'], first_page['rows'], "a cursor of another sort is ignored")
+        self.assertIsNone(Property._decode_listing_cursor('newest', price_page['next_cursor']))
+        self.assertIsNone(Property._decode_listing_cursor('newest', 'not a cursor'))
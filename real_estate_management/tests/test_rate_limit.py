@@ -0,0 +1,27 @@
+from unittest.mock import patch
+
+from odoo.tests.common import BaseCase, tagged
+from ..tools import rate_limit
+from ..tools.rate_limit import RateLimiter
+
+
+@tagged('post_install', '-at_install')
+class TestRateLimiter(BaseCase):
+
+    def test_sliding_window(self):
+        limiter = RateLimiter(2, 60)
+        with patch.object(rate_limit, 'time') as mock_time:
+            mock_time.monotonic.return_value = 1000.0
+            self.assertTrue(limiter.hit('ip'))
+            self.assertTrue(limiter.hit('ip'))
+            self.assertFalse(limiter.hit('ip'))
+            self.assertTrue(limiter.hit('other'), "keys are limited independently")
+            mock_time.monotonic.return_value = 1061.0
+            self.assertTrue(limiter.hit('ip'), "hits older than the period are forgotten")
+
+    def test_max_keys(self):
+        limiter = RateLimiter(1, 60, max_keys=2)
+        for key in ('a', 'b', 'c'):
+            self.assertTrue(limiter.hit(key))
+        self.assertEqual(len(limiter), 2)
+        self.assertTrue(limiter.hit('a'), "the least recently seen key was forgotten")
@@ -0,0 +1,124 @@
+"""Geohash and distance helpers of the location search
+
+Properties store the geohash of their coordinates, a string whose
+prefixes are the nested grid cells containing the point. A region is
+searched by covering it with a few cells and matching their prefixes on
+a btree index, then refining on the exact distance or polygon.
+"""
+import math
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_DECODE = {char: index for index, char in enumerate(GEOHASH_ALPHABET)}
+
+# Precision of the stored geohashes, cells of about 150 m x 150 m
+GEOHASH_PRECISION = 7
+
+# Cells used at most to cover a searched region, larger cells are used past it
+GEO_MAX_CELLS = 24
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = 111.32
+
+
+def geohash_encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Geohash of a point, ``precision`` characters long"""
+    lat_range = [-90.0, 90.0]
+    lng_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        interval, coordinate = (lng_range, longitude) if even else (lat_range, latitude)
+        middle = (interval[0] + interval[1]) / 2
+        value <<= 1
+        if coordinate >= middle:
+            value |= 1
+            interval[0] = middle
+        else:
+            interval[1] = middle
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits = value = 0
+    return ''.join(chars)
+
+
+def geohash_cell_size(precision):
+    """``(latitude, longitude)`` size in degrees of the cells of a precision"""
+    lng_bits = (5 * precision + 1) // 2
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** lng_bits
+
+
+def geohash_cover(south, west, north, east, max_cells=GEO_MAX_CELLS):
+    """Sorted geohash prefixes of the smallest cells covering a bounding box with at most ``max_cells``
+
+    Returns ``['']`` (every point) when even one-character cells are too many.
+    """
+    south, north = max(south, -90.0), min(north, 90.0)
+    west, east = max(west, -180.0), min(east, 180.0)
+    for precision in range(GEOHASH_PRECISION, 0, -1):
+        lat_step, lng_step = geohash_cell_size(precision)
+        if (math.floor((north - south) / lat_step) + 2) * (math.floor((east - west) / lng_step) + 2) > max_cells * 4:
+            continue
+        cells = set()
+        latitude = south
+        while True:
+            longitude = west
+            while True:
+                cells.add(geohash_encode(min(latitude, north), min(longitude, east), precision))
+                if longitude >= east:
+                    break
+                longitude += lng_step
+            if latitude >= north:
+                break
+            latitude += lat_step
+        if len(cells) <= max_cells:
+            return sorted(cells)
+    return ['']
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Great-circle distance between two points, in km"""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(min(1.0, a)))
+
+
+def bbox_around(latitude, longitude, radius_km):
+    """``(south, west, north, east)`` box containing the circle of ``radius_km`` around a point"""
+    lat_delta = radius_km / KM_PER_DEGREE
+    lng_delta = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(latitude)), 0.01))
+    return latitude - lat_delta, longitude - lng_delta, latitude + lat_delta, longitude + lng_delta
+
+
+def polygon_bbox(polygon):
+    """``(south, west, north, east)`` box of a ``[(latitude, longitude)]`` polygon"""
+    latitudes = [point[0] for point in polygon]
+    longitudes = [point[1] for point in polygon]
+    return min(latitudes), min(longitudes), max(latitudes), max(longitudes)
+
+
+def polygon_centroid(polygon):
+    """Mean of the vertices of a polygon, the reference point of its distance ranking"""
+    return (
+        sum(point[0] for point in polygon) / len(polygon),
+        sum(point[1] for point in polygon) / len(polygon),
+    )
+
+
+def point_in_polygon(latitude, longitude, polygon):
+    """Whether a point is inside a ``[(latitude, longitude)]`` polygon (ray casting)"""
+    inside = False
+    j = len(polygon) - 1
+    for i in range(len(polygon)):
+        lat_i, lng_i = polygon[i]
+        lat_j, lng_j = polygon[j]
+        if (lat_i > latitude) != (lat_j > latitude):
+            crossing = lng_i + (latitude - lat_i) * (lng_j - lng_i) / (lat_j - lat_i)
+            if longitude < crossing:
+                inside = not inside
+        j = i
+    return inside
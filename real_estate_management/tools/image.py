@@ -0,0 +1,12 @@
+import hashlib
+
+
+def image_url(model_name, record_id, field_name, write_date):
+    """URL of a stored image field, cache-busted on the record's last update
+
+    The ``unique`` query parameter makes ``/web/image`` answer with a
+    long-lived immutable Cache-Control header; the attachment checksum is
+    used as ETag so revalidations are answered with a 304.
+    """
+    unique = hashlib.sha512(str(write_date).encode('utf-8')).hexdigest()[:7]
+    return f'/web/image/{model_name}/{record_id}/{field_name}?unique={unique}'
@@ -0,0 +1,302 @@
+"""Shared client for the LLM (Groq) completions used to write property content
+
+One client is kept per worker process and backend configuration, so that
+its HTTP connections, concurrency limit, circuit breaker and metrics are
+shared by every request and cron of the worker. Use ``get_llm_client(env)``.
+"""
+from html import escape
+import json
+import logging
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+_logger = logging.getLogger(__name__)
+
+GROQ_URL = 'https://api.groq.com/openai/v1/chat/completions'
+DEFAULT_MODEL = 'llama-3.3-70b-versatile'
+SYSTEM_PROMPT = 'You are a real estate analyst. Return only JSON.'
+
+# HTTP statuses worth retrying: rate limited or transient server errors
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 30.0
+
+# Consecutive failures opening the circuit, and how long it stays open
+BREAKER_THRESHOLD = 5
+BREAKER_COOLDOWN = 60.0
+
+
+class LLMError(Exception):
+    """The completion could not be obtained or parsed"""
+
+
+class LLMUnavailable(LLMError):
+    """The backend is not configured or its circuit breaker is open"""
+
+
+class LLMRetryableError(LLMError):
+    """Transient failure, ``retry_after`` is the delay asked by the server"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_json_content(text):
+    """Parse the JSON object of a completion, tolerating markdown code fences"""
+    text = (text or '').strip()
+    if text.startswith('```'):
+        lines = text.split('\n')
+        text = '\n'.join(lines[1:-1]) if len(lines) > 2 else text
+        text = text.replace('```json', '').replace('```', '').strip()
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError as e:
+        raise LLMError(f"Invalid JSON in completion: {e}") from e
+    if not isinstance(data, dict):
+        raise LLMError(f"Expected a JSON object, got {type(data).__name__}")
+    return data
+
+
+def to_html(data, empty='<p>Information not available.</p>'):
+    """Render a completion value (list of points or text) as HTML"""
+    if not data:
+        return empty
+    if isinstance(data, list):
+        items = ''.join(f'<li>{escape(str(item))}</li>' for item in data)
+        return f'<ul>{items}</ul>'
+    return f'<p>{escape(str(data))}</p>'
+
+
+class GroqBackend:
+    """OpenAI-compatible chat completions on Groq, over a keep-alive session"""
+
+    name = 'groq'
+
+    def __init__(self, api_key, model=DEFAULT_MODEL, timeout=30, pool_size=8):
+        self.api_key = api_key
+        self.model = model
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'Authorization': f'Bearer {api_key}',
+            'Content-Type': 'application/json',
+        })
+
+    def complete(self, prompt, keys=(), max_tokens=800, temperature=0.3):
+        """Return ``(content, usage)`` for ``prompt``"""
+        try:
+            response = self.session.post(GROQ_URL, timeout=self.timeout, json={
+                'model': self.model,
+                'messages': [
+                    {'role': 'system', 'content': SYSTEM_PROMPT},
+                    {'role': 'user', 'content': prompt},
+                ],
+                'max_tokens': max_tokens,
+                'temperature': temperature,
+            })
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise LLMRetryableError(f"Groq request failed: {e}") from e
+
+        if response.status_code in RETRY_STATUSES:
+            retry_after = response.headers.get('Retry-After')
+            try:
+                retry_after = float(retry_after) if retry_after else None
+            except ValueError:
+                retry_after = None
+            raise LLMRetryableError(f"Groq API error {response.status_code}: {response.text[:200]}", retry_after)
+        if response.status_code != 200:
+            raise LLMError(f"Groq API error {response.status_code}: {response.text[:200]}")
+
+        try:
+            data = response.json()
+            return data['choices'][0]['message']['content'], data.get('usage') or {}
+        except (ValueError, LookupError, TypeError, AttributeError) as e:
+            raise LLMError(f"Unexpected Groq response: {response.text[:200]}") from e
+
+
+class StubBackend:
+    """Offline backend answering with deterministic placeholder points
+
+    Used for tests and benchmarks; ``latency`` (seconds) simulates the
+    round trip of the real API.
+    """
+
+    name = 'stub'
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def complete(self, prompt, keys=(), max_tokens=800, temperature=0.3):
+        if self.latency:
+            time.sleep(self.latency)
+        content = json.dumps(self._answer(keys))
+        usage = {'prompt_tokens': len(prompt.split()), 'completion_tokens': len(content.split())}
+        return content, usage
+
+    def _answer(self, keys):
+        """Placeholder object for ``keys``, a sequence of keys or ``{key: nested keys}``"""
+        if isinstance(keys, dict):
+            return {key: self._answer(nested) for key, nested in keys.items()}
+        return {key: [f"{key.replace('_', ' ').capitalize()} {idx}" for idx in range(1, 4)] for key in keys}
+
+
+class LLMClient:
+    """Completions with bounded concurrency, retries and a circuit breaker"""
+
+    def __init__(self, backend, max_concurrency=4):
+        self.backend = backend
+        self.timeout = getattr(backend, 'timeout', 30)
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._open_until = 0.0
+        self._probing = False
+        self._metrics = {
+            'calls': 0, 'errors': 0, 'retries': 0, 'rejected': 0,
+            'latency_total': 0.0, 'latency_max': 0.0,
+            'prompt_tokens': 0, 'completion_tokens': 0,
+        }
+
+    # -------------------- CIRCUIT BREAKER --------------------
+    def _check_breaker(self):
+        """Reject the call while the circuit is open
+
+        Once the cooldown is over the circuit is half-open: a single trial
+        call goes through, the others are rejected until its outcome closes
+        or reopens the circuit.
+        """
+        with self._lock:
+            if self._open_until:
+                if time.monotonic() < self._open_until or self._probing:
+                    self._metrics['rejected'] += 1
+                    raise LLMUnavailable(f"{self.backend.name} circuit open after repeated failures")
+                self._probing = True
+
+    def _record_outcome(self, success):
+        with self._lock:
+            probing, self._probing = self._probing, False
+            if success:
+                self._failures = 0
+                self._open_until = 0.0
+                return
+            self._failures += 1
+            if probing or self._failures >= BREAKER_THRESHOLD:
+                self._open_until = time.monotonic() + BREAKER_COOLDOWN
+                self._failures = 0
+                _logger.warning("LLM backend %s failing, pausing calls for %ss", self.backend.name, BREAKER_COOLDOWN)
+
+    # -------------------- CALLS --------------------
+    def complete(self, prompt, keys=(), max_tokens=800, temperature=0.3):
+        """Return the raw completion text of ``prompt``
+
+        Transient failures (429, 5xx, network) are retried with exponential
+        backoff and jitter, waiting at least as long as the server's
+        ``Retry-After`` asks.
+        """
+        if not self._semaphore.acquire(timeout=self.timeout):
+            raise LLMError("Too many concurrent LLM calls")
+        try:
+            self._check_breaker()
+            for attempt in range(MAX_RETRIES + 1):
+                started = time.monotonic()
+                try:
+                    content, usage = self.backend.complete(
+                        prompt, keys=keys, max_tokens=max_tokens, temperature=temperature,
+                    )
+                except LLMRetryableError as e:
+                    self._record_call(time.monotonic() - started, error=True)
+                    self._record_outcome(False)
+                    if attempt == MAX_RETRIES:
+                        raise
+                    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt) * random.uniform(0.5, 1.0)
+                    delay = max(delay, min(e.retry_after or 0.0, BACKOFF_MAX))
+                    with self._lock:
+                        self._metrics['retries'] += 1
+                    _logger.info("LLM call failed (%s), retrying in %.1fs", e, delay)
+                    time.sleep(delay)
+                    self._check_breaker()
+                    continue
+                except Exception:
+                    self._record_call(time.monotonic() - started, error=True)
+                    self._record_outcome(False)
+                    raise
+                latency = time.monotonic() - started
+                self._record_call(latency, usage=usage)
+                self._record_outcome(True)
+                _logger.info(
+                    "LLM call on %s took %.2fs (%s prompt / %s completion tokens)", self.backend.name, latency,
+                    usage.get('prompt_tokens', '?'), usage.get('completion_tokens', '?'),
+                )
+                return content
+        finally:
+            self._semaphore.release()
+
+    def complete_json(self, prompt, keys=(), max_tokens=800, temperature=0.3):
+        """Return the JSON object answered to ``prompt``, expected to hold ``keys``
+
+        ``keys`` describes the expected object for the stub backend: a
+        sequence of keys, or a ``{key: nested keys}`` dict for nested objects.
+        """
+        return parse_json_content(self.complete(prompt, keys=keys, max_tokens=max_tokens, temperature=temperature))
+
+    # -------------------- METRICS --------------------
+    def _record_call(self, latency, usage=None, error=False):
+        with self._lock:
+            metrics = self._metrics
+            metrics['calls'] += 1
+            metrics['errors'] += int(error)
+            metrics['latency_total'] += latency
+            metrics['latency_max'] = max(metrics['latency_max'], latency)
+            if usage:
+                metrics['prompt_tokens'] += usage.get('prompt_tokens') or 0
+                metrics['completion_tokens'] += usage.get('completion_tokens') or 0
+
+    def metrics(self):
+        """Snapshot of the counters of this worker process"""
+        with self._lock:
+            metrics = dict(self._metrics)
+        metrics['latency_avg'] = metrics['latency_total'] / metrics['calls'] if metrics['calls'] else 0.0
+        metrics['backend'] = self.backend.name
+        metrics['circuit_open'] = bool(self._open_until)
+        return metrics
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_llm_client(env):
+    """Return the worker's LLM client for the configured backend
+
+    ``real_estate.llm_backend`` selects ``groq`` (default, needs
+    ``groq.api_key``) or ``stub``; ``real_estate.llm_model`` and
+    ``real_estate.llm_max_concurrency`` tune the Groq backend.
+    """
+    params = env['ir.config_parameter'].sudo()
+    backend_name = params.get_param('real_estate.llm_backend', 'groq')
+    max_concurrency = max(1, int(params.get_param('real_estate.llm_max_concurrency', 4)))
+    if backend_name == 'stub':
+        config = ('stub', float(params.get_param('real_estate.llm_stub_latency', 0)), max_concurrency)
+    else:
+        api_key = params.get_param('groq.api_key')
+        if not api_key:
+            raise LLMUnavailable("Groq API key not configured. Get free key from https://console.groq.com")
+        config = ('groq', api_key, params.get_param('real_estate.llm_model', DEFAULT_MODEL), max_concurrency)
+
+    with _clients_lock:
+        client = _clients.get(config)
+        if client is None:
+            if config[0] == 'stub':
+                backend = StubBackend(latency=config[1])
+            else:
+                backend = GroqBackend(config[1], model=config[2], pool_size=max_concurrency)
+            client = _clients[config] = LLMClient(backend, max_concurrency=max_concurrency)
+        return client
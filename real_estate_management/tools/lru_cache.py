@@ -0,0 +1,51 @@
+from collections import OrderedDict
+import threading
+
+
+class SizedLRUCache:
+    """Thread-safe LRU mapping bounded by the total size of its values
+
+    Values are ``str`` or ``bytes``; the least recently used entries are
+    evicted once the sum of their lengths exceeds ``max_bytes``. One
+    instance is shared by all the threads of a worker process.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._data[key] = value
+            self.size += size
+            while self.size > self.max_bytes:
+                _key, evicted = self._data.popitem(last=False)
+                self.size -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,93 @@
+from bisect import bisect_left, insort
+import threading
+
+
+class PrefixIndex:
+    """Thread-safe in-memory index answering prefix queries from a sorted array
+
+    Each document (any hashable id) holds suggestions, ``(kind, label,
+    url)`` tuples, indexed under ``keys`` (normalized strings, e.g. every
+    word-start suffix of the label). A suggestion shared by several
+    documents, like a city, is stored once with the number of documents
+    holding it as weight. Documents can be replaced or removed one by one,
+    so the index is kept up to date incrementally.
+    """
+
+    # Keys scanned at most per lookup, bounding the cost of one-letter prefixes
+    MAX_SCAN = 2000
+
+    def __init__(self):
+        self._keys = []         # sorted (key, kind, label, url)
+        self._weights = {}      # (key, kind, label, url) -> number of documents
+        self._documents = {}    # document id -> [(key, kind, label, url)]
+        self._lock = threading.Lock()
+
+    def load(self, documents):
+        """Replace the whole index by ``{doc_id: entries}``, sorting the keys once"""
+        weights = {}
+        indexed = {}
+        for doc_id, entries in documents.items():
+            entries = list(dict.fromkeys(entries))
+            if not entries:
+                continue
+            indexed[doc_id] = entries
+            for entry in entries:
+                weights[entry] = weights.get(entry, 0) + 1
+        keys = sorted(weights)
+        with self._lock:
+            self._keys, self._weights, self._documents = keys, weights, indexed
+
+    def update(self, doc_id, entries):
+        """Replace the ``(key, kind, label, url)`` entries of a document"""
+        entries = list(dict.fromkeys(entries))
+        with self._lock:
+            self._remove(doc_id)
+            if not entries:
+                return
+            self._documents[doc_id] = entries
+            for entry in entries:
+                weight = self._weights.get(entry, 0)
+                if not weight:
+                    insort(self._keys, entry)
+                self._weights[entry] = weight + 1
+
+    def remove(self, doc_id):
+        with self._lock:
+            self._remove(doc_id)
+
+    def _remove(self, doc_id):
+        for entry in self._documents.pop(doc_id, ()):
+            weight = self._weights[entry] - 1
+            if weight:
+                self._weights[entry] = weight
+            else:
+                del self._weights[entry]
+                del self._keys[bisect_left(self._keys, entry)]
+
+    def documents(self):
+        with self._lock:
+            return set(self._documents)
+
+    def search(self, prefix, limit=10, kinds=None):
+        """Best ``(kind, label, url, weight)`` suggestions of the keys starting with ``prefix``
+
+        Suggestions are ranked by weight, then by label; a suggestion found
+        under several keys is returned once.
+        """
+        found = {}
+        with self._lock:
+            keys = self._keys
+            start = bisect_left(keys, (prefix,))
+            for entry in keys[start:start + self.MAX_SCAN]:
+                if not entry[0].startswith(prefix):
+                    break
+                key, kind, label, url = entry
+                if kinds and kind not in kinds:
+                    continue
+                suggestion = (kind, label, url)
+                found[suggestion] = max(found.get(suggestion, 0), self._weights[entry])
+        ranked = sorted(found.items(), key=lambda item: (-item[1], item[0][1]))
+        return [(kind, label, url, weight) for (kind, label, url), weight in ranked[:limit]]
+
+    def __len__(self):
+        return len(self._keys)
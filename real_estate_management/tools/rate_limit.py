@@ -0,0 +1,40 @@
+from collections import OrderedDict, deque
+import threading
+import time
+
+
+class RateLimiter:
+    """Thread-safe sliding window limit of ``limit`` hits per ``period`` seconds and key
+
+    Kept in the memory of the worker process, so that rejecting a burst
+    costs no database query. At most ``max_keys`` keys are tracked, the
+    least recently seen ones are forgotten first.
+    """
+
+    def __init__(self, limit, period, max_keys=10000):
+        self.limit = limit
+        self.period = period
+        self.max_keys = max_keys
+        self._hits = OrderedDict()
+        self._lock = threading.Lock()
+
+    def hit(self, key):
+        """Count a hit of ``key``, False (and not counted) if it is over the limit"""
+        now = time.monotonic()
+        with self._lock:
+            hits = self._hits.get(key)
+            if hits is None:
+                hits = self._hits[key] = deque()
+                while len(self._hits) > self.max_keys:
+                    self._hits.popitem(last=False)
+            else:
+                self._hits.move_to_end(key)
+            while hits and hits[0] <= now - self.period:
+                hits.popleft()
+            if len(hits) >= self.limit:
+                return False
+            hits.append(now)
+            return True
+
+    def __len__(self):
+        return len(self._hits)
@@ -0,0 +1,152 @@
+"""Streaming ingestion of the files uploaded with the public forms
+
+Uploads are read in chunks from the temporary files of the request,
+sniffed from their first bytes, and written to the filestore under their
+sha1 while hashing, with the per-file and per-request size limits enforced
+as they are read: a file is never held in memory whole, nor base64
+encoded, except the images resized for an image field.
+"""
+from odoo.tools import SQL, image_process
+from odoo.tools.mimetypes import guess_mimetype
+import base64
+import hashlib
+import os
+import tempfile
+
+MB = 1024 * 1024
+
+# Bytes read from an upload at a time, the first chunk is also used to sniff its type
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# Size limits of an image, of a document and of all the files of a request
+UPLOAD_MAX_IMAGE_SIZE = 5 * MB
+UPLOAD_MAX_DOCUMENT_SIZE = 10 * MB
+UPLOAD_MAX_REQUEST_SIZE = 50 * MB
+
+# Types accepted from the forms, as sniffed from the content
+UPLOAD_IMAGE_TYPES = frozenset({'image/jpeg', 'image/png', 'image/gif', 'image/webp'})
+UPLOAD_DOCUMENT_TYPES = UPLOAD_IMAGE_TYPES | {
+    'application/pdf',
+    'application/msword',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+}
+
+# Office documents sniffed as a plain zip archive from their first bytes, told apart by their extension
+ZIP_DOCUMENT_TYPES = {
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+}
+
+
+class UploadError(Exception):
+    """An uploaded file was refused: too large, empty or of a type not accepted"""
+
+
+class UploadSession:
+    """Reads the files uploaded with one request, within a total size budget
+
+    ``content_length`` is the size of the request body; a request larger
+    than the budget is refused before any file is read.
+    """
+
+    def __init__(self, env, content_length=None, max_request_size=UPLOAD_MAX_REQUEST_SIZE):
+        if content_length and content_length > max_request_size:
+            raise UploadError(f"The uploaded files exceed {max_request_size // MB} MB in total")
+        self.env = env
+        self.max_request_size = max_request_size
+        self.remaining = max_request_size
+
+    def _read_chunks(self, upload, max_size):
+        """Chunks of an uploaded file, raising UploadError as soon as a size limit is exceeded"""
+        size = 0
+        stream = upload.stream
+        stream.seek(0)
+        while chunk := stream.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_size:
+                raise UploadError(f"{upload.filename} exceeds the limit of {max_size // MB} MB")
+            if size > self.remaining:
+                raise UploadError(f"The uploaded files exceed {self.max_request_size // MB} MB in total")
+            yield chunk
+        self.remaining -= size
+
+    def _sniff_mimetype(self, upload, head, allowed_types):
+        """Type of an upload guessed from its first bytes, never trusting the one sent by the browser"""
+        mimetype = guess_mimetype(head, default='application/octet-stream')
+        if mimetype == 'application/zip':
+            extension = os.path.splitext(upload.filename or '')[1].lower()
+            mimetype = ZIP_DOCUMENT_TYPES.get(extension, mimetype)
+        if mimetype not in allowed_types:
+            raise UploadError(f"{upload.filename} is not an accepted type of file ({mimetype})")
+        return mimetype
+
+    def read_image(self, upload, size, max_size=UPLOAD_MAX_IMAGE_SIZE):
+        """Base64 of an uploaded image resized to fit ``size``, the value of an image field
+
+        Image fields resize their value, so the image is read in memory,
+        but only up to ``max_size`` and encoded once shrunk.
+        """
+        chunks = []
+        for chunk in self._read_chunks(upload, max_size):
+            if not chunks:
+                self._sniff_mimetype(upload, chunk, UPLOAD_IMAGE_TYPES)
+            chunks.append(chunk)
+        if not chunks:
+            return False
+        return base64.b64encode(image_process(b''.join(chunks), size=size))
+
+    def attach(self, upload, values, allowed_types=UPLOAD_DOCUMENT_TYPES, max_size=UPLOAD_MAX_DOCUMENT_SIZE):
+        """Stream an upload to the filestore and create its attachment with ``values``
+
+        The file is hashed while copied to a temporary file of the filestore,
+        then moved to its sha1 path. Returns the attachment, an empty
+        recordset if the upload is empty.
+        """
+        Attachment = self.env['ir.attachment'].sudo()
+        values = dict(values, name=values.get('name') or upload.filename, type='binary')
+        if Attachment._storage() != 'file':
+            chunks = []
+            for chunk in self._read_chunks(upload, max_size):
+                if not chunks:
+                    values['mimetype'] = self._sniff_mimetype(upload, chunk, allowed_types)
+                chunks.append(chunk)
+            return Attachment.create(dict(values, raw=b''.join(chunks))) if chunks else Attachment
+
+        filestore = Attachment._filestore()
+        os.makedirs(filestore, exist_ok=True)
+        sha1 = hashlib.sha1()
+        file_size = 0
+        fd, temp_path = tempfile.mkstemp(prefix='.upload-', dir=filestore)
+        try:
+            with os.fdopen(fd, 'wb') as temp_file:
+                for chunk in self._read_chunks(upload, max_size):
+                    if not file_size:
+                        values['mimetype'] = self._sniff_mimetype(upload, chunk, allowed_types)
+                    sha1.update(chunk)
+                    temp_file.write(chunk)
+                    file_size += len(chunk)
+            if not file_size:
+                os.unlink(temp_path)
+                return Attachment
+            checksum = sha1.hexdigest()
+            fname = f'{checksum[:2]}/{checksum}'
+            full_path = Attachment._full_path(fname)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            if os.path.isfile(full_path):
+                # the same content is already stored
+                os.unlink(temp_path)
+            else:
+                os.replace(temp_path, full_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+        # collected by the filestore garbage collector should the transaction be rolled back
+        Attachment._mark_for_gc(fname)
+
+        attachment = Attachment.create(values)
+        self.env.cr.execute(SQL(
+            "UPDATE ir_attachment SET store_fname = %s, file_size = %s, checksum = %s, db_datas = NULL WHERE id = %s",
+            fname, file_size, checksum, attachment.id,
+        ))
+        attachment.invalidate_recordset(['store_fname', 'file_size', 'checksum', 'db_datas', 'raw', 'datas'])
+        return attachment